@@ -0,0 +1,126 @@
+"""
+Plot-ready aggregates computed with NumPy/pandas.
+
+Each function reduces a column (or a pair of columns) to the handful of
+numbers a chart needs, so the plotting backends never receive raw rows for
+large datasets.
+"""
+import numpy as np
+
+# Rows sampled for KDE curves
+KDE_SAMPLE_ROWS = 50_000
+KDE_GRID_POINTS = 256
+# Most frequent categories kept on a categorical axis
+MAX_CATEGORIES = 50
+
+
+def _finite_values(series):
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def top_categories(series, limit=MAX_CATEGORIES):
+    """Value counts of the most frequent categories, in descending order"""
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return counts.head(limit), len(counts)
+
+
+def category_note(shown, total):
+    return f" (top {shown} of {total})" if total > shown else ""
+
+
+def _gaussian_kde(sample, grid):
+    """Gaussian KDE (Scott's bandwidth) of sample evaluated on grid"""
+    n = len(sample)
+    bandwidth = 1.06 * sample.std() * n ** (-1 / 5)
+    if n < 2 or bandwidth <= 0:
+        return np.zeros_like(grid)
+    density = np.zeros_like(grid)
+    # Evaluate in slices to bound the (grid x slice) temporary
+    for start in range(0, n, 4096):
+        z = (grid[:, None] - sample[None, start:start + 4096]) / bandwidth
+        density += np.exp(-0.5 * z * z).sum(axis=1)
+    return density / (n * bandwidth * np.sqrt(2 * np.pi))
+
+
+def histogram_edges(sample, low, high):
+    """Bin edges over [low, high], with the bin count chosen from a sample"""
+    n_bins = max(len(np.histogram_bin_edges(sample, bins='auto')) - 1, 1)
+    return np.histogram_bin_edges(sample, bins=min(n_bins, 200), range=(low, high))
+
+
+def histogram_result(counts, edges, sample, n_values):
+    """Histogram dict with a KDE from sample, scaled to the count axis like seaborn's histplot(kde=True)"""
+    grid = np.linspace(edges[0], edges[-1], KDE_GRID_POINTS)
+    kde = _gaussian_kde(sample, grid) * n_values * (edges[1] - edges[0])
+    return {'counts': counts, 'edges': edges, 'grid': grid, 'kde': kde}
+
+
+def histogram_aggregate(series, sample_rows=KDE_SAMPLE_ROWS, seed=0):
+    """Bin counts over the full column plus a KDE estimated from a sample"""
+    values = _finite_values(series)
+    if len(values) == 0:
+        return None
+    rng = np.random.default_rng(seed)
+    sample = values if len(values) <= sample_rows else rng.choice(values, sample_rows, replace=False)
+    # Bin count from the sample, bin range from the full data
+    edges = histogram_edges(sample, values.min(), values.max())
+    counts, edges = np.histogram(values, bins=edges)
+    return histogram_result(counts, edges, sample, len(values))
+
+
+def _grouped_values(df, x_col, y_col, limit):
+    """(group labels, float values) for the top categories of x_col, rows with missing values dropped"""
+    # Built from the two Series so x_col == y_col works too
+    groups, values = df[x_col], df[y_col]
+    keep = groups.notna() & values.notna()
+    groups, values = groups[keep], values[keep]
+    top, total = top_categories(groups, limit)
+    keep = groups.isin(top.index)
+    return groups[keep], values[keep].astype(np.float64), top, total
+
+
+def box_aggregate(df, x_col, y_col, limit=MAX_CATEGORIES):
+    """matplotlib bxp() statistics per group, computed with grouped quantiles"""
+    groups, values, top, total = _grouped_values(df, x_col, y_col, limit)
+    if values.empty:
+        return [], total
+    grouped = values.groupby(groups, observed=True)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    if quartiles.empty:
+        return [], total
+    iqr = quartiles[0.75] - quartiles[0.25]
+    low_fence = (quartiles[0.25] - 1.5 * iqr).reindex(groups).to_numpy()
+    high_fence = (quartiles[0.75] + 1.5 * iqr).reindex(groups).to_numpy()
+    # Whiskers end at the most extreme points still inside the fences
+    whislo = values.where(values.to_numpy() >= low_fence).groupby(groups, observed=True).min()
+    whishi = values.where(values.to_numpy() <= high_fence).groupby(groups, observed=True).max()
+    stats = []
+    for label in top.index:
+        if label not in quartiles.index:
+            continue
+        stats.append({
+            'label': str(label),
+            'q1': quartiles.at[label, 0.25],
+            'med': quartiles.at[label, 0.5],
+            'q3': quartiles.at[label, 0.75],
+            'whislo': whislo.get(label, quartiles.at[label, 0.25]),
+            'whishi': whishi.get(label, quartiles.at[label, 0.75]),
+            'fliers': [],
+        })
+    return stats, total
+
+
+def mean_ci_aggregate(df, x_col, y_col, limit=MAX_CATEGORIES, z=1.96):
+    """Grouped means with normal-approximation 95% confidence intervals"""
+    groups, values, top, total = _grouped_values(df, x_col, y_col, limit)
+    agg = values.groupby(groups, observed=True).agg(['mean', 'std', 'count'])
+    agg = agg.reindex(top.index).dropna(subset=['mean'])
+    agg['ci'] = confidence_interval(agg, z)
+    return agg, total
+
+
+def confidence_interval(agg, z=1.96):
+    """Half-width of the normal-approximation interval from 'std' and 'count' columns"""
+    return z * agg['std'].fillna(0) / np.sqrt(agg['count'])
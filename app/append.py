@@ -0,0 +1,115 @@
+"""
+Append detection for CSV uploads that extend an earlier upload.
+
+A daily-growing file is re-uploaded with new rows at its end. Every loaded
+CSV upload is recorded with its size and a hash of its bytes; a later upload
+whose first `size` bytes hash the same (and whose header line matches)
+extends that dataset, so only the bytes after them need to be parsed and
+appended to the cached frame. Mergeable state cached for the earlier version
+(sketch-based profiles, Pearson correlation sums) is then extended with the
+new rows rather than recomputed.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ingest import append_frames, read_csv_like
+
+# Longest header line compared before any hashing
+HEADER_MAX_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class UploadRecord:
+    """A loaded upload: dataset key, byte size and hash of its bytes"""
+    key: str
+    size: int
+    digest: str
+
+
+def header_line(data):
+    """The first line of data, newline included (b'' if longer than HEADER_MAX_BYTES)"""
+    end = bytes(data[:HEADER_MAX_BYTES]).find(b'\n')
+    return bytes(data[:end + 1]) if end >= 0 else b''
+
+
+def prefix_digests(data, sizes):
+    """{size: hash of data[:size]} for every size, in one pass over data"""
+    digest = hashlib.blake2b(digest_size=20)
+    view = memoryview(data)
+    digests, position = {}, 0
+    for size in sorted(set(sizes)):
+        digest.update(view[position:size])
+        position = size
+        digests[size] = digest.copy().hexdigest()
+    return digests
+
+
+class AppendIndex:
+    """Recently loaded uploads, grouped by header line and read options, for finding the one a new upload extends"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._records = OrderedDict()  # (header, options) -> {size: UploadRecord}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _group(data, options):
+        return header_line(data), tuple(sorted(options.items()))
+
+    def digests(self, data, **options):
+        """{size: hash of data[:size]} for data's own size and every recorded upload it may extend, in one pass.
+
+        Computed once per upload, these serve as its content hash and for find_base() and record().
+        """
+        with self._lock:
+            sizes = [size for size in self._records.get(self._group(data, options), {}) if size < len(data)]
+        return prefix_digests(data, [*sizes, len(data)])
+
+    def record(self, key, data, digests=None, **options):
+        """Remember an upload loaded as dataset `key`; only files ending in a complete row can be extended"""
+        header = header_line(data)
+        if not header or len(data) <= len(header) or bytes(data[-1:]) != b'\n':
+            return
+        if not digests or len(data) not in digests:
+            digests = prefix_digests(data, [len(data)])
+        record = UploadRecord(key, len(data), digests[len(data)])
+        group = self._group(data, options)
+        with self._lock:
+            self._records.setdefault(group, {})[record.size] = record
+            self._records.move_to_end(group)
+            while sum(len(records) for records in self._records.values()) > self.max_entries:
+                oldest = next(iter(self._records.values()))
+                oldest.pop(min(oldest))
+                if not oldest:
+                    self._records.popitem(last=False)
+
+    def find_base(self, data, digests=None, **options):
+        """The largest recorded upload that data extends byte for byte, or None (digests as from digests())"""
+        with self._lock:
+            records = dict(self._records.get(self._group(data, options), {}))
+        candidates = [size for size in records if size < len(data)]
+        if not candidates:
+            return None
+        if digests is None or any(size not in digests for size in candidates):
+            digests = prefix_digests(data, candidates)
+        for size in sorted(candidates, reverse=True):
+            if digests[size] == records[size].digest:
+                return records[size]
+        return None
+
+
+def read_appended_rows(data, base, base_size, **read_kwargs):
+    """The rows of a CSV upload after its first base_size bytes, in the column kinds of base (None if they differ)"""
+    source = io.BytesIO(header_line(data) + bytes(data[base_size:]))
+    return read_csv_like(source, base, **read_kwargs)
+
+
+def extend_dataset(base, data, base_size, **read_kwargs):
+    """(appended rows, base with them appended) for an upload extending base, or None if the schema changed"""
+    rows = read_appended_rows(data, base, base_size, **read_kwargs)
+    if rows is None:
+        return None
+    return rows, append_frames(base, rows)
@@ -0,0 +1,85 @@
+"""
+Server-side paging for the data browser.
+
+A view of the dataset is an array of row positions: the sort order of one
+column, restricted to the rows that pass the filter. Sort orders, filter masks
+and combined views are computed once per dataset version and kept in an
+LRUCache, so turning pages, changing the page size or the visible columns only
+slices that array and materialises the rows on screen.
+"""
+import math
+
+import numpy as np
+
+from cache import LRUCache
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+# Filter specs: ('range', low, high), ('contains', text), ('in', values), ('missing',), ('present',)
+FILTER_KINDS = ('range', 'contains', 'in', 'missing', 'present')
+
+
+def sort_order(series, ascending=True):
+    """Row positions that sort series, missing values last"""
+    positions = series.reset_index(drop=True)
+    return positions.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy(dtype=np.int64)
+
+
+def filter_mask(series, spec):
+    """Boolean array of the rows of series that match a filter spec"""
+    kind = spec[0]
+    if kind == 'range':
+        _, low, high = spec
+        mask = series.between(low, high)
+    elif kind == 'contains':
+        mask = series.astype('str').str.contains(spec[1], case=False, regex=False)
+    elif kind == 'in':
+        mask = series.isin(list(spec[1]))
+    elif kind == 'missing':
+        mask = series.isna()
+    elif kind == 'present':
+        mask = series.notna()
+    else:
+        raise ValueError(f"Unknown filter: {kind!r}")
+    return mask.fillna(False).to_numpy(dtype=bool)
+
+
+class BrowserIndex:
+    """Cached sort orders, filter masks and views, keyed by dataset version"""
+
+    def __init__(self, max_entries=64, max_bytes=1024 ** 3):
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def order(self, key, df, column, ascending=True):
+        return self.cache.get_or_create((key, 'sort', column, ascending),
+                                        lambda: sort_order(df[column], ascending))
+
+    def mask(self, key, df, column, spec):
+        return self.cache.get_or_create((key, 'filter', column, spec), lambda: filter_mask(df[column], spec))
+
+    def view(self, key, df, sort=None, ascending=True, filter_column=None, filter_spec=None):
+        """Row positions to show, or None for the rows in their stored order"""
+        if sort is None and filter_spec is None:
+            return None
+
+        def build():
+            mask = self.mask(key, df, filter_column, filter_spec) if filter_spec is not None else None
+            if sort is None:
+                return np.flatnonzero(mask)
+            order = self.order(key, df, sort, ascending)
+            return order if mask is None else order[mask[order]]
+
+        return self.cache.get_or_create((key, 'view', sort, ascending, filter_column, filter_spec), build)
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def get_page(df, positions, page, page_size, columns=None):
+    """Rows of one page (1-based) of a view, projected to columns"""
+    start = (page - 1) * page_size
+    frame = df if columns is None else df[list(columns)]
+    if positions is None:
+        return frame.iloc[start:start + page_size]
+    return frame.take(positions[start:start + page_size])
@@ -0,0 +1,162 @@
+"""
+In-process caches shared by every Streamlit session of the dashboard.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def content_hash(data, **options):
+    """Hash raw bytes together with the options used to parse them"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(data)
+    # Options are part of the key: the same bytes parsed differently are different datasets
+    for name in sorted(options):
+        digest.update(f"|{name}={options[name]!r}".encode())
+    return digest.hexdigest()
+
+
+def estimate_size(value):
+    """Best-effort size in bytes of a cached value"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    # Objects holding arrays (e.g. correlation accumulators) report their own size
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and a memory budget"""
+
+    def __init__(self, max_entries=8, max_bytes=2 * 1024 ** 3, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._key_locks = {}  # key -> [lock, callers holding or waiting on it]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self):
+        """Snapshot of the cached keys, least recently used first"""
+        with self._lock:
+            return list(self._entries)
+
+    def values(self):
+        """Snapshot of the cached values, least recently used first (does not mark them as used)"""
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    @property
+    def total_bytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        """Return the cached value and mark it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            # Values larger than the whole budget are returned to the caller but never cached
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, building it with factory() on a miss"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        # One builder per key so concurrent sessions uploading the same file parse it once.
+        # The lock stays registered while any caller holds or waits on it.
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                        return self._entries[key][0]
+                return self.put(key, factory())
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def pop(self, key, default=None):
+        """Remove an entry and return its value"""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value, size = self._entries.pop(key)
+            self._bytes -= size
+            return value
+
+    def discard(self, value):
+        """Remove every entry holding this very object (e.g. a frame spilled to disk); returns how many"""
+        with self._lock:
+            keys = [key for key, (cached, _) in self._entries.items() if cached is value]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Summary of cache usage for display and logging"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+
+_MISSING = object()
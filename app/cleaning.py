@@ -0,0 +1,254 @@
+"""
+Missing-value cleaning engine.
+
+Fill values for all affected columns are computed in one batched pass and
+applied together: plain float columns are reduced and filled as one NumPy
+array per dtype (a single masked copy), everything else goes through a single
+fillna mapping. With pandas Copy-on-Write the cleaned frame shares every
+untouched column with the original instead of duplicating it. The fill
+values are reduced column-parallel when a ColumnExecutor is given.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from ingest import categorical_columns, numeric_columns
+from parallel import SERIAL
+
+NUMERIC_STRATEGIES = ["mean", "median", "zero"]
+CATEGORICAL_STRATEGIES = ["mode", "unknown"]
+UNKNOWN_LABEL = 'Unknown'
+
+PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+
+def enable_copy_on_write():
+    """Turn on pandas Copy-on-Write (always on from pandas 3)"""
+    if PANDAS_MAJOR == 2:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def copy_on_write_enabled():
+    return PANDAS_MAJOR >= 3 or (PANDAS_MAJOR == 2 and pd.options.mode.copy_on_write is True)
+
+
+def _float_groups(df, columns):
+    """Split columns into {numpy float dtype: [columns]} and the remaining columns"""
+    groups, others = {}, []
+    dtypes = df.dtypes
+    for col in columns:
+        dtype = dtypes[col]
+        if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+            groups.setdefault(dtype, []).append(col)
+        else:
+            others.append(col)
+    return groups, others
+
+
+def _reduce_block(values, strategy):
+    """Per-column mean or median of a 2-D float array, ignoring NaNs"""
+    reduce = np.nanmean if strategy == 'mean' else np.nanmedian
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns reduce to NaN
+        return reduce(values, axis=0)
+
+
+def _modes(frame):
+    """{column: most frequent value} for the columns of frame"""
+    fills = {}
+    for col in frame.columns:
+        modes = frame[col].mode()
+        fills[col] = modes.iloc[0] if len(modes) > 0 else UNKNOWN_LABEL
+    return fills
+
+
+def numeric_fill_values(df, columns, strategy, executor=None):
+    """Fill values for numeric columns, computed as float64 block reductions"""
+    if strategy not in NUMERIC_STRATEGIES:
+        raise ValueError(f"Unknown numeric strategy: {strategy!r}")
+    if len(columns) == 0:
+        return {}
+    if strategy == 'zero':
+        return dict.fromkeys(columns, 0)
+    fills = {}
+    groups, others = _float_groups(df, columns)
+    float_cols = [col for cols in groups.values() for col in cols]
+    for cols, values in (executor or SERIAL).map_numeric(_reduce_block, df, float_cols, strategy):
+        fills.update(zip(cols, values.tolist()))
+    if others:
+        # Nullable integer columns: pandas handles the NA mask
+        fills.update((df[others].mean() if strategy == 'mean' else df[others].median()).to_dict())
+    return fills
+
+
+def categorical_fill_values(df, columns, strategy, executor=None):
+    """Fill values for categorical columns"""
+    if strategy == 'unknown':
+        return dict.fromkeys(columns, UNKNOWN_LABEL)
+    if strategy != 'mode':
+        raise ValueError(f"Unknown categorical strategy: {strategy!r}")
+    fills = {}
+    for modes in (executor or SERIAL).map_columns(_modes, df, columns):
+        fills.update(modes)
+    return fills
+
+
+def compute_fill_values(df, numeric_strategy='mean', categorical_strategy='mode', null_counts=None, executor=None):
+    """Fill value for every column that has missing values.
+
+    null_counts (e.g. from a cached column profile) saves the isna() pass.
+    """
+    if null_counts is None:
+        null_counts = df.isna().sum()
+    missing = set(null_counts[null_counts > 0].index)
+    fills = numeric_fill_values(df, [c for c in numeric_columns(df) if c in missing], numeric_strategy, executor)
+    fills.update(categorical_fill_values(df, [c for c in categorical_columns(df) if c in missing],
+                                         categorical_strategy, executor))
+    return fills
+
+
+def _prepare_columns(df, fills):
+    """Widen columns whose dtype cannot hold their fill value (done on df in place)"""
+    for col, value in fills.items():
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if value not in series.cat.categories:
+                df[col] = series.cat.add_categories([value])
+        elif pd.api.types.is_integer_dtype(series) and pd.api.types.is_extension_array_dtype(series):
+            # Nullable ints from ingest: a fractional mean/median needs a float column
+            if pd.notna(value) and value != int(value):
+                df[col] = series.astype('float64')
+
+
+def _filled_float_blocks(df, groups, fills):
+    """One filled copy per float dtype: NaNs replaced by each column's fill value"""
+    blocks = []
+    for dtype, cols in groups.items():
+        values = df[cols].to_numpy(dtype=dtype, copy=True)
+        fill_row = np.array([fills[col] for col in cols], dtype=dtype)
+        np.copyto(values, np.broadcast_to(fill_row, values.shape), where=np.isnan(values))
+        blocks.append(pd.DataFrame(values, columns=cols, index=df.index))
+    return blocks
+
+
+def apply_fill_values(df, fills, copy=True):
+    """Fill missing values from a {column: value} mapping"""
+    if not fills:
+        return df.copy(deep=not copy_on_write_enabled()) if copy else df
+
+    groups, others = _float_groups(df, list(fills))
+    if not df.columns.is_unique:
+        groups, others = {}, list(fills)
+    rest = {col: fills[col] for col in others}
+    blocks = _filled_float_blocks(df, groups, fills)
+
+    if not copy:
+        for block in blocks:
+            df[list(block.columns)] = block
+        _prepare_columns(df, rest)
+        if rest:
+            df.fillna(rest, inplace=True)
+        return df
+
+    # Untouched columns are carried over as-is; only filled columns are new arrays
+    filled_cols = [col for cols in groups.values() for col in cols]
+    result = df.drop(columns=filled_cols) if filled_cols else df.copy(deep=False)
+    _prepare_columns(result, rest)
+    if rest:
+        result = result.fillna(rest)
+    if blocks:
+        result = pd.concat([result, *blocks], axis=1)[df.columns]
+    return result
+
+
+def clean_data(df, numeric_strategy='mean', categorical_strategy='mode', copy=True, null_counts=None, executor=None):
+    """Clean the dataset based on user preferences.
+
+    With copy=False the frame is filled in place and returned; the default
+    returns a new frame which, under Copy-on-Write, shares unchanged columns
+    with df.
+    """
+    fills = compute_fill_values(df, numeric_strategy, categorical_strategy, null_counts, executor)
+    return apply_fill_values(df, fills, copy=copy)
+
+
+def refill_columns(raw, cleaned, fills):
+    """Copy of an already cleaned frame with only the given columns re-filled from the raw data"""
+    refilled = apply_fill_values(raw[list(fills)], fills)
+    result = cleaned.copy(deep=False)
+    for col in fills:
+        result[col] = refilled[col]
+    return result
+
+
+class CleaningCache:
+    """Cleaned frames and their fill values, keyed by dataset version and strategy.
+
+    Fill values are stored separately for the numeric and the categorical
+    columns, so switching one strategy (e.g. mean -> median) re-fills only
+    that group of columns on top of a cached result that used the other
+    strategy unchanged.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=2 * 1024 ** 3):
+        self.results = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.fills = LRUCache(max_entries=max_entries * 8, max_bytes=256 * 1024 ** 2)
+
+    def _missing_columns(self, key, df, null_counts):
+        def split():
+            counts = df.isna().sum() if null_counts is None else null_counts
+            missing = set(counts[counts > 0].index)
+            return ([c for c in numeric_columns(df) if c in missing],
+                    [c for c in categorical_columns(df) if c in missing])
+        return self.fills.get_or_create((key, 'missing'), split)
+
+    def fill_values(self, key, df, numeric_strategy, categorical_strategy, null_counts=None, executor=None,
+                    fills=None):
+        """(numeric fills, categorical fills) for one dataset version, computed once per strategy.
+
+        fills (e.g. read off an approximate profile) is split instead of reducing the columns again.
+        """
+        numeric_missing, categorical_missing = self._missing_columns(key, df, null_counts)
+        if fills is not None:
+            return ({col: fills[col] for col in numeric_missing if col in fills},
+                    {col: fills[col] for col in categorical_missing if col in fills})
+        numeric = self.fills.get_or_create(
+            (key, 'numeric', numeric_strategy),
+            lambda: numeric_fill_values(df, numeric_missing, numeric_strategy, executor))
+        categorical = self.fills.get_or_create(
+            (key, 'categorical', categorical_strategy),
+            lambda: categorical_fill_values(df, categorical_missing, categorical_strategy, executor))
+        return numeric, categorical
+
+    def get(self, key, numeric_strategy, categorical_strategy):
+        """The cached cleaned frame, or None"""
+        return self.results.get((key, numeric_strategy, categorical_strategy))
+
+    def discard(self, cleaned):
+        """Drop a cleaned frame from the cache (e.g. once it has been spilled to disk)"""
+        return self.results.discard(cleaned)
+
+    def clean(self, key, df, numeric_strategy='mean', categorical_strategy='mode', null_counts=None, executor=None,
+              fills=None):
+        """Cleaned version of df (dataset version `key`), reusing cached work where possible"""
+        return self.results.get_or_create(
+            (key, numeric_strategy, categorical_strategy),
+            lambda: self._build(key, df, numeric_strategy, categorical_strategy, null_counts, executor, fills))
+
+    def _build(self, key, df, numeric_strategy, categorical_strategy, null_counts, executor, fills):
+        numeric, categorical = self.fill_values(key, df, numeric_strategy, categorical_strategy, null_counts,
+                                                executor, fills)
+        for cached_key, cached_numeric, cached_categorical in reversed(self.results.keys()):
+            if cached_key != key:
+                continue
+            base = self.results.get((cached_key, cached_numeric, cached_categorical))
+            if base is None:
+                continue
+            # Same categorical strategy: only the numeric columns differ, and vice versa
+            if cached_categorical == categorical_strategy:
+                return refill_columns(df, base, numeric)
+            if cached_numeric == numeric_strategy:
+                return refill_columns(df, base, categorical)
+        return apply_fill_values(df, {**numeric, **categorical})
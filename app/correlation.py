@@ -0,0 +1,203 @@
+"""
+Correlation engine for wide numeric data.
+
+The matrix is accumulated from row blocks with NumPy matrix products (sums,
+cross-products and, when values are missing, pairwise observation counts).
+Each block is converted to NumPy on its own, so Pearson's working memory is
+one block of rows plus a few p x p accumulators, and pandas' per-pair loop is
+avoided; Spearman also holds a float64 copy of the ranked columns. Missing values are handled pairwise like
+DataFrame.corr(). Spearman is Pearson on per-column average ranks; with missing
+values the ranks are taken over each column's own observations rather than
+per pair, a close approximation of pandas' exact per-pair ranking. Pearson
+sums can be extended with rows appended to the data later; ranks cannot.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_METHODS = ["pearson", "spearman"]
+
+# Pairs at or above this |r| are reported as strong
+STRONG_CORRELATION = 0.5
+# Heatmaps with more columns show only the most correlated ones, clustered
+HEATMAP_MAX_COLUMNS = 30
+# Heatmaps with more columns than this drop the per-cell numbers
+ANNOTATE_MAX_COLUMNS = 15
+# Working memory for one block of rows
+BLOCK_BYTES = 128 * 1024 ** 2
+
+
+def block_rows(n_cols, block_bytes=BLOCK_BYTES, itemsize=8):
+    """Rows per block so that the working arrays of one block fit in block_bytes"""
+    # Four working arrays of block_rows x n_cols each
+    return max(1, block_bytes // max(1, 4 * n_cols * itemsize))
+
+
+class CorrelationAccumulator:
+    """Pairwise correlation sums accumulated over row blocks of a 2-D float array.
+
+    Blocks are centred on `center` (e.g. the column means) to keep the sums
+    small. With has_missing=False every value must be present, which skips
+    the pairwise count products.
+    """
+
+    def __init__(self, columns, center, dtype=np.float64, has_missing=True):
+        p = len(columns)
+        self.columns = columns
+        self.center = np.asarray(center, dtype=np.float64)
+        self.dtype = dtype
+        self.has_missing = has_missing
+        self.n_rows = 0
+        self.xy = np.zeros((p, p), dtype=dtype)
+        if has_missing:
+            self.counts = np.zeros((p, p), dtype=dtype)
+            self.sums = np.zeros((p, p), dtype=dtype)      # sums[i, j]: sum of x_i where x_j is present
+            self.squares = np.zeros((p, p), dtype=dtype)
+        else:
+            self.col_sums = np.zeros(p, dtype=dtype)
+            self.col_squares = np.zeros(p, dtype=dtype)
+
+    @property
+    def nbytes(self):
+        arrays = (self.xy, self.counts, self.sums, self.squares) if self.has_missing else (
+            self.xy, self.col_sums, self.col_squares)
+        return sum(array.nbytes for array in arrays)
+
+    def _track_missing(self):
+        """Switch to pairwise sums, for blocks with missing values after complete ones"""
+        p = len(self.columns)
+        self.counts = np.full((p, p), self.n_rows, dtype=self.dtype)
+        self.sums = np.repeat(self.col_sums[:, None], p, axis=1)
+        self.squares = np.repeat(self.col_squares[:, None], p, axis=1)
+        del self.col_sums, self.col_squares
+        self.has_missing = True
+
+    def add(self, values):
+        dtype = self.dtype
+        block = (values - self.center).astype(dtype, copy=False)
+        if not self.has_missing and np.isnan(block).any():
+            self._track_missing()
+        self.n_rows += len(block)
+        if self.has_missing:
+            present = ~np.isnan(block)
+            block = np.where(present, block, 0).astype(dtype, copy=False)
+            mask = present.astype(dtype)
+            self.xy += block.T @ block
+            self.counts += mask.T @ mask
+            self.sums += block.T @ mask
+            self.squares += (block * block).T @ mask
+        else:
+            self.xy += block.T @ block
+            self.col_sums += block.sum(axis=0)
+            self.col_squares += (block * block).sum(axis=0)
+
+    def result(self, min_periods=2):
+        p = len(self.columns)
+        if self.has_missing:
+            counts, sums, squares = self.counts, self.sums, self.squares
+        else:
+            counts = np.full((p, p), self.n_rows, dtype=self.dtype)
+            sums = np.broadcast_to(self.col_sums[:, None], (p, p))
+            squares = np.broadcast_to(self.col_squares[:, None], (p, p))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = counts * self.xy - sums * sums.T
+            var_x = counts * squares - sums * sums
+            result = cov / np.sqrt(var_x * var_x.T)
+        result = np.clip(result.astype(np.float64), -1.0, 1.0)
+        result[counts < min_periods] = np.nan
+        # Constant columns have no defined correlation, not even with themselves
+        np.fill_diagonal(result, np.where(np.diag(var_x) > 0, 1.0, np.nan))
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
+
+    def extend(self, df, block_bytes=BLOCK_BYTES):
+        """Copy of the (Pearson) accumulator with the rows of df's numeric columns added"""
+        extended = copy.deepcopy(self)
+        step = block_rows(len(self.columns), block_bytes, np.dtype(self.dtype).itemsize)
+        for block in _row_blocks(df[list(self.columns)], step):
+            extended.add(block)
+        return extended
+
+
+def _row_blocks(df, step):
+    """df as float64 arrays of up to step rows, converted one block at a time"""
+    for start in range(0, len(df), step):
+        yield df.iloc[start:start + step].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def correlation_accumulator(df, method='pearson', dtype=np.float64, block_bytes=BLOCK_BYTES):
+    """CorrelationAccumulator over the numeric columns of df"""
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method!r}")
+    numeric = df.select_dtypes(include=[np.number])
+    columns = numeric.columns
+    p = len(columns)
+    if method == 'spearman':
+        numeric = numeric.rank(method='average')
+
+    # Centering first keeps the sums small, which matters in float32
+    center = np.nan_to_num(numeric.mean().to_numpy(dtype=np.float64, na_value=np.nan))
+    # Starts without pairwise counts; add() switches on at the first missing value
+    accumulator = CorrelationAccumulator(columns, center, dtype, has_missing=False)
+    step = block_rows(p, block_bytes, np.dtype(dtype).itemsize)
+    for block in _row_blocks(numeric, step):
+        accumulator.add(block)
+    return accumulator
+
+
+def correlation_matrix(df, method='pearson', dtype=np.float64, min_periods=2, block_bytes=BLOCK_BYTES):
+    """Correlation matrix of the numeric columns of df as a DataFrame.
+
+    dtype=np.float32 halves memory and roughly doubles matrix-product speed
+    at about 1e-6 precision.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method!r}")
+    columns = df.select_dtypes(include=[np.number]).columns
+    if len(columns) == 0:
+        return pd.DataFrame(index=columns, columns=columns, dtype=np.float64)
+    return correlation_accumulator(df, method, dtype, block_bytes).result(min_periods)
+
+
+def top_pairs(matrix, k=20, threshold=STRONG_CORRELATION):
+    """The k strongest (col1, col2, r) pairs with |r| >= threshold, strongest first"""
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_values = values[rows, cols]
+    strength = np.abs(pair_values)
+    keep = np.flatnonzero(strength >= threshold)  # NaN never passes
+    if k is not None and len(keep) > k:
+        keep = keep[np.argpartition(-strength[keep], k - 1)[:k]]
+    keep = keep[np.argsort(-strength[keep], kind='stable')]
+    labels = matrix.columns
+    return [(labels[rows[i]], labels[cols[i]], float(pair_values[i])) for i in keep]
+
+
+def cluster_order(matrix):
+    """Column order that places correlated columns next to each other.
+
+    Spectral seriation: columns are sorted by the Fiedler vector of the
+    |r| similarity graph, which needs one symmetric eigendecomposition.
+    """
+    similarity = np.nan_to_num(np.abs(matrix.to_numpy()))
+    if len(similarity) < 3:
+        return list(matrix.columns)
+    laplacian = np.diag(similarity.sum(axis=1)) - similarity
+    _, vectors = np.linalg.eigh(laplacian)
+    return list(matrix.columns[np.argsort(vectors[:, 1], kind='stable')])
+
+
+def heatmap_matrix(matrix, max_columns=HEATMAP_MAX_COLUMNS):
+    """The matrix to draw: all columns, or the max_columns most correlated ones, clustered"""
+    if len(matrix.columns) <= max_columns:
+        return matrix
+    strength = np.nan_to_num(np.abs(matrix.to_numpy()))
+    np.fill_diagonal(strength, 0)
+    # Rank columns by their strongest few correlations
+    depth = min(5, len(strength) - 1)
+    score = -np.sort(-strength, axis=1)[:, :depth].sum(axis=1)
+    chosen = matrix.columns[np.sort(np.argpartition(-score, max_columns - 1)[:max_columns])]
+    subset = matrix.loc[chosen, chosen]
+    order = cluster_order(subset)
+    return subset.loc[order, order]
@@ -1,54 +1,557 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-try:
-    import seaborn as sns
-    print("✅ Seaborn is installed")
-except ImportError as e:
-    print(f"❌ Seaborn not found: {e}")
-
-import matplotlib.pyplot as plt
-from fpdf import FPDF
-# import ollama  # For LLM Insights
-import json
-import io
-import base64
 from datetime import datetime
 import os
+import sys
+import tempfile
+import uuid
 
-# Set page config
-st.set_page_config(
-    page_title="EDA-GenAI Dashboard by Mubasshir Ahmed",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Sibling modules must import the same way under `streamlit run app/eda_dashboard.py` and streamlit_app.py
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
 
-# Load custom CSS
-def load_css():
-    try:
-        with open('assets/css/custom_style.css') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-    except FileNotFoundError:
-        # Fallback to inline CSS if file not found
-        st.markdown("""
-        <style>
+from append import AppendIndex, extend_dataset
+from browser import PAGE_SIZES, BrowserIndex, page_count
+from cache import LRUCache, content_hash
+from cleaning import CATEGORICAL_STRATEGIES, NUMERIC_STRATEGIES, CleaningCache, enable_copy_on_write
+from engines import (ENGINE_FORMATS, ENGINE_LABELS, ENGINES, PandasEngine, as_engine, available_engines,
+                     convert_to_parquet, profile_fill_values, write_upload)
+from ingest import read_csv_chunked
+from parallel import PARALLEL_MODES, ColumnExecutor
+from jobs import ERROR as JOB_ERROR, JobError, JobQueue
+from memory import MemoryBudgetError, SessionMemory, changed_columns
+from metrics import METRICS
+from llm import CANCELLED, ERROR, TIMEOUT, InsightService, LLMError, ResponseCache
+from plotting import (DISPLAY_DPI, EXPORT_DPI, EXPORT_FACECOLOR, IMAGE_FORMATS, LARGE_DATA_ROWS, PLOT_THEME, PLOT_TYPES,
+                      is_large, render_plot)
+from plotly_plots import PLOTLY_FORMATS, figure_from_json, plotly_available, render_plotly
+from correlation import CORRELATION_METHODS, correlation_accumulator, top_pairs
+from profiling import extend_profile
+from prompting import PROMPT_VERSION, build_prompt
+from report import write_report
+from storage import COLUMNAR_EXTENSIONS, EXPORT_FORMATS, DatasetStore, columnar_available, file_format, read_columnar
+
+# Dataset cache limits (shared by all sessions of this server process)
+DATASET_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_DATASET_CACHE_ENTRIES", 8))
+DATASET_CACHE_MAX_MB = int(os.environ.get("EDA_DATASET_CACHE_MB", 2048))
+# Rows per chunk when ingesting uploads
+INGEST_CHUNKSIZE = int(os.environ.get("EDA_INGEST_CHUNKSIZE", 250_000))
+# Parsed datasets are persisted here as Arrow IPC so restarts and cache evictions skip re-parsing
+DATA_STORE_DIR = os.environ.get("EDA_DATA_STORE", os.path.join(os.path.dirname(APP_DIR), ".eda_cache", "datasets"))
+DATA_STORE_MAX_MB = int(os.environ.get("EDA_DATA_STORE_MB", 10240))
+# CSV uploads remembered so that a later upload of the same file with rows appended only parses the new rows
+APPEND_INDEX_MAX_ENTRIES = int(os.environ.get("EDA_APPEND_INDEX_ENTRIES", 64))
+# Column profiles kept in memory (one per dataset version)
+PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_PROFILE_CACHE_ENTRIES", 32))
+# Cleaned frames kept per (dataset, numeric strategy, categorical strategy)
+CLEANING_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_CLEANING_CACHE_ENTRIES", 16))
+CLEANING_CACHE_MAX_MB = int(os.environ.get("EDA_CLEANING_CACHE_MB", 1024))
+# Correlation matrices kept per (dataset version, method); float32 halves their compute memory
+CORRELATION_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_CORRELATION_CACHE_ENTRIES", 16))
+# Strongest pairs listed in the basic insights
+TOP_CORRELATION_PAIRS = int(os.environ.get("EDA_TOP_CORRELATION_PAIRS", 20))
+CORRELATION_DTYPE = np.dtype(os.environ.get("EDA_CORRELATION_DTYPE", "float64"))
+# Rendered plot images and Plotly figures (display and exports)
+FIGURE_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_FIGURE_CACHE_ENTRIES", 128))
+FIGURE_CACHE_MAX_MB = int(os.environ.get("EDA_FIGURE_CACHE_MB", 256))
+# Sort orders and filter masks behind the data browser (an int64 per row each)
+BROWSER_CACHE_MAX_ENTRIES = int(os.environ.get("EDA_BROWSER_CACHE_ENTRIES", 64))
+BROWSER_CACHE_MAX_MB = int(os.environ.get("EDA_BROWSER_CACHE_MB", 1024))
+# Columns shown by default in the data browser
+BROWSER_DEFAULT_COLUMNS = 30
+
+# Datasets sessions keep between reruns (raw and cleaned, shared columns counted once): cap per session,
+# budget across all sessions, and idle time after which a session's frames are spilled to the data store
+SESSION_MEMORY_MAX_MB = int(os.environ.get("EDA_SESSION_MEMORY_MB", 2048))
+SESSIONS_MEMORY_MAX_MB = int(os.environ.get("EDA_SESSIONS_MEMORY_MB", 4096))
+SESSION_IDLE_MINUTES = float(os.environ.get("EDA_SESSION_IDLE_MINUTES", 10))
+
+# Background jobs (cleaning, plots and their exports, PDF reports): jobs run at once per process, memory
+# for finished results, how long a click waits for a quick job before showing progress, and the polling interval
+JOB_WORKERS = int(os.environ.get("EDA_JOB_WORKERS", 4))
+JOB_RESULTS_MAX_MB = int(os.environ.get("EDA_JOB_RESULTS_MB", 512))
+JOB_INLINE_SECONDS = float(os.environ.get("EDA_JOB_INLINE_SECONDS", 0.5))
+JOB_POLL_SECONDS = float(os.environ.get("EDA_JOB_POLL_SECONDS", 0.5))
+
+# PDF reports are built in memory up to this size, then in a temporary file
+REPORT_SPOOL_MB = int(os.environ.get("EDA_REPORT_SPOOL_MB", 16))
+
+# Datasets with at least this many rows are profiled with mergeable sketches by default (approximate
+# quantiles, distinct counts and top values in one streaming pass); the sidebar toggle can turn it off.
+# Smaller datasets are always profiled exactly: below about 3M rows the sketches' fixed per-chunk cost makes
+# them slower than the exact profile and use more memory (benchmarks/bench_sketches.py)
+APPROXIMATE_MIN_ROWS = int(os.environ.get("EDA_APPROXIMATE_MIN_ROWS", 3_000_000))
+
+# Stage timings (Performance panel): JSON-lines log (rotated at EDA_METRICS_LOG_MB), Prometheus text file for
+# scraping, and how often that file is rewritten; an empty path turns that output off
+METRICS_LOG = os.environ.get("EDA_METRICS_LOG", os.path.join(os.path.dirname(APP_DIR), ".eda_cache", "metrics.jsonl"))
+METRICS_LOG_MAX_MB = float(os.environ.get("EDA_METRICS_LOG_MB", 10))
+METRICS_FILE = os.environ.get("EDA_METRICS_FILE", os.path.join(os.path.dirname(APP_DIR), ".eda_cache", "metrics.prom"))
+METRICS_WRITE_SECONDS = float(os.environ.get("EDA_METRICS_WRITE_SECONDS", 5))
+
+# Column-parallel profiling and cleaning: worker count (default: every core) and pool type
+# (thread: NumPy reductions release the GIL; process: also parallelises object columns)
+PARALLEL_WORKERS = int(os.environ.get("EDA_WORKERS", os.cpu_count() or 1))
+PARALLEL_MODE = os.environ.get("EDA_PARALLEL_MODE", "thread")
+
+# Execution engine selected by default: pandas (in memory), duckdb or polars (out-of-core, when installed)
+DEFAULT_ENGINE = os.environ.get("EDA_ENGINE", "pandas")
+# Files on the server the out-of-core engines can open without an upload
+SERVER_DATA_DIR = os.environ.get("EDA_SERVER_DATA_DIR", os.path.join(os.path.dirname(APP_DIR), "data"))
+# DuckDB memory limit (e.g. "4GB"; empty = DuckDB's default of 80% of RAM) and where it spills to disk
+DUCKDB_MEMORY_LIMIT = os.environ.get("EDA_DUCKDB_MEMORY_LIMIT", "")
+DUCKDB_TEMP_DIR = os.environ.get("EDA_DUCKDB_TEMP_DIR", os.path.join(os.path.dirname(APP_DIR), ".eda_cache", "duckdb_tmp"))
+
+# LLM insights: Ollama-compatible server, model, overall and per-chunk timeouts, concurrent chats per process
+OLLAMA_ENDPOINT = os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "mistral")
+LLM_TIMEOUT_SECONDS = float(os.environ.get("EDA_LLM_TIMEOUT", 180))
+LLM_READ_TIMEOUT_SECONDS = float(os.environ.get("EDA_LLM_READ_TIMEOUT", 60))
+LLM_MAX_CONCURRENT = int(os.environ.get("EDA_LLM_MAX_CONCURRENT", 2))
+# Finished answers are cached on disk per (prompt, model, prompt version)
+LLM_CACHE_DIR = os.environ.get("EDA_LLM_CACHE", os.path.join(os.path.dirname(APP_DIR), ".eda_cache", "llm"))
+LLM_CACHE_TTL_HOURS = float(os.environ.get("EDA_LLM_CACHE_TTL_HOURS", 7 * 24))
+LLM_CACHE_MAX_MB = int(os.environ.get("EDA_LLM_CACHE_MB", 50))
+# Prompt size limit (estimated tokens) and the prompt-processing speed used for the prefill estimate
+LLM_TOKEN_BUDGET = int(os.environ.get("EDA_LLM_TOKEN_BUDGET", 2000))
+LLM_PREFILL_TOKENS_PER_SECOND = float(os.environ.get("EDA_LLM_PREFILL_TPS", 150))
+# How often the insights tab refreshes while tokens are streaming in
+LLM_POLL_SECONDS = float(os.environ.get("EDA_LLM_POLL_SECONDS", 0.5))
+
+# Cleaned frames share untouched columns with the raw frame instead of copying them
+enable_copy_on_write()
+
+# Page styling, read once per process
+CSS_PATH = os.path.join(os.path.dirname(APP_DIR), 'assets', 'css', 'custom_style.css')
+FALLBACK_CSS = """
         .main .block-container { padding-top: 2rem; padding-bottom: 2rem; }
         .stButton > button { background-color: #FF6B6B; color: white; border: none; border-radius: 8px; padding: 0.5rem 1rem; font-weight: 600; }
         .stButton > button:hover { background-color: #FF5252; transform: translateY(-2px); box-shadow: 0 4px 8px rgba(255, 107, 107, 0.3); }
         .insight-card { background: linear-gradient(135deg, #2C3E50 0%, #34495E 100%); border-radius: 12px; padding: 1.5rem; margin: 1rem 0; border-left: 4px solid #FF6B6B; }
-        </style>
-        """, unsafe_allow_html=True)
+"""
 
-load_css()
+# Per-session state and its initial values
+SESSION_DEFAULTS = {
+    'data_key': None,
+    'cleaned_key': None,
+    'cleaned_strategies': None,
+    'clean_job': None,
+    'pdf_job': None,
+    'insight_job': None,
+    'insight_prompt': None,
+}
 
-# Initialize session state
-if 'data' not in st.session_state:
-    st.session_state.data = None
-if 'cleaned_data' not in st.session_state:
-    st.session_state.cleaned_data = None
+@st.cache_resource
+def read_css():
+    """Custom CSS, falling back to inline CSS if the file is not found"""
+    try:
+        with open(CSS_PATH) as f:
+            return f.read()
+    except FileNotFoundError:
+        return FALLBACK_CSS
+
+# Load custom CSS
+def load_css():
+    st.markdown(f'<style>{read_css()}</style>', unsafe_allow_html=True)
+
+def setup_page():
+    """Page config, CSS and session defaults; runs at the start of every script run"""
+    st.set_page_config(
+        page_title="EDA-GenAI Dashboard by Mubasshir Ahmed",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    load_css()
+    # Initialize session state
+    for name, value in SESSION_DEFAULTS.items():
+        if name not in st.session_state:
+            st.session_state[name] = value
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
 # Utility functions
+@st.cache_resource
+def get_dataset_cache():
+    """Process-wide cache of parsed datasets, keyed by content hash"""
+    return LRUCache(max_entries=DATASET_CACHE_MAX_ENTRIES, max_bytes=DATASET_CACHE_MAX_MB * 1024 ** 2)
+
+@st.cache_resource
+def get_dataset_store():
+    """On-disk Arrow store backing the dataset cache; files scanned by cached engines are never pruned"""
+    dataset_cache = get_dataset_cache()
+    in_use = lambda: [value.path for value in dataset_cache.values() if isinstance(getattr(value, 'path', None), str)]
+    return DatasetStore(DATA_STORE_DIR, max_bytes=DATA_STORE_MAX_MB * 1024 ** 2, in_use=in_use)
+
+@st.cache_resource
+def get_metrics():
+    """Process-wide stage metrics, configured once with this server's log and Prometheus file"""
+    return METRICS.configure(METRICS_LOG, METRICS_FILE, write_interval=METRICS_WRITE_SECONDS,
+                             log_max_bytes=int(METRICS_LOG_MAX_MB * 1024 ** 2))
+
+@st.cache_resource
+def get_append_index():
+    """Process-wide record of loaded CSV uploads, for spotting uploads that append rows to one"""
+    return AppendIndex(max_entries=APPEND_INDEX_MAX_ENTRIES)
+
+@st.cache_resource
+def get_profile_cache():
+    """Process-wide cache of column profiles, keyed by dataset version"""
+    return LRUCache(max_entries=PROFILE_CACHE_MAX_ENTRIES, max_bytes=256 * 1024 ** 2)
+
+@st.cache_resource
+def get_cleaning_cache():
+    """Process-wide cache of cleaned frames and their fill values"""
+    return CleaningCache(max_entries=CLEANING_CACHE_MAX_ENTRIES, max_bytes=CLEANING_CACHE_MAX_MB * 1024 ** 2)
+
+@st.cache_resource
+def get_session_memory():
+    """Process-wide accounting of the datasets sessions hold, spilling idle ones to disk"""
+    return SessionMemory(max_bytes=SESSIONS_MEMORY_MAX_MB * 1024 ** 2, session_max_bytes=SESSION_MEMORY_MAX_MB * 1024 ** 2,
+                         idle_seconds=SESSION_IDLE_MINUTES * 60, spill=spill_dataset)
+
+def spill_dataset(session, name, key, frame):
+    """Persist a frame dropped from memory and release it from the shared caches unless another session holds it.
+
+    Raw datasets are stored whole (unless already stored), cleaned ones only
+    as the columns they do not share with the raw data.
+    """
+    # Engines over files on disk hold no data
+    if not isinstance(frame, pd.DataFrame):
+        return
+    store, dataset_cache = get_dataset_store(), get_dataset_cache()
+    if key not in store:
+        if name == 'cleaned':
+            raw = dataset_cache.get(key.split('|clean:')[0])
+            store.save(key, frame[changed_columns(frame, raw)])
+        else:
+            store.save(key, frame)
+    if get_session_memory().held_elsewhere(key, session):
+        return
+    if name == 'cleaned':
+        get_cleaning_cache().discard(frame)
+    else:
+        dataset_cache.discard(frame)
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide pool running heavy work off the script thread, shared and de-duplicated across sessions"""
+    return JobQueue(max_workers=JOB_WORKERS, max_result_bytes=JOB_RESULTS_MAX_MB * 1024 ** 2)
+
+def submit_job(key, fn, label, cache=True, wait=JOB_INLINE_SECONDS):
+    """Queue fn(job) under key and give it `wait` seconds, so quick jobs finish within this run.
+
+    fn runs on a worker thread: it must not call st.* functions, so shared
+    caches are resolved by the caller.
+    """
+    job = get_job_queue().submit(key, fn, label=label, cache=cache)
+    if wait:
+        job.wait(wait)
+    return job
+
+def session_job(name, key, fn, label, cache=True, wait=JOB_INLINE_SECONDS):
+    """This session's job `name`, submitted again only when its key changes"""
+    jobs = st.session_state.setdefault('jobs', {})
+    job = jobs.get(name)
+    if job is None or job.key != key:
+        job = jobs[name] = submit_job(key, fn, label, cache=cache, wait=wait)
+    return job
+
+def show_job_progress(job):
+    """Progress of a background job, polled in a fragment; the whole app reruns once it finishes"""
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def render():
+        if job.done:
+            st.rerun()
+        st.progress(job.progress, text=f"⏳ {job.message or job.label}... {job.elapsed:.0f}s")
+
+    render()
+
+@st.cache_resource
+def get_column_executor():
+    """Process-wide worker pool for column-parallel profiling and cleaning"""
+    mode = PARALLEL_MODE if PARALLEL_MODE in PARALLEL_MODES else "thread"
+    return ColumnExecutor(workers=PARALLEL_WORKERS, mode=mode)
+
+@st.cache_resource
+def get_browser_index():
+    """Process-wide cache of data browser sort orders and filters"""
+    return BrowserIndex(max_entries=BROWSER_CACHE_MAX_ENTRIES, max_bytes=BROWSER_CACHE_MAX_MB * 1024 ** 2)
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of rendered plot images"""
+    return LRUCache(max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_MB * 1024 ** 2)
+
+@st.cache_resource
+def get_correlation_cache():
+    """Process-wide cache of correlation matrices"""
+    return LRUCache(max_entries=CORRELATION_CACHE_MAX_ENTRIES, max_bytes=512 * 1024 ** 2)
+
+def correlation_sums_key(key):
+    return (key, 'pearson', 'sums', CORRELATION_DTYPE.name)
+
+def get_correlation(key, data, method='pearson', cache=None):
+    """Correlation matrix for one dataset version (a DataFrame or engine), computed once per method.
+
+    The Pearson sums of in-memory data are cached too, so rows appended to
+    the data later extend them instead of starting over.
+    """
+    cache = cache or get_correlation_cache()
+
+    def compute():
+        engine = as_engine(data)
+        if method == 'pearson' and isinstance(engine, PandasEngine):
+            sums = cache.get_or_create(correlation_sums_key(key),
+                                       lambda: correlation_accumulator(engine.df, dtype=CORRELATION_DTYPE))
+            return sums.result()
+        return engine.correlation(method, dtype=CORRELATION_DTYPE)
+
+    return METRICS.cached('correlation', cache, (key, method, CORRELATION_DTYPE.name), compute,
+                          shape=lambda matrix: (as_engine(data).n_rows, len(matrix)))
+
+def _plot_correlation(df, data_key, plot_type, method, cache):
+    return get_correlation(data_key, df, method, cache) if plot_type == "Correlation Heatmap" else None
+
+def get_plot_image(figure_cache, df, data_key, plot_type, x_col, y_col, fmt='png', dpi=DISPLAY_DPI, facecolor='auto',
+                   method='pearson', correlation_cache=None):
+    """Rendered plot bytes, keyed by (dataset version, plot type, columns, theme, format)"""
+    key = (data_key, plot_type, x_col, y_col, method, PLOT_THEME, fmt, dpi)
+    return METRICS.cached('plot_image', figure_cache, key, lambda: render_plot(
+        df, plot_type, x_col, y_col, fmt, dpi, facecolor,
+        correlation=_plot_correlation(df, data_key, plot_type, method, correlation_cache)))
+
+def get_plotly_figure(figure_cache, df, data_key, plot_type, x_col, y_col, fmt='json', method='pearson',
+                      correlation_cache=None):
+    """Serialized Plotly figure, cached alongside the static images"""
+    key = (data_key, plot_type, x_col, y_col, method, 'plotly', fmt)
+    return METRICS.cached('plotly_figure', figure_cache, key, lambda: render_plotly(
+        df, plot_type, x_col, y_col, fmt, correlation=_plot_correlation(df, data_key, plot_type, method, correlation_cache)))
+
+@st.cache_resource
+def get_insight_service():
+    """Process-wide pool that runs LLM chats off the script thread"""
+    cache = ResponseCache(LLM_CACHE_DIR, ttl_seconds=LLM_CACHE_TTL_HOURS * 3600, max_bytes=LLM_CACHE_MAX_MB * 1024 ** 2)
+    return InsightService(endpoint=OLLAMA_ENDPOINT, max_workers=LLM_MAX_CONCURRENT, read_timeout=LLM_READ_TIMEOUT_SECONDS,
+                          cache=cache)
+
+def get_profile(key, data, approximate=False):
+    """Column profile for one dataset version, computed once and shared by all tabs"""
+    shape = lambda profile: (profile.n_rows, profile.n_cols)
+    if approximate:
+        return METRICS.cached('profile_approximate', get_profile_cache(), f"{key}|approx",
+                              lambda: as_engine(data).profile(approximate=True), shape=shape)
+    return METRICS.cached('profile', get_profile_cache(), key, lambda: as_engine(data).profile(), shape=shape)
+
+def engine_options(name):
+    """Connection options for an out-of-core engine"""
+    if name == 'duckdb':
+        return {'memory_limit': DUCKDB_MEMORY_LIMIT, 'temp_directory': DUCKDB_TEMP_DIR}
+    return {}
+
+def open_engine(name, key, path):
+    """Out-of-core engine over a Parquet file, opened once per process and shared by all sessions"""
+    if os.path.dirname(os.path.abspath(path)) == os.path.abspath(DATA_STORE_DIR):
+        os.utime(path)  # mark as recently used for the store's prune()
+    return get_dataset_cache().get_or_create((key, name), lambda: ENGINES[name](path, **engine_options(name)))
+
+def upload_key(uploaded_file, **read_options):
+    """(content hash, marker, digests) of an upload; reruns of the same upload and reader skip re-hashing.
+
+    The bytes are hashed once, in the pass that also hashes the prefixes
+    append detection compares (AppendIndex.digests); digests is None when
+    the hash was reused. The marker is stored as data_file_id once the
+    upload has loaded.
+    """
+    # The file_id changes whenever a new file is chosen
+    file_id = getattr(uploaded_file, 'file_id', None)
+    marker = (file_id, tuple(sorted(read_options.items())))
+    if file_id is not None and st.session_state.get('data_file_id') == marker and st.session_state.data_key:
+        return st.session_state.data_key, marker, None
+    with uploaded_file.getbuffer() as buf:
+        digests = get_append_index().digests(buf, **read_options)
+        return content_hash(digests[len(buf)].encode(), **read_options), marker, digests
+
+def extend_cached_state(base_key, key, rows, df):
+    """Cache state for dataset `key` (base_key's data with rows appended) by extending base_key's mergeable state.
+
+    Cached profiles (exact and sketch-based) and Pearson sums are merged
+    with those of the new rows; everything else is computed for the new
+    version on demand.
+    """
+    profiles, executor = get_profile_cache(), get_column_executor()
+    for suffix in ("", "|approx"):
+        base_profile = profiles.get(f"{base_key}{suffix}")
+        if base_profile is not None:
+            profiles.put(f"{key}{suffix}", extend_profile(base_profile, rows, df, executor=executor))
+    correlations = get_correlation_cache()
+    sums = correlations.get(correlation_sums_key(base_key))
+    if sums is not None:
+        sums = correlations.put(correlation_sums_key(key), sums.extend(rows))
+        correlations.put((key, 'pearson', CORRELATION_DTYPE.name), sums.result())
+
+def load_appended_upload(uploaded_file, key, read_options, digests=None):
+    """An upload that appends rows to a recently loaded one, reading only the new rows; None for any other upload"""
+    with uploaded_file.getbuffer() as buf:
+        base = get_append_index().find_base(buf, digests, **read_options)
+        if base is None:
+            return None
+        base_df = get_dataset_cache().get(base.key)
+        if base_df is None:
+            base_df = get_dataset_store().load(base.key)
+        # A changed schema (e.g. text in a numeric column) needs a full read
+        extended = extend_dataset(base_df, buf, base.size) if base_df is not None else None
+    if extended is None:
+        return None
+    rows, df = extended
+    extend_cached_state(base.key, key, rows, df)
+    st.sidebar.info(f"➕ Appended {len(rows):,} new rows to a dataset loaded earlier ({len(base_df):,} rows reused)")
+    return df
+
+def load_uploaded_data(uploaded_file):
+    """Parse an uploaded file once per distinct content; reruns reuse the cached frame"""
+    fmt = file_format(uploaded_file.name)
+    read_options = dict(reader="read_csv_chunked", chunksize=INGEST_CHUNKSIZE, format=fmt)
+    key, marker, digests = upload_key(uploaded_file, **read_options)
+
+    memory, session = get_session_memory(), st.session_state.session_id
+
+    def remember(df):
+        with uploaded_file.getbuffer() as buf:
+            get_append_index().record(key, buf, digests, **read_options)
+        return df
+
+    def parse():
+        # A frame over the session's budget is refused before it is cached for everyone
+        store = get_dataset_store()
+        if fmt in COLUMNAR_EXTENSIONS:
+            df = store.load(key)
+            return memory.check(session, 'data', key, df if df is not None else read_columnar(uploaded_file, fmt))
+        df = store.load(key)
+        if df is not None:
+            return remember(memory.check(session, 'data', key, df))
+        df = load_appended_upload(uploaded_file, key, read_options, digests)
+        if df is None:
+            progress = st.sidebar.progress(0.0, text="Reading file...")
+            try:
+                df = read_csv_chunked(
+                    uploaded_file,
+                    chunksize=INGEST_CHUNKSIZE,
+                    progress_callback=lambda fraction: progress.progress(fraction, text=f"Reading file... {fraction:.0%}"),
+                )
+            finally:
+                progress.empty()
+        memory.check(session, 'data', key, df)
+        store.save(key, df)
+        return remember(df)
+
+    df = METRICS.cached('ingest', get_dataset_cache(), key, parse, shape=lambda df: df.shape)
+    st.session_state.data_file_id = marker
+    return key, df
+
+def load_uploaded_engine(uploaded_file, name):
+    """Store an upload as Parquet once per distinct content and open it with an out-of-core engine"""
+    fmt = file_format(uploaded_file.name)
+    key, marker, _ = upload_key(uploaded_file, reader="parquet", engine=name, format=fmt)
+    path = get_dataset_store().parquet_path(key)
+    if not os.path.exists(path):
+        with st.spinner("Converting to Parquet..."), uploaded_file.getbuffer() as buf:
+            write_upload(buf, fmt, path, engine=name)
+    engine = open_engine(name, key, path)
+    st.session_state.data_file_id = marker
+    return key, engine
+
+def server_files():
+    """Data files in SERVER_DATA_DIR that the out-of-core engines can open"""
+    if not os.path.isdir(SERVER_DATA_DIR):
+        return []
+    return sorted(name for name in os.listdir(SERVER_DATA_DIR)
+                  if not name.startswith('.') and os.path.splitext(name)[1] and file_format(name) in ENGINE_FORMATS)
+
+def load_server_engine(filename, name):
+    """Open a file in SERVER_DATA_DIR; Parquet is scanned in place, other formats are converted once"""
+    path = os.path.join(SERVER_DATA_DIR, os.path.basename(filename))
+    fmt = file_format(path)
+    stat = os.stat(path)
+    # Keyed by path, size and modification time: hashing a file larger than memory would take too long
+    key = content_hash(os.path.abspath(path).encode(), size=stat.st_size, mtime=stat.st_mtime_ns, reader="parquet",
+                       engine=name, format=fmt)
+    if fmt != 'parquet':
+        parquet_path = get_dataset_store().parquet_path(key)
+        if not os.path.exists(parquet_path):
+            with st.spinner(f"Converting {os.path.basename(path)} to Parquet..."):
+                convert_to_parquet(path, fmt, parquet_path, engine=name)
+        path = parquet_path
+    return key, open_engine(name, key, path)
+
+def load_default_engine(name):
+    """The default Titanic dataset behind the chosen engine"""
+    if name == 'pandas':
+        key, df = load_default_dataset()
+        return key, PandasEngine(df, key, get_browser_index(), get_column_executor())
+    path = get_dataset_store().parquet_path("default_titanic")
+    if not os.path.exists(path):
+        load_default_data().to_parquet(path, index=False)
+    key = f"default:titanic:{name}"
+    return key, open_engine(name, key, path)
+
+def cleaned_data_key(data_key, numeric_strategy, categorical_strategy, approximate=False):
+    """Version key of a dataset cleaned with the given strategies"""
+    return f"{data_key}|clean:{numeric_strategy}:{categorical_strategy}" + (":approx" if approximate else "")
+
+def cleaning_task(data_key, engine, numeric_strategy, categorical_strategy, approximate=False):
+    """Function computing the cleaned version of a dataset: a DataFrame in memory, a lazy engine otherwise.
+
+    Shared caches are resolved here, on the script thread, so the function
+    can run as a background job. A frame spilled to the data store is rebuilt
+    from the raw one and the stored (filled) columns instead of being cleaned
+    again. With approximate statistics the fill values are read off the
+    sketch profile rather than reduced from the data again.
+    """
+    cleaned_key = cleaned_data_key(data_key, numeric_strategy, categorical_strategy, approximate)
+    profile = get_profile(data_key, engine, approximate)
+    shape = (profile.n_rows, profile.n_cols)
+    if not isinstance(engine, PandasEngine):
+        # Lazy: the fill values are applied by the engine as rows are scanned
+        dataset_cache = get_dataset_cache()
+        return lambda: METRICS.cached(
+            'clean_data', dataset_cache, (cleaned_key, engine.name),
+            lambda: engine.clean(numeric_strategy, categorical_strategy, profile), shape=lambda _: shape)
+    cache, store, executor = get_cleaning_cache(), get_dataset_store(), get_column_executor()
+    cache_key, fills = data_key, None
+    if profile.approximate:
+        cache_key, fills = f"{data_key}|approx", profile_fill_values(profile, numeric_strategy, categorical_strategy)
+
+    def clean():
+        cleaned = cache.get(cache_key, numeric_strategy, categorical_strategy)
+        if cleaned is not None:
+            METRICS.hit('clean_data')
+            return cleaned
+        stored = store.load(cleaned_key)
+        if stored is not None:
+            METRICS.hit('clean_data')
+            cleaned = engine.df.copy(deep=False)
+            for col in stored.columns:
+                cleaned[col] = stored[col]
+            return cleaned
+        with METRICS.stage('clean_data', *shape, cache='miss'):
+            return cache.clean(cache_key, engine.df, numeric_strategy, categorical_strategy,
+                               null_counts=profile.columns['null_count'], executor=executor, fills=fills)
+
+    return clean
+
+def as_cleaned_engine(cleaned, cleaned_key):
+    """Engine over the result of a cleaning_task"""
+    if isinstance(cleaned, pd.DataFrame):
+        return PandasEngine(cleaned, cleaned_key, get_browser_index(), get_column_executor())
+    return cleaned
+
+def load_default_dataset():
+    """Cached default Titanic dataset"""
+    return "default:titanic", get_dataset_cache().get_or_create("default:titanic", load_default_data)
+
 def load_default_data():
     """Load default Titanic dataset"""
     try:
@@ -62,287 +565,283 @@ def load_default_data():
         import seaborn as sns
         return sns.load_dataset('titanic')
 
-def clean_data(df, numeric_strategy='mean', categorical_strategy='mode'):
-    """Clean the dataset based on user preferences"""
-    df_cleaned = df.copy()
-    
-    # Handle numeric columns
-    numeric_columns = df_cleaned.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        if df_cleaned[col].isnull().sum() > 0:
-            if numeric_strategy == 'mean':
-                df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].mean())
-            elif numeric_strategy == 'median':
-                df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].median())
-            elif numeric_strategy == 'zero':
-                df_cleaned[col] = df_cleaned[col].fillna(0)
-    
-    # Handle categorical columns
-    categorical_columns = df_cleaned.select_dtypes(include=['object']).columns
-    for col in categorical_columns:
-        if df_cleaned[col].isnull().sum() > 0:
-            if categorical_strategy == 'mode':
-                mode_value = df_cleaned[col].mode()[0] if len(df_cleaned[col].mode()) > 0 else 'Unknown'
-                df_cleaned[col] = df_cleaned[col].fillna(mode_value)
-            elif categorical_strategy == 'unknown':
-                df_cleaned[col] = df_cleaned[col].fillna('Unknown')
-    
-    return df_cleaned
+def browser_filter(engine, column, profile):
+    """Filter controls for one column; returns a browser filter spec or None"""
+    if st.checkbox("Only missing values", key="browse_missing"):
+        return ('missing',)
+    if column in profile.numeric_columns:
+        stats = profile.columns.loc[column]
+        if pd.isna(stats['min']):
+            return None
+        low_col, high_col = st.columns(2)
+        with low_col:
+            low = st.number_input("Min", value=float(stats['min']), key=f"browse_low_{column}")
+        with high_col:
+            high = st.number_input("Max", value=float(stats['max']), key=f"browse_high_{column}")
+        if low <= stats['min'] and high >= stats['max']:
+            return None
+        return ('range', low, high)
+    choices = engine.categories(column)
+    if choices is not None:
+        chosen = st.multiselect("Values", choices, key=f"browse_in_{column}")
+        return ('in', tuple(chosen)) if chosen else None
+    text = st.text_input("Contains", key=f"browse_text_{column}")
+    return ('contains', text) if text else None
 
-def generate_plot(df, plot_type, x_col=None, y_col=None):
-    """Generate different types of plots with enhanced styling"""
-    # Set up the plotting style
-    plt.style.use('dark_background')
-    
-    # Create a larger figure with better aspect ratio
-    fig, ax = plt.subplots(figsize=(14, 8))
-    
-    # Set the background color
-    fig.patch.set_facecolor('#0E1117')
-    ax.set_facecolor('#262730')
-    
-    # Color palette for better visual appeal
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
-    
-    if plot_type == "Distribution Plot":
-        if x_col and x_col in df.columns:
-            if df[x_col].dtype in ['int64', 'float64']:
-                # Enhanced histogram with KDE
-                sns.histplot(data=df, x=x_col, kde=True, ax=ax, 
-                           color=colors[0], alpha=0.7, edgecolor='white', linewidth=0.5)
-                ax.set_title(f'Distribution of {x_col}', color='white', fontsize=18, fontweight='bold', pad=20)
-                ax.set_xlabel(x_col, color='white', fontsize=14, fontweight='bold')
-                ax.set_ylabel('Frequency', color='white', fontsize=14, fontweight='bold')
-            else:
-                # Enhanced countplot
-                sns.countplot(data=df, x=x_col, ax=ax, color=colors[0], alpha=0.8)
-                ax.set_title(f'Count of {x_col}', color='white', fontsize=18, fontweight='bold', pad=20)
-                ax.set_xlabel(x_col, color='white', fontsize=14, fontweight='bold')
-                ax.set_ylabel('Count', color='white', fontsize=14, fontweight='bold')
-    
-    elif plot_type == "Boxplot":
-        if x_col and y_col and x_col in df.columns and y_col in df.columns:
-            # Enhanced boxplot
-            sns.boxplot(data=df, x=x_col, y=y_col, ax=ax, color=colors[1], width=0.7)
-            ax.set_title(f'Boxplot: {y_col} by {x_col}', color='white', fontsize=18, fontweight='bold', pad=20)
-            ax.set_xlabel(x_col, color='white', fontsize=14, fontweight='bold')
-            ax.set_ylabel(y_col, color='white', fontsize=14, fontweight='bold')
-    
-    elif plot_type == "Countplot":
-        if x_col and x_col in df.columns:
-            # Enhanced countplot
-            sns.countplot(data=df, x=x_col, ax=ax, color=colors[2], alpha=0.8)
-            ax.set_title(f'Count of {x_col}', color='white', fontsize=18, fontweight='bold', pad=20)
-            ax.set_xlabel(x_col, color='white', fontsize=14, fontweight='bold')
-            ax.set_ylabel('Count', color='white', fontsize=14, fontweight='bold')
+def show_data_browser(engine, profile):
+    """Paginated view of a dataset with projection, sorting and filtering; only the visible page is built"""
+    columns = list(engine.columns)
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        visible = st.multiselect("Columns", columns, default=columns[:BROWSER_DEFAULT_COLUMNS], key="browse_columns")
+    with col2:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="browse_page_size")
     
-    elif plot_type == "Barplot":
-        if x_col and y_col and x_col in df.columns and y_col in df.columns:
-            # Enhanced barplot
-            sns.barplot(data=df, x=x_col, y=y_col, ax=ax, color=colors[3], alpha=0.8)
-            ax.set_title(f'Barplot: {y_col} by {x_col}', color='white', fontsize=18, fontweight='bold', pad=20)
-            ax.set_xlabel(x_col, color='white', fontsize=14, fontweight='bold')
-            ax.set_ylabel(y_col, color='white', fontsize=14, fontweight='bold')
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_column = st.selectbox("Sort by", [None] + columns, format_func=lambda c: "(original order)" if c is None else str(c),
+                                   key="browse_sort")
+    with col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], key="browse_order",
+                             disabled=sort_column is None) == "Ascending"
+    with col3:
+        filter_column = st.selectbox("Filter column", [None] + columns, format_func=lambda c: "(no filter)" if c is None else str(c),
+                                     key="browse_filter_column")
+    with col4:
+        filter_spec = browser_filter(engine, filter_column, profile) if filter_column is not None else None
     
-    elif plot_type == "Correlation Heatmap":
-        numeric_df = df.select_dtypes(include=[np.number])
-        if len(numeric_df.columns) > 1:
-            # Enhanced correlation heatmap
-            correlation_matrix = numeric_df.corr()
-            mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
-            sns.heatmap(correlation_matrix, mask=mask, annot=True, cmap='RdYlBu_r', 
-                       center=0, ax=ax, square=True, linewidths=0.5, cbar_kws={"shrink": .8})
-            ax.set_title('Correlation Heatmap', color='white', fontsize=18, fontweight='bold', pad=20)
+    # In memory, sorting or filtering a large frame happens once per setting and paging only slices the
+    # cached view; out-of-core engines run one LIMIT/OFFSET query per page
+    with st.spinner("Indexing..."):
+        n_matching = engine.count(filter_column, filter_spec)
+    n_pages = page_count(n_matching, page_size)
+    if st.session_state.get('browse_page', 1) > n_pages:
+        st.session_state.browse_page = n_pages
     
-    # Enhanced styling for all plots
-    ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.5)
-    ax.tick_params(colors='white', labelsize=12)
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="browse_page")
+    with col2:
+        start = (page - 1) * page_size
+        st.write("")
+        st.caption(f"Rows {min(start + 1, n_matching):,}–{min(start + page_size, n_matching):,} of {n_matching:,}"
+                   + (f" matching ({len(engine):,} total)" if filter_spec is not None else "") + f" · page {page:,} of {n_pages:,}")
     
-    # Rotate x-axis labels if they're too long
-    if plot_type in ["Countplot", "Barplot", "Boxplot"]:
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-    
-    # Add some padding and tight layout
-    plt.tight_layout(pad=2.0)
-    
-    return fig
+    with st.spinner("Loading rows..."):
+        rows = engine.page(page, page_size, visible or None, sort_column, ascending, filter_column, filter_spec)
+    st.dataframe(rows, use_container_width=True)
 
-def generate_pdf_report(df, cleaned_df):
-    """Generate PDF report"""
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Title
-    pdf.set_font('Arial', 'B', 16)
-    pdf.cell(0, 10, 'EDA Dashboard Report', ln=True, align='C')
-    pdf.ln(10)
-    
-    # Dataset Info
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, 'Dataset Information:', ln=True)
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(0, 10, f'Original Shape: {df.shape}', ln=True)
-    pdf.cell(0, 10, f'Cleaned Shape: {cleaned_df.shape}', ln=True)
-    pdf.cell(0, 10, f'Missing Values: {df.isnull().sum().sum()}', ln=True)
-    pdf.ln(5)
-    
-    # Summary Statistics
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, 'Summary Statistics:', ln=True)
-    pdf.set_font('Arial', '', 8)
-    
-    # Get numeric columns summary
-    numeric_cols = cleaned_df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) > 0:
-        summary_stats = cleaned_df[numeric_cols].describe()
-        for col in numeric_cols[:5]:  # Limit to first 5 columns
-            pdf.cell(0, 8, f'{col}:', ln=True)
-            pdf.cell(0, 6, f'  Mean: {summary_stats[col]["mean"]:.2f}', ln=True)
-            pdf.cell(0, 6, f'  Std: {summary_stats[col]["std"]:.2f}', ln=True)
-            pdf.cell(0, 6, f'  Min: {summary_stats[col]["min"]:.2f}', ln=True)
-            pdf.cell(0, 6, f'  Max: {summary_stats[col]["max"]:.2f}', ln=True)
-            pdf.ln(2)
-    
-    return pdf.output(dest='S').encode('latin-1')
+def cached_charts(figure_cache, data_key):
+    """(title, PNG bytes) of the plots already rendered for one dataset version, display resolution preferred"""
+    best = {}
+    for key in figure_cache.keys():
+        if len(key) == 8 and key[0] == data_key and key[5] == PLOT_THEME and key[6] == 'png':
+            plot = key[1:5]
+            if plot not in best or key[7] < best[plot][7]:
+                best[plot] = key
+    charts = []
+    for (plot_type, x_col, y_col, method), key in best.items():
+        png = figure_cache.get(key)
+        if png is not None:
+            columns = ' vs '.join(str(col) for col in (x_col, y_col) if col)
+            charts.append((f"{plot_type}: {columns}" if columns else plot_type, png))
+    return charts
 
-def get_llm_insights(df):
-    """Get insights from Ollama/Mistral using the ollama library"""
-    try:
-        import ollama  # Safely import Ollama inside function
-        # Prepare dataset summary
-        summary = {
-            "shape": df.shape,
-            "columns": list(df.columns),
-            "dtypes": df.dtypes.to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "numeric_summary": df.describe().to_dict() if len(df.select_dtypes(include=[np.number]).columns) > 0 else {},
-            "categorical_summary": {col: df[col].value_counts().head(5).to_dict() for col in df.select_dtypes(include=['object']).columns}
-        }
-        
-        # Create a comprehensive prompt
-        prompt = f"""
-        You are a data scientist performing Exploratory Data Analysis (EDA). 
-        Analyze this dataset and provide 3-5 key insights in a professional, business-ready format.
-        
-        Dataset Information:
-        - Dataset Shape: {summary['shape']}
-        - Columns: {summary['columns']}
-        - Missing Values: {summary['missing_values']}
-        
-        Please provide insights covering:
-        1. **Data Quality Assessment**: Comment on missing values, data types, and overall data quality
-        2. **Key Patterns**: Identify any notable patterns or trends in the data
-        3. **Analysis Opportunities**: Suggest potential areas for deeper analysis
-        4. **Recommendations**: Provide actionable recommendations for data exploration
-        
-        Format your response in clear, professional language suitable for a business presentation.
-        Use bullet points and clear sections for better readability.
-        """
-        
-        # Use the ollama library for direct communication
-        try:
-            response = ollama.chat(
-                model="mistral",
-                messages=[{"role": "user", "content": prompt}],
-                stream=False
-            )
-            
-            insights = response.get('message', {}).get('content', '').strip()
-            
-            if insights:
-                return insights
-            else:
-                return "🤖 AI generated an empty response. Please try again."
-                
-        except Exception as e:
-            return f"""❌ **Ollama Connection Error**: {str(e)}
+def generate_pdf_report(df, cleaned_df, profile=None, cleaned_profile=None, charts=()):
+    """Generate PDF report from the column profiles of the original and cleaned data (DataFrames or engines).
+
+    Every column is included and charts are (title, PNG bytes) already rendered;
+    pages are streamed to a spooled temporary file as they are laid out.
+    """
+    profile = profile or as_engine(df).profile()
+    cleaned_profile = cleaned_profile or as_engine(cleaned_df).profile()
+    with METRICS.stage('generate_pdf_report', profile.n_rows, profile.n_cols), \
+            tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MB * 1024 ** 2) as out:
+        write_report(out, profile, cleaned_profile, charts)
+        out.seek(0)
+        return out.read()
+
+def llm_cache_key(prompt, model):
+    """Response cache key: the data-dependent part of the prompt, model and prompt version"""
+    return content_hash(prompt.dataset_section.encode(), model=model, prompt_version=PROMPT_VERSION)
+
+def start_llm_insights(df, profile=None, correlation=None, refresh=False):
+    """Queue an LLM insights request; the returned job fills in as tokens stream back.
+
+    The prompt is kept within LLM_TOKEN_BUDGET and stored in the session for
+    the size metrics. Answers already cached for the same prompt and model
+    come back finished.
+    """
+    profile = profile or as_engine(df).profile()
+    prompt = build_prompt(profile, correlation, token_budget=LLM_TOKEN_BUDGET,
+                          prefill_tokens_per_second=LLM_PREFILL_TOKENS_PER_SECOND)
+    st.session_state.insight_prompt = prompt
+    return get_insight_service().submit(prompt.text, model=OLLAMA_MODEL, timeout=LLM_TIMEOUT_SECONDS,
+                                        cache_key=llm_cache_key(prompt, OLLAMA_MODEL), refresh=refresh)
+
+def show_prompt_metrics(prompt, job):
+    """Prompt size, estimated prefill cost and, once known, the server's measured numbers"""
+    size_col, columns_col, prefill_col = st.columns(3)
+    with size_col:
+        st.metric("Prompt Tokens (est.)", f"{prompt.tokens:,}", help=f"Budget: {prompt.token_budget:,} tokens")
+    with columns_col:
+        st.metric("Columns in Prompt", f"{prompt.columns_included:,} / {prompt.columns_total:,}")
+    with prefill_col:
+        measured = job.stats.get('prompt_eval_duration')
+        if measured:
+            st.metric("Prefill", f"{measured / 1e9:.1f}s",
+                      help=f"Measured by the server: {job.stats.get('prompt_eval_count', 0):,} prompt tokens")
+        elif job.first_token is not None:
+            st.metric("Time to First Token", f"{job.first_token - job.started:.1f}s")
+        else:
+            st.metric("Prefill (est.)", f"{prompt.prefill_seconds:.1f}s",
+                      help=f"At {LLM_PREFILL_TOKENS_PER_SECOND:,.0f} prompt tokens/s (EDA_LLM_PREFILL_TPS)")
+
+def llm_error_message(job):
+    """Markdown explaining why an insights job failed"""
+    if job.status == TIMEOUT:
+        return f"""⏱️ **Ollama Timed Out**: {job.error}
+
+Try again, use a smaller model, or raise `EDA_LLM_TIMEOUT` / `EDA_LLM_READ_TIMEOUT`."""
+    return f"""❌ **Ollama Connection Error**: {job.error}
             
 **Troubleshooting Steps:**
 1. **Start Ollama**: Open a new terminal and run `ollama serve`
 2. **Check Installation**: Run `ollama list` to see available models
-3. **Verify Model**: Ensure Mistral model is pulled (`ollama pull mistral`)
+3. **Verify Model**: Ensure Mistral model is pulled (`ollama pull {OLLAMA_MODEL}`)
 4. **Restart Service**: Try stopping and restarting Ollama
 
 **Quick Fix**: Open a new terminal and run:
 ```bash
 ollama serve
 ```"""
-            
-    except Exception as e:
-        return f"❌ **Unexpected Error**: {str(e)}\n\nPlease check the console for more details."
 
-def generate_basic_insights(df):
+def show_insights(insights):
+    st.markdown("""
+    <div class="insight-card">
+        <h3 style="color: #FF6B6B; margin-bottom: 1rem;">📊 Data Insights</h3>
+    """, unsafe_allow_html=True)
+    
+    # Format insights with markdown
+    formatted_insights = insights.replace('\n', '\n\n')
+    st.markdown(formatted_insights)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
+def show_insight_job(job, df, profile, correlation=None):
+    """Render an LLM job, re-rendering only this fragment while tokens arrive"""
+    polling = not job.done
+
+    @st.fragment(run_every=LLM_POLL_SECONDS if polling else None)
+    def render():
+        if not job.done:
+            status_col, cancel_col = st.columns([3, 1])
+            with status_col:
+                waiting = "Waiting for the model" if not job.text else "Streaming response"
+                st.caption(f"🤖 {waiting}... {job.elapsed:.0f}s")
+            with cancel_col:
+                if st.button("⏹️ Cancel", key="cancel_insights"):
+                    job.cancel()
+        elif polling:
+            # Finished since the last full run: rerun once to stop the timer
+            st.rerun()
+        
+        if job.cached:
+            cache_col, refresh_col = st.columns([3, 1])
+            with cache_col:
+                st.caption("⚡ Served from the response cache")
+            with refresh_col:
+                if st.button("🔄 Regenerate", key="refresh_insights"):
+                    st.session_state.insight_job = start_llm_insights(df, profile, correlation, refresh=True)
+                    st.rerun()
+        
+        prompt = st.session_state.get('insight_prompt')
+        if prompt is not None and not job.cached:
+            show_prompt_metrics(prompt, job)
+        
+        if job.status in (ERROR, TIMEOUT) and not job.text:
+            st.markdown(llm_error_message(job))
+            return
+        if job.text:
+            show_insights(job.text + ("" if job.done else " ▌"))
+        if job.status == CANCELLED:
+            st.warning("⏹️ Cancelled")
+        elif job.status in (ERROR, TIMEOUT):
+            st.warning(f"⚠️ Response incomplete: {job.error}")
+        elif job.done and not job.text:
+            st.warning("🤖 AI generated an empty response. Please try again.")
+
+    render()
+
+def generate_basic_insights(df, profile=None, correlation=None):
     """Generate basic statistical insights without AI"""
     try:
+        profile = profile or as_engine(df).profile()
+        stats = profile.columns
         insights = []
         
         # Basic dataset info
         insights.append(f"## 📊 **Dataset Overview**")
-        insights.append(f"- **Shape**: {df.shape[0]} rows × {df.shape[1]} columns")
-        insights.append(f"- **Memory Usage**: {df.memory_usage(deep=True).sum() / 1024:.1f} KB")
-        insights.append(f"- **Total Missing Values**: {df.isnull().sum().sum()}")
+        insights.append(f"- **Shape**: {profile.n_rows} rows × {profile.n_cols} columns")
+        insights.append(f"- **Memory Usage**: {profile.memory_bytes / 1024:.1f} KB")
+        insights.append(f"- **Total Missing Values**: {profile.total_missing}")
+        if profile.approximate:
+            insights.append(f"- **Approximate statistics**: {profile.approximation_note}")
         
         # Data types analysis
         insights.append(f"\n## 📝 **Data Types Analysis**")
-        dtype_counts = df.dtypes.value_counts()
+        dtype_counts = stats['dtype'].value_counts()
         for dtype, count in dtype_counts.items():
             insights.append(f"- **{dtype}**: {count} columns")
         
         # Missing values analysis
-        missing_data = df.isnull().sum()
-        missing_data = missing_data[missing_data > 0]
+        missing_data = profile.missing
         if len(missing_data) > 0:
             insights.append(f"\n## ❓ **Missing Values Analysis**")
             insights.append("Columns with missing values:")
             for col, missing_count in missing_data.items():
-                percentage = (missing_count / len(df)) * 100
+                percentage = (missing_count / profile.n_rows) * 100
                 insights.append(f"- **{col}**: {missing_count} missing ({percentage:.1f}%)")
         else:
             insights.append(f"\n## ✅ **Data Quality**")
             insights.append("No missing values found in the dataset!")
         
         # Numeric columns analysis
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols = profile.numeric_columns
         if len(numeric_cols) > 0:
             insights.append(f"\n## 🔢 **Numeric Columns Analysis**")
             insights.append(f"Found {len(numeric_cols)} numeric columns:")
             for col in numeric_cols:
-                col_data = df[col].dropna()
-                if len(col_data) > 0:
+                col_stats = stats.loc[col]
+                if col_stats['count'] > 0:
                     insights.append(f"- **{col}**:")
-                    insights.append(f"  - Mean: {col_data.mean():.2f}")
-                    insights.append(f"  - Median: {col_data.median():.2f}")
-                    insights.append(f"  - Std: {col_data.std():.2f}")
-                    insights.append(f"  - Range: {col_data.min():.2f} to {col_data.max():.2f}")
+                    insights.append(f"  - Mean: {col_stats['mean']:.2f}")
+                    insights.append(f"  - Median: {col_stats['median']:.2f}")
+                    insights.append(f"  - Std: {col_stats['std']:.2f}")
+                    insights.append(f"  - Range: {col_stats['min']:.2f} to {col_stats['max']:.2f}")
         
         # Categorical columns analysis
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = profile.categorical_columns
         if len(categorical_cols) > 0:
             insights.append(f"\n## 📋 **Categorical Columns Analysis**")
             insights.append(f"Found {len(categorical_cols)} categorical columns:")
             for col in categorical_cols:
-                value_counts = df[col].value_counts()
-                insights.append(f"- **{col}**: {len(value_counts)} unique values")
-                if len(value_counts) <= 10:
-                    insights.append(f"  - Top values: {', '.join([f'{k} ({v})' for k, v in value_counts.head(3).items()])}")
+                n_unique = stats.loc[col, 'unique']
+                insights.append(f"- **{col}**: {n_unique} unique values")
+                if n_unique <= 10:
+                    insights.append(f"  - Top values: {', '.join([f'{k} ({v})' for k, v in profile.top_values[col].head(3).items()])}")
         
         # Correlation analysis for numeric columns
         if len(numeric_cols) > 1:
             insights.append(f"\n## 🔗 **Correlation Analysis**")
-            correlation_matrix = df[numeric_cols].corr()
-            # Find strongest correlations
-            correlations = []
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i+1, len(correlation_matrix.columns)):
-                    corr_value = correlation_matrix.iloc[i, j]
-                    if abs(corr_value) > 0.5:  # Only show strong correlations
-                        col1 = correlation_matrix.columns[i]
-                        col2 = correlation_matrix.columns[j]
-                        correlations.append((col1, col2, corr_value))
+            if correlation is None:
+                correlation = as_engine(df).correlation()
+            # Find strongest correlations (already sorted by strength)
+            correlations = top_pairs(correlation, k=TOP_CORRELATION_PAIRS)
             
             if correlations:
                 insights.append("Strong correlations found:")
-                for col1, col2, corr_value in sorted(correlations, key=lambda x: abs(x[2]), reverse=True):
+                for col1, col2, corr_value in correlations:
                     insights.append(f"- **{col1}** ↔ **{col2}**: {corr_value:.3f}")
             else:
                 insights.append("No strong correlations found between numeric columns.")
@@ -369,55 +868,180 @@ def generate_basic_insights(df):
         return f"❌ Error generating basic insights: {str(e)}"
 
 # Main app
+def show_performance_panel():
+    """Collapsible sidebar table of stage timings and cache hits for this server process"""
+    summary = get_metrics().summary()
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        if not summary:
+            st.caption("No stages measured yet")
+            return
+        ms = lambda seconds: None if seconds is None else round(seconds * 1000, 1)
+        st.dataframe(pd.DataFrame([{
+            'Stage': row['stage'],
+            'Runs': row['runs'],
+            'Hits': row['hits'],
+            'Misses': row['misses'],
+            'Last ms': ms(row['last_wall_seconds']),
+            'CPU ms': ms(row['last_cpu_seconds']),
+            'Mean ms': ms(row['mean_wall_seconds']),
+            'Max ms': ms(row['max_wall_seconds']),
+            'Peak Δ MB': None if row['max_peak_rss_delta_bytes'] is None
+                         else round(row['max_peak_rss_delta_bytes'] / 1024 ** 2, 1),
+            'Rows': row['last_rows'],
+            'Cols': row['last_cols'],
+        } for row in summary]), hide_index=True, use_container_width=True)
+        st.caption(f"All sessions since the server started. JSON log: {METRICS_LOG or 'off'} · "
+                   f"Prometheus: {METRICS_FILE or 'off'}")
+
 def main():
+    setup_page()
+    get_metrics()
     st.title("🔥 EDA-GenAI Dashboard")
     st.markdown("*by Mubasshir Ahmed*")
     st.markdown("---")
     
     # Sidebar
+    st.sidebar.header("⚙️ Execution Engine")
+    
+    engine_names = available_engines()
+    engine_name = st.sidebar.selectbox(
+        "Engine:",
+        engine_names,
+        index=engine_names.index(DEFAULT_ENGINE) if DEFAULT_ENGINE in engine_names else 0,
+        format_func=ENGINE_LABELS.get,
+        help="DuckDB and Polars query Parquet files on disk with multi-threaded, streaming execution, "
+             "so datasets larger than memory can be explored"
+    )
+    out_of_core = engine_name != 'pandas'
+    
     st.sidebar.header("📁 Data Upload")
     
+    upload_types = ['csv', *COLUMNAR_EXTENSIONS] if columnar_available() else ['csv']
     uploaded_file = st.sidebar.file_uploader(
-        "Upload your CSV file",
-        type=['csv'],
-        help="Upload a CSV file or use the default Titanic dataset"
+        "Upload your data file",
+        type=upload_types,
+        help="Upload a CSV, Parquet or Arrow/Feather file, or use the default Titanic dataset"
     )
+    server_file = None
+    if out_of_core:
+        server_file = st.sidebar.selectbox(
+            "Or open a file on the server:",
+            [None] + server_files(),
+            format_func=lambda name: "(none)" if name is None else name,
+            help=f"Files in {SERVER_DATA_DIR} (EDA_SERVER_DATA_DIR), for datasets too large to upload"
+        )
     
     # Load data
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            st.session_state.data = df
+            if out_of_core:
+                data_key, engine = load_uploaded_engine(uploaded_file, engine_name)
+            else:
+                data_key, df = load_uploaded_data(uploaded_file)
+                engine = PandasEngine(df, data_key, get_browser_index(), get_column_executor())
             st.sidebar.success("✅ File uploaded successfully!")
+        except MemoryBudgetError as e:
+            st.sidebar.error(f"❌ {e}. Using the default dataset instead.")
+            data_key, engine = load_default_engine(engine_name)
+        except Exception as e:
+            st.sidebar.error(f"❌ Error reading file: {str(e)}")
+            data_key, engine = load_default_engine(engine_name)
+    elif server_file is not None:
+        try:
+            data_key, engine = load_server_engine(server_file, engine_name)
+            st.sidebar.info(f"🗄️ Using {server_file} from the server")
         except Exception as e:
             st.sidebar.error(f"❌ Error reading file: {str(e)}")
-            df = load_default_data()
-            st.session_state.data = df
+            data_key, engine = load_default_engine(engine_name)
     else:
-        df = load_default_data()
-        st.session_state.data = df
+        data_key, engine = load_default_engine(engine_name)
         st.sidebar.info("📊 Using default Titanic dataset")
     
+    # The session's datasets are accounted (and possibly spilled) by the process-wide session memory
+    memory = get_session_memory()
+    session = st.session_state.session_id
+    try:
+        memory.hold(session, 'data', data_key, getattr(engine, 'df', None))
+    except MemoryBudgetError as e:
+        st.sidebar.error(f"❌ {e}. Using the default dataset instead.")
+        data_key, engine = load_default_engine(engine_name)
+        memory.hold(session, 'data', data_key, getattr(engine, 'df', None))
+    
+    # Cached frames are shared between sessions: never mutate them in place
+    if st.session_state.data_key != data_key:
+        memory.release(session, 'cleaned')
+        st.session_state.cleaned_key = None
+        st.session_state.cleaned_strategies = None
+        st.session_state.cleaned_exports = {}
+        st.session_state.clean_job = None
+    st.session_state.data_key = data_key
+    
+    # Exact statistics sort every column; sketches answer in one bounded-memory pass, which only pays off
+    # from APPROXIMATE_MIN_ROWS rows
+    approximate_available = engine.n_rows >= APPROXIMATE_MIN_ROWS
+    approximate = st.sidebar.toggle(
+        "≈ Approximate statistics",
+        value=approximate_available,
+        disabled=not approximate_available,
+        help="Profile with mergeable sketches: quantiles, distinct counts and top values are estimated "
+             "within the stated error bounds, and cleaning reads its fill values off the profile. "
+             f"Available from {APPROXIMATE_MIN_ROWS:,} rows; smaller datasets are faster to profile exactly"
+    ) and approximate_available
+    
     # Data cleaning options
     st.sidebar.header("🧹 Data Cleaning")
     
     numeric_strategy = st.sidebar.selectbox(
         "Numeric Missing Values:",
-        ["mean", "median", "zero"],
+        NUMERIC_STRATEGIES,
         help="Choose how to handle missing numeric values"
     )
     
     categorical_strategy = st.sidebar.selectbox(
         "Categorical Missing Values:",
-        ["mode", "unknown"],
+        CATEGORICAL_STRATEGIES,
         help="Choose how to handle missing categorical values"
     )
     
     if st.sidebar.button("🔄 Clean Data"):
-        with st.spinner("Cleaning data..."):
-            cleaned_df = clean_data(df, numeric_strategy, categorical_strategy)
-            st.session_state.cleaned_data = cleaned_df
-            st.success("✅ Data cleaned successfully!")
+        cleaned_key = cleaned_data_key(data_key, numeric_strategy, categorical_strategy, approximate)
+        clean = cleaning_task(data_key, engine, numeric_strategy, categorical_strategy, approximate)
+        # Cleaned frames are cached by the cleaning cache, not by the job queue
+        job = submit_job(('clean', cleaned_key), lambda job: clean(), "Cleaning data", cache=False)
+        st.session_state.clean_job = (job, cleaned_key, (numeric_strategy, categorical_strategy, approximate))
+    
+    # A cleaning job runs in the background; the sidebar shows its progress until it finishes
+    if st.session_state.clean_job is not None:
+        job, cleaned_key, strategies = st.session_state.clean_job
+        if not job.done:
+            with st.sidebar:
+                show_job_progress(job)
+        else:
+            st.session_state.clean_job = None
+            try:
+                memory.hold(session, 'cleaned', cleaned_key, job.result())
+                st.session_state.cleaned_key = cleaned_key
+                st.session_state.cleaned_strategies = strategies
+                st.session_state.cleaned_exports = {}
+                st.success("✅ Data cleaned successfully!")
+            except MemoryBudgetError as e:
+                st.error(f"❌ {e}")
+            except JobError as e:
+                st.error(f"❌ Error cleaning data: {e}")
+    
+    # Every tab works on the cleaned data when available; its profile is computed once per version
+    if st.session_state.cleaned_key is not None:
+        current_key = st.session_state.cleaned_key
+        cleaned = memory.get(session, 'cleaned', current_key,
+                             cleaning_task(data_key, engine, *st.session_state.cleaned_strategies))
+        current = as_cleaned_engine(cleaned, current_key)
+    else:
+        current, current_key = engine, data_key
+    stats = memory.stats(session)
+    st.sidebar.caption(f"🧠 Session memory: {stats['session_bytes'] / 1024 ** 2:,.1f} of "
+                       f"{stats['session_max_bytes'] / 1024 ** 2:,.0f} MB · all sessions: "
+                       f"{stats['bytes'] / 1024 ** 2:,.1f} of {stats['max_bytes'] / 1024 ** 2:,.0f} MB")
+    current_profile = get_profile(current_key, current, approximate)
     
     # Main content tabs
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Data Overview", "📈 Visualizations", "🤖 AI Insights", "📄 Reports"])
@@ -425,26 +1049,24 @@ def main():
     with tab1:
         st.header("📊 Data Overview")
         
-        if st.session_state.get('cleaned_data') is not None:
-            df_display = st.session_state.cleaned_data
-        else:
-            df_display = df
-        
         # Dataset info
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Rows", df_display.shape[0])
+            st.metric("Rows", current_profile.n_rows)
         with col2:
-            st.metric("Columns", df_display.shape[1])
+            st.metric("Columns", current_profile.n_cols)
         with col3:
-            st.metric("Missing Values", df_display.isnull().sum().sum())
+            st.metric("Missing Values", current_profile.total_missing)
         with col4:
-            st.metric("Memory Usage", f"{df_display.memory_usage(deep=True).sum() / 1024:.1f} KB")
+            # Out-of-core engines report the size of the Parquet file they scan
+            st.metric("Size on Disk" if out_of_core else "Memory Usage", f"{current_profile.memory_bytes / 1024:.1f} KB")
+        if current_profile.approximate:
+            st.caption(f"≈ Approximate statistics: {current_profile.approximation_note}")
         
-        # Data preview
-        st.subheader("📋 Data Preview")
-        st.dataframe(df_display.head(10), use_container_width=True)
+        # Data browser
+        st.subheader("📋 Data Browser")
+        show_data_browser(current, current_profile)
         
         # Data types and missing values
         col1, col2 = st.columns(2)
@@ -452,37 +1074,42 @@ def main():
         with col1:
             st.subheader("📝 Data Types")
             dtype_df = pd.DataFrame({
-                'Column': df_display.columns,
-                'Data Type': [str(dtype) for dtype in df_display.dtypes.values]
+                'Column': current_profile.columns.index,
+                'Data Type': current_profile.columns['dtype'].values
             })
             st.dataframe(dtype_df, use_container_width=True)
         
         with col2:
             st.subheader("❓ Missing Values")
             missing_df = pd.DataFrame({
-                'Column': df_display.columns,
-                'Missing Count': df_display.isnull().sum().values,
-                'Missing %': (df_display.isnull().sum() / len(df_display) * 100).values
+                'Column': current_profile.columns.index,
+                'Missing Count': current_profile.columns['null_count'].values,
+                'Missing %': current_profile.columns['null_pct'].values
             })
             st.dataframe(missing_df, use_container_width=True)
         
         # Download cleaned data
-        if st.session_state.get('cleaned_data') is not None:
-            csv = st.session_state.cleaned_data.to_csv(index=False)
+        if st.session_state.cleaned_key is not None:
+            export_formats = list(EXPORT_FORMATS) if columnar_available() else ["CSV"]
+            export_format = st.radio("Download format:", export_formats, horizontal=True,
+                                     help="Parquet and Arrow are much faster to write and re-load than CSV")
+            # Serialize once per cleaned frame and format, not on every rerun
+            exports = st.session_state.setdefault('cleaned_exports', {})
+            if export_format not in exports:
+                with METRICS.stage('export', current_profile.n_rows, current_profile.n_cols):
+                    exports[export_format] = current.export(export_format)
+            extension, mime = EXPORT_FORMATS[export_format]
             st.download_button(
-                label="📥 Download Cleaned Data (CSV)",
-                data=csv,
-                file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
+                label=f"📥 Download Cleaned Data ({export_format})",
+                data=exports[export_format],
+                file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                mime=mime
             )
     
     with tab2:
         st.header("📈 Visualizations")
         
-        if st.session_state.get('cleaned_data') is not None:
-            df_viz = st.session_state.cleaned_data
-        else:
-            df_viz = df
+        df_viz = current
         
         # Create a better layout with proper spacing
         st.markdown("---")
@@ -490,16 +1117,23 @@ def main():
         # Plot controls in a more organized layout
         st.subheader("🎨 Plot Configuration")
         
+        # Rendering backend is chosen per session
+        plot_backends = ["Matplotlib (static)"] + (["Plotly (interactive)"] if plotly_available() else [])
+        plot_backend = st.radio("**Rendering:**", plot_backends, horizontal=True, key="plot_backend",
+                                help="Plotly plots are interactive (zoom, hover) and drawn in the browser with WebGL")
+        interactive = plot_backend.startswith("Plotly")
+        
         # First row: Plot type and generate button
         col1, col2, col3 = st.columns([2, 2, 1])
         
         with col1:
             plot_type = st.selectbox(
                 "**Select Plot Type:**",
-                ["Distribution Plot", "Boxplot", "Countplot", "Barplot", "Correlation Heatmap"],
+                PLOT_TYPES,
                 help="Choose the type of visualization you want to create"
             )
         
+        corr_method = 'pearson'
         with col2:
             # Column selection based on plot type
             if plot_type in ["Distribution Plot", "Countplot"]:
@@ -507,7 +1141,7 @@ def main():
                 y_col = None
             elif plot_type in ["Boxplot", "Barplot"]:
                 x_col = st.selectbox("**Select X Column:**", df_viz.columns, help="Choose the categorical column")
-                numeric_cols = df_viz.select_dtypes(include=[np.number]).columns
+                numeric_cols = current_profile.numeric_columns
                 if len(numeric_cols) > 0:
                     y_col = st.selectbox("**Select Y Column:**", numeric_cols, help="Choose the numeric column")
                 else:
@@ -516,6 +1150,8 @@ def main():
             else:  # Correlation Heatmap
                 x_col = None
                 y_col = None
+                corr_method = st.radio("**Method:**", CORRELATION_METHODS, horizontal=True, format_func=str.title,
+                                       help="Spearman uses ranks and also picks up monotonic, non-linear relationships")
                 st.info("Correlation heatmap will show relationships between all numeric columns")
         
         with col3:
@@ -523,75 +1159,91 @@ def main():
             st.write("")  # Add more spacing
             generate_button = st.button("🎨 Generate Plot", type="primary", use_container_width=True)
         
+        if interactive:
+            st.caption("⚡ Interactive plots are aggregated on the server; the browser only receives the binned results")
+        elif is_large(df_viz):
+            st.caption(f"⚡ Large dataset ({len(df_viz):,} rows > {LARGE_DATA_ROWS:,}): plots are pre-aggregated and the KDE is estimated from a sample")
+        
         # Add some spacing
         st.markdown("---")
         
         # Plot display area
+        plot_request = (current_key, plot_type, x_col, y_col)
+        plot_shown = (plot_backend, plot_request, corr_method)
         if generate_button:
-            with st.spinner("🎨 Generating beautiful plot..."):
-                try:
-                    fig = generate_plot(df_viz, plot_type, x_col, y_col)
-                    
-                    # Display the plot in a centered container
-                    st.subheader(f"📊 {plot_type}")
-                    
-                    # Create a container for the plot with better styling
-                    plot_container = st.container()
-                    with plot_container:
+            st.session_state.plot_request = plot_shown
+            st.session_state.setdefault('jobs', {}).pop('plot', None)  # render again, e.g. after an error
+        
+        # The last generated plot stays on screen across reruns (e.g. after a download) until the settings change
+        if st.session_state.get('plot_request') == plot_shown:
+            # Rendering and the export renders run as background jobs; the figure cache keeps their results
+            figure_cache, correlation_cache = get_figure_cache(), get_correlation_cache()
+            if interactive:
+                export_formats = PLOTLY_FORMATS
+                render = lambda fmt: lambda job: get_plotly_figure(figure_cache, df_viz, *plot_request, fmt=fmt,
+                                                                   method=corr_method, correlation_cache=correlation_cache)
+                plot_job = session_job('plot', ('plot', plot_shown), render('json'), "Generating plot", cache=False)
+            else:
+                export_formats = IMAGE_FORMATS
+                render = lambda fmt: lambda job: get_plot_image(figure_cache, df_viz, *plot_request, fmt=fmt, dpi=EXPORT_DPI,
+                                                                facecolor=EXPORT_FACECOLOR, method=corr_method,
+                                                                correlation_cache=correlation_cache)
+                plot_job = session_job('plot', ('plot', plot_shown), lambda job: get_plot_image(
+                    figure_cache, df_viz, *plot_request, method=corr_method, correlation_cache=correlation_cache),
+                    "Generating plot", cache=False)
+            
+            if not plot_job.done:
+                show_job_progress(plot_job)
+            elif plot_job.status == JOB_ERROR:
+                st.error(f"❌ Error generating plot: {plot_job.error}")
+                st.info("💡 Try selecting different columns or plot type")
+            else:
+                # Display the plot in a centered container
+                st.subheader(f"📊 {plot_type}")
+                
+                # Create a container for the plot with better styling
+                plot_container = st.container()
+                with plot_container:
+                    if interactive:
+                        st.plotly_chart(figure_from_json(plot_job.value), use_container_width=True)
+                    else:
                         # Display the plot with better sizing
-                        st.pyplot(fig, use_container_width=True)
-                    
-                    # Download section
-                    st.markdown("---")
-                    col_download1, col_download2 = st.columns(2)
-                    
-                    with col_download1:
-                        # Download plot as PNG
-                        buf = io.BytesIO()
-                        fig.savefig(buf, format='png', dpi=300, bbox_inches='tight', facecolor='#262730')
-                        buf.seek(0)
-                        st.download_button(
-                            label="📥 Download Plot (PNG)",
-                            data=buf.getvalue(),
-                            file_name=f"{plot_type.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                            mime="image/png",
-                            use_container_width=True
-                        )
-                    
-                    with col_download2:
-                        # Download plot as SVG (vector format)
-                        buf_svg = io.BytesIO()
-                        fig.savefig(buf_svg, format='svg', bbox_inches='tight', facecolor='#262730')
-                        buf_svg.seek(0)
+                        st.image(plot_job.value, use_container_width=True)
+                
+                # Download section: exports render in the background while the plot is on screen
+                st.markdown("---")
+                export_jobs = {fmt: session_job(f'plot:{fmt}', ('plot', plot_shown, fmt), render(fmt),
+                                                f"Exporting {fmt.upper()}", cache=False, wait=0)
+                               for fmt in export_formats}
+                download_columns = st.columns(len(export_formats))
+                
+                for download_col, (fmt, mime) in zip(download_columns, export_formats.items()):
+                    with download_col:
                         st.download_button(
-                            label="📥 Download Plot (SVG)",
-                            data=buf_svg.getvalue(),
-                            file_name=f"{plot_type.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.svg",
-                            mime="image/svg+xml",
+                            label=f"📥 Download Plot ({fmt.upper()})",
+                            data=export_jobs[fmt].result,
+                            file_name=f"{plot_type.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}",
+                            mime=mime,
                             use_container_width=True
                         )
-                    
-                    # Plot information
-                    st.markdown("---")
-                    st.markdown("**📋 Plot Information:**")
-                    info_col1, info_col2, info_col3 = st.columns(3)
-                    
-                    with info_col1:
-                        st.metric("Plot Type", plot_type)
-                    with info_col2:
-                        if x_col:
-                            st.metric("X-Axis", x_col)
-                        else:
-                            st.metric("X-Axis", "All Numeric Columns")
-                    with info_col3:
-                        if y_col:
-                            st.metric("Y-Axis", y_col)
-                        else:
-                            st.metric("Y-Axis", "Count/Frequency")
-                    
-                except Exception as e:
-                    st.error(f"❌ Error generating plot: {str(e)}")
-                    st.info("💡 Try selecting different columns or plot type")
+                
+                # Plot information
+                st.markdown("---")
+                st.markdown("**📋 Plot Information:**")
+                info_col1, info_col2, info_col3 = st.columns(3)
+                
+                with info_col1:
+                    st.metric("Plot Type", plot_type)
+                with info_col2:
+                    if x_col:
+                        st.metric("X-Axis", x_col)
+                    else:
+                        st.metric("X-Axis", "All Numeric Columns")
+                with info_col3:
+                    if y_col:
+                        st.metric("Y-Axis", y_col)
+                    else:
+                        st.metric("Y-Axis", "Count/Frequency")
         else:
             # Show instructions when no plot is generated
             st.info("👆 Configure your plot settings above and click 'Generate Plot' to create a visualization")
@@ -602,7 +1254,7 @@ def main():
             
             with col_info1:
                 st.markdown("**Numeric Columns:**")
-                numeric_cols = df_viz.select_dtypes(include=[np.number]).columns
+                numeric_cols = current_profile.numeric_columns
                 if len(numeric_cols) > 0:
                     for col in numeric_cols:
                         st.write(f"• {col}")
@@ -611,7 +1263,7 @@ def main():
             
             with col_info2:
                 st.markdown("**Categorical Columns:**")
-                categorical_cols = df_viz.select_dtypes(include=['object']).columns
+                categorical_cols = current_profile.categorical_columns
                 if len(categorical_cols) > 0:
                     for col in categorical_cols:
                         st.write(f"• {col}")
@@ -621,10 +1273,7 @@ def main():
     with tab3:
         st.header("🤖 AI-Powered Insights")
         
-        if st.session_state.get('cleaned_data') is not None:
-            df_insights = st.session_state.cleaned_data
-        else:
-            df_insights = df
+        df_insights = current
         
         # Add a toggle for AI vs Basic insights
         col1, col2 = st.columns([3, 1])
@@ -640,23 +1289,25 @@ def main():
             generate_button = st.button("🧠 Generate Insights", type="primary")
         
         if generate_button:
-            with st.spinner("🤖 Analyzing data..."):
-                if insight_type == "🤖 AI-Powered (Ollama)":
-                    insights = get_llm_insights(df_insights)
-                else:
-                    insights = generate_basic_insights(df_insights)
-                
-                st.markdown("""
-                <div class="insight-card">
-                    <h3 style="color: #FF6B6B; margin-bottom: 1rem;">📊 Data Insights</h3>
-                """, unsafe_allow_html=True)
-                
-                # Format insights with markdown
-                formatted_insights = insights.replace('\n', '\n\n')
-                st.markdown(formatted_insights)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-        else:
+            previous_job = st.session_state.insight_job
+            if previous_job is not None:
+                previous_job.cancel()
+            st.session_state.insight_job = None
+            if insight_type == "🤖 AI-Powered (Ollama)":
+                # The chat runs in the background; this session keeps responding while it streams
+                st.session_state.insight_job = start_llm_insights(df_insights, current_profile,
+                                                                  get_correlation(current_key, df_insights))
+            else:
+                with st.spinner("🤖 Analyzing data..."):
+                    correlation = get_correlation(current_key, df_insights)
+                    with METRICS.stage('basic_insights', current_profile.n_rows, current_profile.n_cols):
+                        insights = generate_basic_insights(df_insights, current_profile, correlation)
+                    show_insights(insights)
+        
+        if st.session_state.insight_job is not None and insight_type == "🤖 AI-Powered (Ollama)":
+            show_insight_job(st.session_state.insight_job, df_insights, current_profile,
+                             get_correlation(current_key, df_insights))
+        elif not generate_button:
             st.info("👆 Choose your insight type and click 'Generate Insights' to analyze your dataset!")
             
             # Show Ollama status
@@ -664,45 +1315,50 @@ def main():
             st.subheader("🔧 Ollama Status")
             
             try:
-                # Use ollama library to check status
-                models = ollama.list()
-                if models and 'models' in models:
-                    st.success("✅ Ollama is running and accessible")
-                    model_names = [model.get('name', 'Unknown') for model in models['models']]
-                    if model_names:
-                        st.info(f"📦 Available models: {', '.join(model_names)}")
-                    else:
-                        st.warning("⚠️ No models found. Run `ollama pull mistral` to install a model.")
+                model_names = get_insight_service().models()
+                st.success("✅ Ollama is running and accessible")
+                if model_names:
+                    st.info(f"📦 Available models: {', '.join(model_names)}")
                 else:
                     st.warning("⚠️ No models found. Run `ollama pull mistral` to install a model.")
-            except Exception as e:
+            except LLMError:
                 st.error("❌ Ollama is not running or not accessible")
                 st.info("💡 To use AI-powered insights, start Ollama with: `ollama serve`")
     
     with tab4:
         st.header("📄 Reports")
         
-        if st.session_state.get('cleaned_data') is not None:
-            df_report = st.session_state.cleaned_data
-        else:
-            df_report = df
+        df_report = current
         
+        report_key = ('pdf', data_key, current_key)
         if st.button("📄 Generate PDF Report"):
-            with st.spinner("Generating PDF report..."):
-                try:
-                    pdf_bytes = generate_pdf_report(df, df_report)
-                    st.download_button(
-                        label="📥 Download PDF Report",
-                        data=pdf_bytes,
-                        file_name=f"eda_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                        mime="application/pdf"
-                    )
-                    st.success("✅ PDF report generated successfully!")
-                except Exception as e:
-                    st.error(f"❌ Error generating PDF: {str(e)}")
+            raw_profile = get_profile(data_key, engine, approximate)
+            # Plots already rendered for this data are embedded; the key changes when more are rendered
+            charts = cached_charts(get_figure_cache(), current_key)
+            st.session_state.pdf_job = submit_job(
+                (*report_key, tuple(title for title, _ in charts)),
+                lambda job: generate_pdf_report(engine, df_report, raw_profile, current_profile, charts),
+                "Generating PDF report")
+        
+        pdf_job = st.session_state.pdf_job
+        if pdf_job is not None and pdf_job.key[:3] == report_key:
+            if not pdf_job.done:
+                show_job_progress(pdf_job)
+            elif pdf_job.status == JOB_ERROR:
+                st.error(f"❌ Error generating PDF: {pdf_job.error}")
+            else:
+                st.download_button(
+                    label="📥 Download PDF Report",
+                    data=pdf_job.value,
+                    file_name=f"eda_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                    mime="application/pdf"
+                )
+                st.success("✅ PDF report generated successfully!")
         else:
             st.info("👆 Click the button above to generate a comprehensive PDF report!")
     
+    show_performance_panel()
+    
     # Beautiful Footer with Developer Info
     st.markdown("---")
     st.markdown("""
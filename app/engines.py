@@ -0,0 +1,790 @@
+"""
+Execution engines behind the dashboard's data operations.
+
+An engine wraps one version of a dataset and answers everything the tabs ask
+of it: the column profile, a cleaned version, plot aggregates, correlations,
+browser pages and exports, always in the shapes the pandas code returns.
+
+PandasEngine runs on an in-memory DataFrame with the existing NumPy/pandas
+code. DuckDBEngine and PolarsEngine scan a Parquet file instead of loading it,
+so datasets larger than RAM can be explored: queries are multi-threaded and
+streamed (DuckDB spills large sorts and groupings to disk) and only
+aggregates, samples and the rows on screen reach pandas. Other formats are
+converted to Parquet once, with the engine's own streaming reader. A cleaned
+version is the same scan with the fill values applied as rows are read.
+
+duckdb and polars are optional; engines whose package is missing are not
+offered.
+"""
+import importlib.util
+import os
+import tempfile
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from aggregates import (KDE_SAMPLE_ROWS, MAX_CATEGORIES, box_aggregate, confidence_interval, histogram_aggregate,
+                        histogram_edges, histogram_result, mean_ci_aggregate, top_categories)
+from browser import BrowserIndex, get_page
+from cache import LRUCache
+from cleaning import CATEGORICAL_STRATEGIES, NUMERIC_STRATEGIES, UNKNOWN_LABEL, apply_fill_values, clean_data
+from correlation import CORRELATION_METHODS, CorrelationAccumulator, block_rows, correlation_matrix
+from profiling import DEFAULT_TOP_K, build_profile, profile_dataframe
+from storage import export_bytes
+
+# Engine name -> label shown in the sidebar
+ENGINE_LABELS = {
+    'pandas': "pandas (in memory)",
+    'duckdb': "DuckDB (out-of-core)",
+    'polars': "Polars (out-of-core)",
+}
+# File formats the out-of-core engines open (anything but Parquet is converted once)
+ENGINE_FORMATS = ('csv', 'parquet', 'arrow', 'feather')
+# Browser pages and category lists memoised per engine
+QUERY_CACHE_ENTRIES = 64
+
+
+def engine_available(name):
+    if name == 'pandas':
+        return True
+    return (importlib.util.find_spec(name) is not None
+            and importlib.util.find_spec('pyarrow') is not None)
+
+
+def available_engines():
+    return [name for name in ENGINE_LABELS if engine_available(name)]
+
+
+def profile_fill_values(profile, numeric_strategy='mean', categorical_strategy='mode'):
+    """Fill values for the columns with missing values, read off a DatasetProfile (no pass over the data)"""
+    if numeric_strategy not in NUMERIC_STRATEGIES:
+        raise ValueError(f"Unknown numeric strategy: {numeric_strategy!r}")
+    if categorical_strategy not in CATEGORICAL_STRATEGIES:
+        raise ValueError(f"Unknown categorical strategy: {categorical_strategy!r}")
+    missing = set(profile.missing.index)
+    stats = profile.columns
+    fills = {}
+    for col in profile.numeric_columns:
+        if col in missing:
+            fills[col] = 0 if numeric_strategy == 'zero' else float(stats.at[col, numeric_strategy])
+    for col in profile.categorical_columns:
+        if col in missing:
+            top = profile.top_values.get(col)
+            mode = top.index[0] if categorical_strategy == 'mode' and top is not None and len(top) else UNKNOWN_LABEL
+            fills[col] = mode
+    # All-missing numeric columns have no mean/median to fill with
+    return {col: value for col, value in fills.items() if not (isinstance(value, float) and np.isnan(value))}
+
+
+class Engine:
+    """One version of a dataset and the operations the dashboard runs on it"""
+    name = None
+
+    n_rows = 0
+    columns = []
+
+    def __len__(self):
+        return self.n_rows
+
+    def is_numeric(self, column):
+        raise NotImplementedError
+
+    def profile(self, top_k=DEFAULT_TOP_K, approximate=False):
+        """DatasetProfile of the whole dataset; approximate trades exact quantiles and distinct counts for speed"""
+        raise NotImplementedError
+
+    def clean(self, numeric_strategy='mean', categorical_strategy='mode', profile=None):
+        """Engine over the dataset with missing values filled (fill values read off profile if approximate)"""
+        raise NotImplementedError
+
+    def histogram(self, column):
+        """aggregates.histogram_aggregate() of one numeric column"""
+        raise NotImplementedError
+
+    def top_categories(self, column, limit=MAX_CATEGORIES):
+        """aggregates.top_categories() of one column"""
+        raise NotImplementedError
+
+    def box_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        raise NotImplementedError
+
+    def mean_ci_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        raise NotImplementedError
+
+    def correlation(self, method='pearson', dtype=np.float64):
+        """Correlation matrix of the numeric columns"""
+        raise NotImplementedError
+
+    def to_pandas(self, columns=None, limit=None):
+        """The first limit rows (all by default) of columns as a DataFrame"""
+        raise NotImplementedError
+
+    def categories(self, column, limit=100):
+        """Sorted distinct values of a categorical column with at most limit of them, else None"""
+        raise NotImplementedError
+
+    def count(self, filter_column=None, filter_spec=None):
+        """Rows passing a browser filter spec"""
+        raise NotImplementedError
+
+    def page(self, page, page_size, columns=None, sort=None, ascending=True, filter_column=None, filter_spec=None):
+        """One page (1-based) of the sorted, filtered rows, like browser.get_page()"""
+        raise NotImplementedError
+
+    def export(self, label):
+        """The dataset serialized in one of storage.EXPORT_FORMATS"""
+        raise NotImplementedError
+
+
+class PandasEngine(Engine):
+    """An in-memory DataFrame; delegates to the NumPy/pandas implementations.
+
+    Browser views are cached in index (a shared BrowserIndex) under key when
+    given, otherwise in a small index of the engine's own. Profiling and
+    cleaning spread the columns over executor (a ColumnExecutor) if given.
+    """
+    name = 'pandas'
+
+    def __init__(self, df, key=None, index=None, executor=None):
+        self.df = df
+        self.key = key if index is not None else 'frame'
+        self.index = index if index is not None else BrowserIndex(max_entries=8)
+        self.executor = executor
+        self.n_rows = len(df)
+        self.columns = list(df.columns)
+
+    def is_numeric(self, column):
+        return pd.api.types.is_numeric_dtype(self.df[column])
+
+    def profile(self, top_k=DEFAULT_TOP_K, approximate=False):
+        return profile_dataframe(self.df, top_k, executor=self.executor, approximate=approximate)
+
+    def clean(self, numeric_strategy='mean', categorical_strategy='mode', profile=None):
+        if profile is not None and profile.approximate:
+            cleaned = apply_fill_values(self.df, profile_fill_values(profile, numeric_strategy, categorical_strategy))
+            return PandasEngine(cleaned, executor=self.executor)
+        null_counts = profile.columns['null_count'] if profile is not None else None
+        cleaned = clean_data(self.df, numeric_strategy, categorical_strategy, null_counts=null_counts,
+                             executor=self.executor)
+        return PandasEngine(cleaned, executor=self.executor)
+
+    def histogram(self, column):
+        return histogram_aggregate(self.df[column])
+
+    def top_categories(self, column, limit=MAX_CATEGORIES):
+        return top_categories(self.df[column], limit)
+
+    def box_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        return box_aggregate(self.df, x_col, y_col, limit)
+
+    def mean_ci_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        return mean_ci_aggregate(self.df, x_col, y_col, limit)
+
+    def correlation(self, method='pearson', dtype=np.float64):
+        return correlation_matrix(self.df, method, dtype=dtype)
+
+    def to_pandas(self, columns=None, limit=None):
+        df = self.df if columns is None else self.df[list(columns)]
+        return df if limit is None else df.head(limit)
+
+    def categories(self, column, limit=100):
+        dtype = self.df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and len(dtype.categories) <= limit:
+            return list(dtype.categories)
+        return None
+
+    def _positions(self, sort, ascending, filter_column, filter_spec):
+        return self.index.view(self.key, self.df, sort, ascending, filter_column, filter_spec)
+
+    def count(self, filter_column=None, filter_spec=None):
+        if filter_spec is None:
+            return self.n_rows
+        return len(self._positions(None, True, filter_column, filter_spec))
+
+    def page(self, page, page_size, columns=None, sort=None, ascending=True, filter_column=None, filter_spec=None):
+        positions = self._positions(sort, ascending, filter_column, filter_spec)
+        return get_page(self.df, positions, page, page_size, columns)
+
+    def export(self, label):
+        return export_bytes(self.df, label)
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return f"CAST('{float(value)!r}' AS DOUBLE)"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _numeric_sql_type(type_name):
+    base = type_name.split('(')[0].upper()
+    return base in ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER',
+                    'UBIGINT', 'UHUGEINT', 'FLOAT', 'DOUBLE', 'DECIMAL')
+
+
+def _categorical_sql_type(type_name):
+    return type_name.split('(')[0].upper() in ('VARCHAR', 'ENUM')
+
+
+def _record_batch_values(batch):
+    """2-D float64 array of an Arrow record batch of doubles (nulls as NaN)"""
+    return np.column_stack([column.to_numpy(zero_copy_only=False) for column in batch.columns]).astype(np.float64)
+
+
+class _OutOfCoreEngine(Engine):
+    """Shared logic of the engines that scan a Parquet file"""
+
+    def __init__(self, path, fills=None, **options):
+        self.path = path
+        self.fills = fills or {}
+        self.options = options
+        self._queries = LRUCache(max_entries=QUERY_CACHE_ENTRIES, max_bytes=256 * 1024 ** 2)
+
+    def _memo(self, key, create):
+        return self._queries.get_or_create(key, create)
+
+    def is_numeric(self, column):
+        return column in self.numeric_columns
+
+    def clean(self, numeric_strategy='mean', categorical_strategy='mode', profile=None):
+        profile = profile or self.profile()
+        fills = profile_fill_values(profile, numeric_strategy, categorical_strategy)
+        return type(self)(self.path, fills={**self.fills, **fills}, **self.options)
+
+    def _size_bytes(self):
+        return os.path.getsize(self.path)
+
+    def profile(self, top_k=DEFAULT_TOP_K, approximate=False):
+        # One query per column: each reads only its own column of the Parquet file, so memory
+        # stays at one column's worth of exact quantiles and distinct values however wide the data is
+        rows, top_values = {}, {}
+        for col in self.columns:
+            stats = self._column_stats(col, approximate)
+            stats['null_count'] = self.n_rows - stats['count']
+            rows[col] = {name: np.nan if value is None else value for name, value in stats.items()}
+            if col not in self.numeric_columns:
+                top_values[col] = self._top_values(col, top_k)
+        profile = build_profile(
+            rows,
+            dtypes=pd.Series([str(self.types[col]) for col in self.columns], index=self.columns),
+            n_rows=self.n_rows,
+            memory_bytes=self._size_bytes(),
+            top_values=top_values,
+            numeric_columns=self.numeric_columns,
+            categorical_columns=self.categorical_columns,
+        )
+        if approximate:
+            profile.approximate = True
+            profile.error_bounds = dict(self.approximate_error_bounds)
+        return profile
+
+    # Statistics the engine's approximate aggregates estimate, and how
+    approximate_error_bounds = {}
+
+    def _column_stats(self, col, approximate=False):
+        """count and unique, plus mean, std, min, q25, median, q75 and max for numeric columns"""
+        raise NotImplementedError
+
+    def _top_values(self, col, limit):
+        """value_counts().head(limit) of a column"""
+        raise NotImplementedError
+
+    def categories(self, column, limit=100):
+        if column not in self.categorical_columns:
+            return None
+
+        def create():
+            counts, total = self.top_categories(column, limit)
+            return sorted(counts.index, key=str) if total <= limit else None
+        return self._memo(('categories', column, limit), create)
+
+    def count(self, filter_column=None, filter_spec=None):
+        if filter_spec is None:
+            return self.n_rows
+        return self._memo(('count', filter_column, filter_spec), lambda: self._count(filter_column, filter_spec))
+
+    def page(self, page, page_size, columns=None, sort=None, ascending=True, filter_column=None, filter_spec=None):
+        columns = list(self.columns if columns is None else columns)
+        key = ('page', page, page_size, tuple(columns), sort, ascending, filter_column, filter_spec)
+        return self._memo(key, lambda: self._page((page - 1) * page_size, page_size, columns, sort, ascending,
+                                                  filter_column, filter_spec))
+
+    def _grouped_result(self, rows, total, box):
+        """box_aggregate / mean_ci_aggregate results from (label, ...) rows in group order"""
+        if box:
+            stats = [{'label': str(label), 'q1': q1, 'med': med, 'q3': q3,
+                      'whislo': q1 if whislo is None else whislo, 'whishi': q3 if whishi is None else whishi,
+                      'fliers': []} for label, q1, med, q3, whislo, whishi in rows]
+            return stats, total
+        agg = pd.DataFrame([row[1:] for row in rows], index=[row[0] for row in rows],
+                           columns=['mean', 'std', 'count'], dtype=np.float64)
+        agg['count'] = agg['count'].astype(np.int64)
+        agg['ci'] = confidence_interval(agg)
+        return agg, total
+
+
+class DuckDBEngine(_OutOfCoreEngine):
+    """SQL over a Parquet file with DuckDB.
+
+    Each engine holds one in-process DuckDB connection, opened with options
+    as its configuration (e.g. memory_limit, temp_directory for spilling,
+    threads); queries from different sessions are serialized on it.
+    """
+    name = 'duckdb'
+
+    def __init__(self, path, fills=None, **options):
+        super().__init__(path, fills, **options)
+        import duckdb
+        self._con = duckdb.connect(config={name: value for name, value in options.items() if value})
+        self._lock = threading.Lock()
+        source = f"read_parquet({_literal(path)})"
+        schema = self._fetch(f"DESCRIBE SELECT * FROM {source}")
+        self.columns = [row[0] for row in schema]
+        self.types = {row[0]: row[1] for row in schema}
+        select = []
+        for col in self.columns:
+            if col in self.fills:
+                select.append(f"COALESCE({self._fill_target(col)}, {_literal(self.fills[col])}) AS {_quote(col)}")
+            else:
+                select.append(_quote(col))
+        self.relation = f"(SELECT {', '.join(select)} FROM {source}) AS t" if self.fills else source
+        if self.fills:
+            self.types = {row[0]: row[1] for row in self._fetch(f"DESCRIBE SELECT * FROM {self.relation}")}
+        self.numeric_columns = [col for col in self.columns if _numeric_sql_type(self.types[col])]
+        self.categorical_columns = [col for col in self.columns if _categorical_sql_type(self.types[col])]
+        self.n_rows = self._fetch(f"SELECT count(*) FROM {source}")[0][0]
+
+    def _fill_target(self, col):
+        value = self.fills[col]
+        if isinstance(value, str):
+            return f"CAST({_quote(col)} AS VARCHAR)"  # e.g. ENUM columns taking 'Unknown'
+        if isinstance(value, float) and not value.is_integer():
+            return f"CAST({_quote(col)} AS DOUBLE)"
+        return _quote(col)
+
+    def _fetch(self, sql, params=None):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    def _frame(self, sql, params=None):
+        with self._lock:
+            return self._con.execute(sql, params).df()
+
+    def _value(self, col):
+        """A numeric column as DOUBLE with NaN read as missing, like pandas"""
+        return f"nullif(CAST({_quote(col)} AS DOUBLE), 'NaN'::DOUBLE)"
+
+    approximate_error_bounds = {
+        'quantiles': "t-digest estimate (DuckDB approx_quantile)",
+        'unique': "HyperLogLog estimate (DuckDB approx_count_distinct)",
+    }
+
+    def _column_stats(self, col, approximate=False):
+        numeric = col in self.numeric_columns
+        value = self._value(col) if numeric else _quote(col)
+        distinct = f"approx_count_distinct({value})" if approximate else f"count(DISTINCT {value})"
+        expressions = [f"count({value})", distinct]
+        if numeric:
+            quantiles = (f"approx_quantile({value}, [0.25, 0.5, 0.75])" if approximate
+                         else f"quantile_cont({value}, [0.25, 0.5, 0.75])")
+            expressions += [f"avg({value})", f"stddev_samp({value})", f"min({value})", quantiles, f"max({value})"]
+        result = self._fetch(f"SELECT {', '.join(expressions)} FROM {self.relation}")[0]
+        stats = {'count': result[0], 'unique': result[1]}
+        if numeric:
+            q25, median, q75 = result[5] if result[5] is not None else (None, None, None)
+            stats.update(mean=result[2], std=result[3], min=result[4], q25=q25, median=median, q75=q75, max=result[6])
+        return stats
+
+    def _top_values(self, col, limit):
+        q = _quote(col)
+        rows = self._fetch(f"SELECT {q}, count(*) AS n FROM {self.relation} WHERE {q} IS NOT NULL "
+                           f"GROUP BY {q} ORDER BY n DESC, {q} LIMIT {int(limit)}")
+        return pd.Series([n for _, n in rows], index=pd.Index([value for value, _ in rows], name=col),
+                         name='count', dtype=np.int64)
+
+    def histogram(self, column, sample_rows=KDE_SAMPLE_ROWS):
+        values = f"(SELECT {self._value(column)} AS v FROM {self.relation}) AS s WHERE isfinite(v)"
+        n_values, low, high = self._fetch(f"SELECT count(v), min(v), max(v) FROM {values}")[0]
+        if not n_values:
+            return None
+        sample = np.array([row[0] for row in self._fetch(
+            f"SELECT v FROM (SELECT v FROM {values}) AS f USING SAMPLE reservoir({int(sample_rows)} ROWS) REPEATABLE (0)")])
+        edges = histogram_edges(sample, low, high)
+        n_bins = len(edges) - 1
+        width = (edges[-1] - edges[0]) / n_bins
+        counts = np.zeros(n_bins, dtype=np.int64)
+        for b, n in self._fetch(f"SELECT least(greatest(floor((v - {float(edges[0])!r}) / {float(width)!r}), 0), "
+                                f"{n_bins - 1})::BIGINT AS b, "
+                                f"count(*) FROM {values} GROUP BY b"):
+            counts[b] = n
+        return histogram_result(counts, edges, sample, n_values)
+
+    def top_categories(self, column, limit=MAX_CATEGORIES):
+        q = _quote(column)
+        rows = self._fetch(f"SELECT {q}, n, total FROM (SELECT {q}, count(*) AS n, count(*) OVER () AS total "
+                           f"FROM {self.relation} WHERE {q} IS NOT NULL GROUP BY {q}) ORDER BY n DESC LIMIT {int(limit)}")
+        counts = pd.Series([row[1] for row in rows], index=pd.Index([row[0] for row in rows], name=column),
+                           name='count', dtype=np.int64)
+        return counts, (rows[0][2] if rows else 0)
+
+    def _groups_sql(self, x_col, y_col, limit):
+        x = _quote(x_col)
+        return (f"WITH data AS (SELECT {x} AS g, {self._value(y_col)} AS v FROM {self.relation}), "
+                f"valid AS (SELECT * FROM data WHERE g IS NOT NULL AND v IS NOT NULL), "
+                f"groups AS (SELECT g, row_number() OVER (ORDER BY count(*) DESC) AS rank, count(*) OVER () AS total "
+                f"FROM valid GROUP BY g), "
+                f"top AS (SELECT * FROM groups WHERE rank <= {int(limit)}) ")
+
+    def _total_groups(self, x_col, y_col, limit):
+        rows = self._fetch(self._groups_sql(x_col, y_col, limit) + "SELECT max(total) FROM groups")
+        return rows[0][0] or 0
+
+    def box_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        rows = self._fetch(
+            self._groups_sql(x_col, y_col, limit)
+            + ", q AS (SELECT g, quantile_cont(v, 0.25) AS q1, quantile_cont(v, 0.5) AS med, quantile_cont(v, 0.75) AS q3 "
+              "FROM valid SEMI JOIN top USING (g) GROUP BY g) "
+              "SELECT q.g, q1, med, q3, min(v) FILTER (WHERE v >= q1 - 1.5 * (q3 - q1)), "
+              "max(v) FILTER (WHERE v <= q3 + 1.5 * (q3 - q1)) "
+              "FROM valid JOIN q USING (g) JOIN top USING (g) GROUP BY q.g, q1, med, q3, top.rank ORDER BY top.rank")
+        return self._grouped_result(rows, self._total_groups(x_col, y_col, limit), box=True)
+
+    def mean_ci_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        rows = self._fetch(
+            self._groups_sql(x_col, y_col, limit)
+            + "SELECT g, avg(v), stddev_samp(v), count(v) FROM valid JOIN top USING (g) GROUP BY g, top.rank ORDER BY top.rank")
+        return self._grouped_result(rows, self._total_groups(x_col, y_col, limit), box=False)
+
+    def correlation(self, method='pearson', dtype=np.float64):
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method: {method!r}")
+        columns = pd.Index(self.numeric_columns)
+        if len(columns) == 0:
+            return pd.DataFrame(index=columns, columns=columns, dtype=np.float64)
+        if method == 'spearman':
+            # Average ranks: ties share the mean of the positions they span
+            values = [f"CASE WHEN {self._value(col)} IS NULL THEN NULL ELSE "
+                      f"rank() OVER (ORDER BY {self._value(col)}) + (count(*) OVER (PARTITION BY {self._value(col)}) - 1) / 2.0 END"
+                      for col in columns]
+            center = np.full(len(columns), (self.n_rows + 1) / 2)
+        else:
+            values = [self._value(col) for col in columns]
+            center = np.nan_to_num(np.array(
+                self._fetch(f"SELECT {', '.join(f'avg({v})' for v in values)} FROM {self.relation}")[0], dtype=np.float64))
+        accumulator = CorrelationAccumulator(columns, center, dtype)
+        rows = block_rows(len(columns), itemsize=np.dtype(dtype).itemsize)
+        with self._lock:
+            reader = self._con.execute(f"SELECT {', '.join(f'CAST({v} AS DOUBLE)' for v in values)} "
+                                       f"FROM {self.relation}").to_arrow_reader(rows)
+            for batch in reader:
+                if batch.num_rows:
+                    accumulator.add(_record_batch_values(batch))
+        return accumulator.result()
+
+    def to_pandas(self, columns=None, limit=None):
+        select = '*' if columns is None else ', '.join(_quote(col) for col in columns)
+        return self._frame(f"SELECT {select} FROM {self.relation}" + ("" if limit is None else f" LIMIT {int(limit)}"))
+
+    def _where(self, column, spec):
+        if spec is None:
+            return "", []
+        q = _quote(column)
+        value = self._value(column) if column in self.numeric_columns else q
+        kind = spec[0]
+        if kind == 'range':
+            return f" WHERE {value} BETWEEN ? AND ?", [spec[1], spec[2]]
+        if kind == 'contains':
+            return f" WHERE contains(lower(CAST({q} AS VARCHAR)), lower(?))", [spec[1]]
+        if kind == 'in':
+            return f" WHERE CAST({q} AS VARCHAR) IN ({', '.join('?' for _ in spec[1])})", [str(v) for v in spec[1]]
+        if kind == 'missing':
+            return f" WHERE {value} IS NULL", []
+        if kind == 'present':
+            return f" WHERE {value} IS NOT NULL", []
+        raise ValueError(f"Unknown filter: {kind!r}")
+
+    def _count(self, filter_column, filter_spec):
+        where, params = self._where(filter_column, filter_spec)
+        return self._fetch(f"SELECT count(*) FROM {self.relation}{where}", params)[0][0]
+
+    def _page(self, offset, limit, columns, sort, ascending, filter_column, filter_spec):
+        where, params = self._where(filter_column, filter_spec)
+        order = "" if sort is None else f" ORDER BY {_quote(sort)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+        select = ', '.join(_quote(col) for col in columns)
+        return self._frame(f"SELECT {select} FROM {self.relation}{where}{order} LIMIT {int(limit)} OFFSET {int(offset)}",
+                           params)
+
+    def export(self, label):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export')
+            if label == "CSV":
+                self._fetch(f"COPY (SELECT * FROM {self.relation}) TO {_literal(path)} (FORMAT csv, HEADER)")
+            elif label == "Parquet":
+                self._fetch(f"COPY (SELECT * FROM {self.relation}) TO {_literal(path)} (FORMAT parquet, COMPRESSION zstd)")
+            else:
+                import pyarrow.ipc as ipc
+                with self._lock:
+                    reader = self._con.execute(f"SELECT * FROM {self.relation}").to_arrow_reader(100_000)
+                    with ipc.new_file(path, reader.schema) as writer:
+                        for batch in reader:
+                            writer.write_batch(batch)
+            with open(path, 'rb') as f:
+                return f.read()
+
+
+class PolarsEngine(_OutOfCoreEngine):
+    """Lazy Polars queries over a Parquet file, collected with the streaming engine"""
+    name = 'polars'
+
+    def __init__(self, path, fills=None, **options):
+        super().__init__(path, fills, **options)
+        import polars as pl
+        self._pl = pl
+        frame = pl.scan_parquet(path)
+        schema = frame.collect_schema()
+        if self.fills:
+            fill_exprs = []
+            for col, value in self.fills.items():
+                expr = pl.col(col)
+                if isinstance(value, str) and schema[col] != pl.String:
+                    expr = expr.cast(pl.String)  # e.g. categoricals taking 'Unknown'
+                elif schema[col].is_float():
+                    expr = expr.fill_nan(None)
+                fill_exprs.append(expr.fill_null(value).alias(col))
+            frame = frame.with_columns(fill_exprs)
+            schema = frame.collect_schema()
+        self.frame = frame
+        self.columns = list(schema.names())
+        self.types = dict(schema.items())
+        self.numeric_columns = [col for col, dtype in schema.items() if dtype.is_numeric()]
+        self.categorical_columns = [col for col, dtype in schema.items()
+                                    if dtype in (pl.String, pl.Categorical) or isinstance(dtype, pl.Enum)]
+        self.n_rows = self._collect(pl.scan_parquet(path).select(pl.len())).item()
+
+    def _collect(self, frame):
+        return frame.collect(engine='streaming')
+
+    def _value(self, col):
+        """A numeric column as Float64 with NaN read as missing, like pandas"""
+        return self._pl.col(col).cast(self._pl.Float64).fill_nan(None)
+
+    approximate_error_bounds = {
+        'unique': "HyperLogLog estimate (Polars approx_n_unique)",
+    }
+
+    def _column_stats(self, col, approximate=False):
+        value = self._value(col) if col in self.numeric_columns else self._pl.col(col)
+        distinct = value.drop_nulls().approx_n_unique() if approximate else value.drop_nulls().n_unique()
+        expressions = [value.count().alias('count'), distinct.alias('unique')]
+        if col in self.numeric_columns:
+            expressions += [value.mean().alias('mean'), value.std().alias('std'), value.min().alias('min'),
+                            value.max().alias('max')]
+            expressions += [value.quantile(q, 'linear').alias(name)
+                            for q, name in ((0.25, 'q25'), (0.5, 'median'), (0.75, 'q75'))]
+        return self._collect(self.frame.select(expressions)).row(0, named=True)
+
+    def _value_counts(self, col):
+        pl = self._pl
+        return (self.frame.select(pl.col(col)).drop_nulls().group_by(col).agg(pl.len().alias('n')))
+
+    def _top_values(self, col, limit):
+        counts = self._collect(self._value_counts(col).sort(['n', col], descending=[True, False]).head(limit))
+        return pd.Series(counts['n'].to_list(), index=pd.Index(counts[col].to_list(), name=col), name='count',
+                         dtype=np.int64)
+
+    def histogram(self, column, sample_rows=KDE_SAMPLE_ROWS):
+        pl = self._pl
+        values = self.frame.select(self._value(column).alias('v')).filter(pl.col('v').is_finite())
+        n_values, low, high = self._collect(values.select(pl.len(), pl.col('v').min().alias('low'), pl.col('v').max().alias('high'))).row(0)
+        if not n_values:
+            return None
+        # Systematic sample: every k-th value, streamed
+        step = max(1, n_values // sample_rows)
+        sample = self._collect(values.gather_every(step).head(sample_rows))['v'].to_numpy()
+        edges = histogram_edges(sample, low, high)
+        n_bins = len(edges) - 1
+        width = (edges[-1] - edges[0]) / n_bins
+        bins = self._collect(values.select(((pl.col('v') - edges[0]) / width).floor().clip(0, n_bins - 1)
+                                           .cast(pl.Int64).alias('b')).group_by('b').agg(pl.len().alias('n')))
+        counts = np.zeros(n_bins, dtype=np.int64)
+        counts[bins['b'].to_numpy()] = bins['n'].to_numpy()
+        return histogram_result(counts, edges, sample, n_values)
+
+    def top_categories(self, column, limit=MAX_CATEGORIES):
+        counts = self._collect(self._value_counts(column).sort('n', descending=True))
+        top = counts.head(limit)
+        return (pd.Series(top['n'].to_list(), index=pd.Index(top[column].to_list(), name=column), name='count',
+                          dtype=np.int64), counts.height)
+
+    def _groups(self, x_col, y_col, limit):
+        pl = self._pl
+        valid = self.frame.select(pl.col(x_col).alias('g'), self._value(y_col).alias('v')).drop_nulls()
+        groups = self._collect(valid.group_by('g').agg(pl.len().alias('n')).sort('n', descending=True))
+        top = groups.head(limit)['g'].to_list()
+        return valid.filter(pl.col('g').is_in(top)), top, groups.height
+
+    def _ordered_rows(self, result, top):
+        rows = {row[0]: row for row in result.iter_rows()}
+        return [rows[label] for label in top if label in rows]
+
+    def box_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        pl = self._pl
+        valid, top, total = self._groups(x_col, y_col, limit)
+        v = pl.col('v')
+        q1, q3 = v.quantile(0.25, 'linear'), v.quantile(0.75, 'linear')
+        result = self._collect(valid.group_by('g').agg(
+            q1.alias('q1'), v.quantile(0.5, 'linear').alias('med'), q3.alias('q3'),
+            v.filter(v >= q1 - 1.5 * (q3 - q1)).min().alias('whislo'),
+            v.filter(v <= q3 + 1.5 * (q3 - q1)).max().alias('whishi')))
+        return self._grouped_result(self._ordered_rows(result, top), total, box=True)
+
+    def mean_ci_aggregate(self, x_col, y_col, limit=MAX_CATEGORIES):
+        pl = self._pl
+        valid, top, total = self._groups(x_col, y_col, limit)
+        result = self._collect(valid.group_by('g').agg(pl.col('v').mean(), pl.col('v').std().alias('std'),
+                                                      pl.len().alias('count')))
+        return self._grouped_result(self._ordered_rows(result, top), total, box=False)
+
+    def correlation(self, method='pearson', dtype=np.float64):
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method: {method!r}")
+        pl = self._pl
+        columns = pd.Index(self.numeric_columns)
+        if len(columns) == 0:
+            return pd.DataFrame(index=columns, columns=columns, dtype=np.float64)
+        values = [self._value(col).alias(str(i)) for i, col in enumerate(columns)]
+        if method == 'spearman':
+            values = [value.rank('average').cast(pl.Float64).alias(str(i)) for i, value in enumerate(values)]
+            center = np.full(len(columns), (self.n_rows + 1) / 2)
+        else:
+            center = np.nan_to_num(self._collect(self.frame.select([value.mean() for value in values]))
+                                   .to_numpy()[0].astype(np.float64))
+        accumulator = CorrelationAccumulator(columns, center, dtype)
+        rows = block_rows(len(columns), itemsize=np.dtype(dtype).itemsize)
+        for batch in self.frame.select(values).collect_batches(chunk_size=rows):
+            if batch.height:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    accumulator.add(batch.to_numpy().astype(np.float64))
+        return accumulator.result()
+
+    def to_pandas(self, columns=None, limit=None):
+        frame = self.frame if columns is None else self.frame.select(list(columns))
+        if limit is not None:
+            frame = frame.head(limit)
+        return self._collect(frame).to_pandas()
+
+    def _filter(self, column, spec):
+        pl = self._pl
+        col = self._value(column) if column in self.numeric_columns else pl.col(column)
+        kind = spec[0]
+        if kind == 'range':
+            return col.is_between(spec[1], spec[2])
+        if kind == 'contains':
+            return pl.col(column).cast(pl.String).str.to_lowercase().str.contains(spec[1].lower(), literal=True)
+        if kind == 'in':
+            return pl.col(column).cast(pl.String).is_in([str(v) for v in spec[1]])
+        if kind == 'missing':
+            return col.is_null()
+        if kind == 'present':
+            return col.is_not_null()
+        raise ValueError(f"Unknown filter: {kind!r}")
+
+    def _count(self, filter_column, filter_spec):
+        pl = self._pl
+        return self._collect(self.frame.filter(self._filter(filter_column, filter_spec)).select(pl.len())).item()
+
+    def _page(self, offset, limit, columns, sort, ascending, filter_column, filter_spec):
+        frame = self.frame
+        if filter_spec is not None:
+            frame = frame.filter(self._filter(filter_column, filter_spec))
+        if sort is not None:
+            frame = frame.sort(sort, descending=not ascending, nulls_last=True, maintain_order=True)
+        return self._collect(frame.slice(offset, limit).select(columns)).to_pandas()
+
+    def export(self, label):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export')
+            if label == "CSV":
+                self.frame.sink_csv(path)
+            elif label == "Parquet":
+                self.frame.sink_parquet(path, compression='zstd')
+            else:
+                self.frame.sink_ipc(path)
+            with open(path, 'rb') as f:
+                return f.read()
+
+
+ENGINES = {'pandas': PandasEngine, 'duckdb': DuckDBEngine, 'polars': PolarsEngine}
+
+
+def as_engine(data):
+    """data itself if it is already an Engine, else a PandasEngine over the DataFrame"""
+    return data if isinstance(data, Engine) else PandasEngine(data)
+
+
+def convert_to_parquet(source, fmt, dest, engine='duckdb'):
+    """Stream a CSV or Arrow IPC file into Parquet at dest without loading it into memory.
+
+    CSV goes through the chosen engine's own reader; Arrow IPC is copied batch
+    by batch with pyarrow. The file is written next to dest and moved into
+    place once complete.
+    """
+    tmp_path = f"{dest}.{os.getpid()}.tmp"
+    try:
+        if fmt == 'csv' and engine == 'polars':
+            import polars as pl
+            pl.scan_csv(source, infer_schema_length=10_000).sink_parquet(tmp_path, compression='zstd')
+        elif fmt == 'csv':
+            import duckdb
+            with duckdb.connect() as con:
+                con.execute(f"COPY (SELECT * FROM read_csv({_literal(source)})) TO {_literal(tmp_path)} "
+                            f"(FORMAT parquet, COMPRESSION zstd)")
+        elif fmt in ('arrow', 'feather'):
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+            import pyarrow.parquet as pq
+            with pa.memory_map(source, 'r') as mapped:
+                try:
+                    reader = ipc.open_file(mapped)
+                    batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+                except pa.ArrowInvalid:
+                    mapped.seek(0)
+                    reader = ipc.open_stream(mapped)  # Arrow IPC stream files have no footer
+                    batches = iter(reader)
+                with pq.ParquetWriter(tmp_path, reader.schema, compression='zstd') as writer:
+                    for batch in batches:
+                        writer.write_batch(batch)
+        else:
+            raise ValueError(f"Unsupported format: {fmt!r}")
+        os.replace(tmp_path, dest)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dest
+
+
+def write_upload(buffer, fmt, dest, engine='duckdb'):
+    """Parquet file at dest holding an uploaded file's bytes (converted unless already Parquet)"""
+    if fmt == 'parquet':
+        tmp_path = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer)
+        os.replace(tmp_path, dest)
+        return dest
+    with tempfile.NamedTemporaryFile(suffix=f'.{fmt}', dir=os.path.dirname(dest) or None, delete=False) as f:
+        f.write(buffer)
+        source = f.name
+    try:
+        return convert_to_parquet(source, fmt, dest, engine)
+    finally:
+        os.remove(source)
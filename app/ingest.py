@@ -0,0 +1,153 @@
+"""
+Chunked CSV ingest with compact dtype inference for large uploads.
+
+The file is parsed in chunks; each chunk is shrunk to compact dtypes before the
+next one is read, so peak memory stays close to the size of the final frame.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+DEFAULT_CHUNKSIZE = 250_000
+DEFAULT_SAMPLE_ROWS = 50_000
+# A string column becomes `category` when it repeats enough in the sample
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+CATEGORY_MAX_UNIQUE = 50_000
+
+# Dtypes treated as categorical by the dashboard (str/object strings and pandas categoricals)
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+
+
+def numeric_columns(df):
+    """Columns of any numeric dtype, including downcast and nullable integers"""
+    return df.select_dtypes(include=[np.number]).columns
+
+
+def categorical_columns(df):
+    """String, object and category columns"""
+    return df.select_dtypes(include=CATEGORICAL_DTYPES).columns
+
+
+def infer_dtypes(sample, category_max_ratio=CATEGORY_MAX_UNIQUE_RATIO, category_max_unique=CATEGORY_MAX_UNIQUE):
+    """Choose compact dtypes from a sample of the file.
+
+    Returns (read_dtypes, nullable_int_columns): the dtypes to pass to
+    read_csv and the float columns whose sampled values are all whole numbers
+    with gaps, which are stored as nullable integers. Text columns are pinned
+    to str so that chunks which happen to hold only digits parse the same way.
+    """
+    read_dtypes = {}
+    nullable_ints = set()
+    for col in sample.columns:
+        series = sample[col]
+        if pd.api.types.is_numeric_dtype(series):
+            if pd.api.types.is_float_dtype(series) and series.isna().any():
+                values = series.dropna().to_numpy()
+                if len(values) and np.array_equal(values, np.round(values)):
+                    nullable_ints.add(col)
+            continue
+        non_null = series.count()
+        if non_null == 0:
+            continue
+        n_unique = series.nunique()
+        if n_unique <= category_max_unique and n_unique / non_null <= category_max_ratio:
+            read_dtypes[col] = 'category'
+        elif pd.api.types.is_string_dtype(series):
+            read_dtypes[col] = str
+    return read_dtypes, nullable_ints
+
+
+def compact_numeric(series, nullable_int=False, downcast_floats=True):
+    """Downcast a numeric column to the smallest dtype that holds its values exactly"""
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if not pd.api.types.is_float_dtype(series):
+        return series
+    values = series.to_numpy()
+    finite = values[~np.isnan(values)]
+    # Whole numbers with gaps: nullable integers instead of float64
+    if nullable_int and np.array_equal(finite, np.round(finite)) and (
+            len(finite) == 0 or np.abs(finite).max() < 2 ** 53):
+        return pd.to_numeric(series.astype('Int64'), downcast='integer')
+    if downcast_floats:
+        as_float32 = values.astype(np.float32)
+        # Only keep float32 when every value survives the round trip
+        if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(as_float32, index=series.index, name=series.name)
+    return series
+
+
+def _combine(pieces):
+    """Concatenate one column's chunks, merging categorical dictionaries"""
+    if all(isinstance(p.dtype, pd.CategoricalDtype) for p in pieces):
+        return pd.Series(union_categoricals(pieces), name=pieces[0].name)
+    if any(isinstance(p.dtype, pd.CategoricalDtype) for p in pieces):
+        pieces = [p.astype(object) if isinstance(p.dtype, pd.CategoricalDtype) else p for p in pieces]
+    return pd.concat(pieces, ignore_index=True)
+
+
+def read_csv_chunked(source, chunksize=DEFAULT_CHUNKSIZE, sample_rows=DEFAULT_SAMPLE_ROWS,
+                     downcast_floats=True, progress_callback=None, **read_kwargs):
+    """Read a CSV in chunks into a memory-compact DataFrame.
+
+    source must be a seekable file-like object (e.g. a Streamlit UploadedFile).
+    progress_callback, if given, is called with a fraction in [0, 1] after
+    each chunk.
+    """
+    source.seek(0, 2)
+    total_bytes = source.tell() or 1
+    source.seek(0)
+
+    sample = pd.read_csv(source, nrows=sample_rows, **read_kwargs)
+    read_dtypes, nullable_ints = infer_dtypes(sample)
+    columns = list(sample.columns)
+    del sample
+    source.seek(0)
+
+    chunks = []
+    reader = pd.read_csv(source, chunksize=chunksize, dtype=read_dtypes or None, **read_kwargs)
+    for chunk in reader:
+        for col in chunk.columns:
+            if col not in read_dtypes and pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = compact_numeric(chunk[col], col in nullable_ints, downcast_floats)
+        chunks.append(chunk)
+        if progress_callback is not None:
+            progress_callback(min(source.tell() / total_bytes, 1.0))
+
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+
+    # Assemble column by column, releasing each chunk's copy as we go
+    data = {}
+    for col in chunks[0].columns:
+        data[col] = _combine([chunk.pop(col) for chunk in chunks])
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return pd.DataFrame(data)
+
+
+def read_csv_like(source, like, downcast_floats=True, **read_kwargs):
+    """Read CSV rows (e.g. rows appended to a file) into the column kinds of an existing frame.
+
+    Text columns are parsed as category or str to match `like`, numeric
+    columns are compacted as in read_csv_chunked. Returns None when the
+    columns differ or a numeric column of `like` holds text in source.
+    """
+    read_dtypes = {}
+    for col in categorical_columns(like):
+        read_dtypes[col] = 'category' if isinstance(like[col].dtype, pd.CategoricalDtype) else str
+    rows = pd.read_csv(source, dtype=read_dtypes or None, **read_kwargs)
+    if list(rows.columns) != list(like.columns):
+        return None
+    for col in numeric_columns(like):
+        if not pd.api.types.is_numeric_dtype(rows[col]):
+            if rows[col].notna().any():
+                return None
+            rows[col] = rows[col].astype('float64')  # all missing: read as empty text
+        rows[col] = compact_numeric(rows[col], pd.api.types.is_integer_dtype(like[col]), downcast_floats)
+    return rows
+
+
+def append_frames(frame, rows):
+    """frame with rows appended, column by column with merged categorical dictionaries"""
+    return pd.DataFrame({col: _combine([frame[col], rows[col]]) for col in frame.columns})
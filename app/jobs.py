@@ -0,0 +1,145 @@
+"""
+Background job queue for heavy operations (cleaning, plot rendering and exports, PDF reports).
+
+Jobs run on a bounded thread pool shared by every session, so a slow job
+never blocks a script rerun and a burst of users cannot run more than
+max_workers of them at once. Jobs are keyed by what they compute: submitting
+a key that is already queued or running returns the in-flight job, and
+finished results are kept in an LRUCache, so identical requests from any
+session run once. The Streamlit script only polls a job's status and
+progress.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import LRUCache
+
+QUEUED, RUNNING, DONE, ERROR = 'queued', 'running', 'done', 'error'
+FINISHED = (DONE, ERROR)
+
+_MISSING = object()
+
+
+class JobError(RuntimeError):
+    """A background job failed"""
+
+
+class Job:
+    """One background computation: status, progress and its value or error"""
+
+    def __init__(self, key, label=''):
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.value = None
+        self.error = None
+        self.cached = False
+        self.progress = 0.0
+        self.message = ''
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._done = threading.Event()
+
+    @classmethod
+    def from_cache(cls, key, value, label=''):
+        """An already finished job holding a cached value"""
+        job = cls(key, label)
+        job.value = value
+        job.cached = True
+        job.started = job.created
+        job._finish(DONE)
+        return job
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    @property
+    def elapsed(self):
+        start = self.started or self.created
+        return (self.finished or time.monotonic()) - start
+
+    def report(self, fraction, message=None):
+        """Progress callback for the job's function: fraction in [0, 1] and an optional status line"""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or timeout passes; True if it finished"""
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """The job's value, waiting for it; raises JobError if the job failed or is still running"""
+        if not self.wait(timeout):
+            raise JobError(f"{self.label or 'Job'} still running after {timeout:.0f}s")
+        if self.status == ERROR:
+            raise JobError(self.error)
+        return self.value
+
+    def _finish(self, status, error=None):
+        self.error = error
+        self.finished = time.monotonic()
+        self.status = status
+        self._done.set()
+
+    def run(self, fn):
+        self.started = time.monotonic()
+        self.status = RUNNING
+        try:
+            value = fn(self)
+        except Exception as e:
+            self._finish(ERROR, str(e) or type(e).__name__)
+        else:
+            self.value = value
+            self.progress = 1.0
+            self._finish(DONE)
+
+
+class JobQueue:
+    """Runs Jobs on a bounded thread pool, de-duplicating by key and caching finished values"""
+
+    def __init__(self, max_workers=4, max_results=64, max_result_bytes=512 * 1024 ** 2):
+        self.max_workers = max_workers
+        self.results = LRUCache(max_entries=max_results, max_bytes=max_result_bytes)
+        self._jobs = {}  # key -> queued or running Job
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+
+    def submit(self, key, fn, label='', cache=True):
+        """The job computing key: finished from the result cache, already in flight, or newly queued.
+
+        fn is called with the Job (for progress reports) and returns its value;
+        with cache=False the value is not kept once the job finishes (e.g. when
+        it is cached elsewhere already).
+        """
+        with self._lock:
+            value = self.results.get(key, _MISSING)
+            if value is not _MISSING:
+                return Job.from_cache(key, value, label)
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            job = self._jobs[key] = Job(key, label)
+        self._pool.submit(self._run, job, fn, cache)
+        return job
+
+    def _run(self, job, fn, cache):
+        job.run(fn)
+        with self._lock:
+            if cache and job.status == DONE:
+                self.results.put(job.key, job.value)
+            self._jobs.pop(job.key, None)
+
+    def stats(self):
+        """Summary of queued and running jobs and of the result cache"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "workers": self.max_workers,
+            "queued": sum(job.status == QUEUED for job in jobs),
+            "running": sum(job.status == RUNNING for job in jobs),
+            "results": self.results.stats(),
+        }
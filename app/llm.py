@@ -0,0 +1,287 @@
+"""
+Client and background runner for LLM insights.
+
+Requests go straight to the Ollama HTTP API (/api/chat with streaming NDJSON,
+/api/tags for the model list) using only the standard library, so any server
+speaking that protocol works, including benchmarks/fake_ollama.py.
+
+InsightService runs chats on a small thread pool. Each chat is tracked by an
+InsightJob that collects tokens as they arrive; the Streamlit script only
+polls the job, so a slow or hung model never blocks a session. Jobs stop at
+their deadline or when cancelled, checked between streamed chunks and
+bounded by the socket read timeout.
+
+Finished answers can be kept in a ResponseCache on disk, so the same prompt
+for the same model is answered instantly by any session, even after a
+restart.
+"""
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+DEFAULT_ENDPOINT = 'http://localhost:11434'
+DEFAULT_MODEL = 'mistral'
+
+QUEUED, RUNNING, DONE, ERROR, TIMEOUT, CANCELLED = 'queued', 'running', 'done', 'error', 'timeout', 'cancelled'
+FINISHED = (DONE, ERROR, TIMEOUT, CANCELLED)
+
+
+class LLMError(RuntimeError):
+    """The LLM server could not be reached or returned an error"""
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+def _request(endpoint, path, payload=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    return urllib.request.Request(endpoint.rstrip('/') + path, data=data,
+                                  headers={'Content-Type': 'application/json'})
+
+
+def list_models(endpoint=DEFAULT_ENDPOINT, timeout=2.0):
+    """Names of the models the server has pulled (raises LLMError if unreachable)"""
+    try:
+        with urllib.request.urlopen(_request(endpoint, '/api/tags'), timeout=timeout) as response:
+            body = json.load(response)
+    except (OSError, ValueError) as e:
+        raise LLMError(str(getattr(e, 'reason', e))) from e
+    return [model.get('name', 'Unknown') for model in body.get('models', [])]
+
+
+# Timing fields of Ollama's final chunk (durations in nanoseconds)
+STAT_FIELDS = ('prompt_eval_count', 'prompt_eval_duration', 'eval_count', 'eval_duration', 'total_duration')
+
+
+def stream_chat(prompt, model=DEFAULT_MODEL, endpoint=DEFAULT_ENDPOINT, timeout=120.0, read_timeout=30.0,
+                cancel_event=None, stats=None):
+    """Yield response tokens from /api/chat as the server produces them.
+
+    timeout bounds the whole exchange, read_timeout each wait for the next
+    chunk; setting cancel_event stops the stream at the next chunk. The
+    server's token counts and timings are copied into the stats dict.
+    """
+    deadline = time.monotonic() + timeout
+    payload = {'model': model, 'messages': [{'role': 'user', 'content': prompt}], 'stream': True}
+    try:
+        response = urllib.request.urlopen(_request(endpoint, '/api/chat', payload),
+                                          timeout=min(read_timeout, timeout))
+    except urllib.error.HTTPError as e:
+        raise LLMError(f"{e.code} {e.reason}: {e.read().decode(errors='replace').strip()}") from e
+    except OSError as e:
+        reason = getattr(e, 'reason', e)
+        if isinstance(reason, TimeoutError):
+            raise LLMTimeout(f"No response from {endpoint} within {min(read_timeout, timeout):.0f}s") from e
+        raise LLMError(str(reason)) from e
+
+    with response:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if time.monotonic() > deadline:
+                raise LLMTimeout(f"Response took longer than {timeout:.0f}s")
+            try:
+                line = response.readline()
+            except TimeoutError as e:
+                raise LLMTimeout(f"No tokens received for {read_timeout:.0f}s") from e
+            if not line:
+                return
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if 'error' in chunk:
+                raise LLMError(chunk['error'])
+            token = chunk.get('message', {}).get('content', '')
+            if token:
+                yield token
+            if chunk.get('done'):
+                if stats is not None:
+                    stats.update((name, chunk[name]) for name in STAT_FIELDS if name in chunk)
+                return
+
+
+class ResponseCache:
+    """Finished LLM answers as small JSON files, with a TTL and a size budget.
+
+    Like storage.DatasetStore, writes are atomic and best effort, and a
+    file's mtime records its last use for size-based eviction.
+    """
+
+    def __init__(self, root, ttl_seconds=7 * 24 * 3600, max_bytes=50 * 1024 ** 2):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key):
+        """The cached entry ({'text', 'model', 'created'}) or None if missing or expired"""
+        path = self.path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['created'] > self.ttl_seconds:
+                os.remove(path)
+                return None
+            os.utime(path)  # mark as recently used for prune()
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry
+
+    def put(self, key, text, model):
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'model': model, 'created': time.time()}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """Delete expired entries, then least recently used ones until the cache fits max_bytes"""
+        now = time.time()
+        files = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+                # mtime is refreshed on use, so this only drops entries no one has read within the TTL
+                if now - stat.st_mtime > self.ttl_seconds:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+class InsightJob:
+    """One background chat: status, tokens received so far and any error"""
+
+    def __init__(self, prompt, model, timeout, cache_key=None):
+        self.prompt = prompt
+        self.model = model
+        self.timeout = timeout
+        self.cache_key = cache_key
+        self.cached = False
+        self.status = QUEUED
+        self.error = None
+        self.created = time.monotonic()
+        self.started = None
+        self.first_token = None
+        self.finished = None
+        self.stats = {}
+        self._tokens = []
+        self._cancel = threading.Event()
+
+    @classmethod
+    def from_cache(cls, prompt, model, entry):
+        """An already finished job holding a cached answer"""
+        job = cls(prompt, model, timeout=0)
+        job._tokens.append(entry['text'])
+        job.cached = True
+        job.started = job.created
+        job._finish(DONE)
+        return job
+
+    @property
+    def text(self):
+        return ''.join(self._tokens)
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    @property
+    def elapsed(self):
+        start = self.started or self.created
+        return (self.finished or time.monotonic()) - start
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == QUEUED:
+            self._finish(CANCELLED)
+
+    def _finish(self, status, error=None):
+        self.error = error
+        self.finished = time.monotonic()
+        self.status = status
+
+    def run(self, endpoint, read_timeout, cache=None):
+        if self._cancel.is_set():
+            return
+        with METRICS.stage('get_llm_insights', cache='miss' if self.cache_key is not None else None) as run:
+            self._run(endpoint, read_timeout, cache)
+            if self.status != DONE:
+                run.error = self.status
+
+    def _run(self, endpoint, read_timeout, cache):
+        self.started = time.monotonic()
+        self.status = RUNNING
+        try:
+            for token in stream_chat(self.prompt, self.model, endpoint, self.timeout, read_timeout, self._cancel,
+                                     self.stats):
+                if self.first_token is None:
+                    self.first_token = time.monotonic()
+                # list.append is atomic, so readers can join the tokens at any time
+                self._tokens.append(token)
+        except LLMTimeout as e:
+            self._finish(TIMEOUT, str(e))
+        except Exception as e:
+            self._finish(ERROR, str(e))
+        else:
+            if self._cancel.is_set():
+                self._finish(CANCELLED)
+                return
+            # Only complete answers are cached, before the job reports done
+            if cache is not None and self.cache_key is not None and self.text:
+                cache.put(self.cache_key, self.text, self.model)
+            self._finish(DONE)
+
+
+class InsightService:
+    """Runs InsightJobs on a bounded thread pool shared by all sessions"""
+
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, max_workers=2, read_timeout=30.0, cache=None):
+        self.endpoint = endpoint
+        self.read_timeout = read_timeout
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+
+    def submit(self, prompt, model=DEFAULT_MODEL, timeout=120.0, cache_key=None, refresh=False):
+        """Start a chat, or answer from the cache when cache_key is stored (unless refresh)"""
+        if self.cache is not None and cache_key is not None and not refresh:
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                METRICS.hit('get_llm_insights')
+                return InsightJob.from_cache(prompt, model, entry)
+        job = InsightJob(prompt, model, timeout, cache_key)
+        self._pool.submit(job.run, self.endpoint, self.read_timeout, self.cache)
+        return job
+
+    def models(self, timeout=2.0):
+        return list_models(self.endpoint, timeout)
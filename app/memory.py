@@ -0,0 +1,192 @@
+"""
+Per-session memory accounting and spilling of the datasets sessions hold.
+
+Every session registers the frames it keeps between reruns (the raw dataset
+and its cleaned version). Usage is counted per data buffer, so columns the
+cleaned frame shares with the raw one (Copy-on-Write) and frames shared by
+several sessions are counted once. A session over its own budget is refused
+the new dataset (check() tells before it is cached anywhere); when all
+sessions together exceed the global budget, or a session has been idle for a
+while, its frames are spilled: written to the on-disk store if needed and
+dropped from memory (and from the shared caches, unless another session
+still holds them), to be reloaded on its next rerun.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+class MemoryBudgetError(MemoryError):
+    """A dataset does not fit in the memory budget of one session"""
+
+
+def _buffer_address(values):
+    """Address of the main data buffer behind a column, identical for columns that share it"""
+    data = getattr(values, '_ndarray', None)  # numpy-backed columns
+    if data is None:
+        data = getattr(values, '_data', None)  # nullable (masked) columns
+    if data is None and isinstance(values, pd.Categorical):
+        data = values.codes
+    if isinstance(data, np.ndarray) and data.size:
+        return data.__array_interface__['data'][0]
+    chunked = getattr(values, '_pa_array', None)  # Arrow-backed columns
+    if chunked is not None and chunked.num_chunks:
+        buffers = [buf for buf in chunked.chunk(0).buffers() if buf is not None]
+        if buffers:
+            return buffers[-1].address
+    return id(values)
+
+
+def frame_buffers(df):
+    """{buffer address: bytes} for the columns of df"""
+    if not isinstance(df, pd.DataFrame):
+        return {}
+    buffers = {}
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        buffers[_buffer_address(series.array)] = int(series.memory_usage(index=False, deep=True))
+    return buffers
+
+
+def changed_columns(df, base):
+    """Columns of df that do not share their data with the same column of base"""
+    if not isinstance(base, pd.DataFrame):
+        return list(df.columns)
+    return [col for col in df.columns
+            if col not in base.columns or _buffer_address(df[col].array) != _buffer_address(base[col].array)]
+
+
+@dataclass
+class _Entry:
+    key: str
+    frame: object
+    buffers: dict = field(default_factory=dict)
+
+
+class SessionMemory:
+    """Frames held by each session, bounded per session and in total.
+
+    spill(session, name, key, frame) is called (outside the lock) for every
+    frame dropped from memory, to persist it if it cannot simply be reloaded.
+    Idle sessions are spilled lazily, when another session registers a frame.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 ** 3, session_max_bytes=2 * 1024 ** 3, idle_seconds=600,
+                 forget_seconds=24 * 3600, spill=None, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.session_max_bytes = session_max_bytes
+        self.idle_seconds = idle_seconds
+        self.forget_seconds = forget_seconds
+        self.spill = spill
+        self.clock = clock
+        self.spills = 0
+        self._sessions = {}  # session -> {name: _Entry}
+        self._last_seen = {}  # session -> time of its last rerun
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _unique_bytes(entries):
+        buffers = {}
+        for entry in entries:
+            buffers.update(entry.buffers)
+        return sum(buffers.values())
+
+    def session_bytes(self, session):
+        with self._lock:
+            return self._unique_bytes(self._sessions.get(session, {}).values())
+
+    def total_bytes(self):
+        with self._lock:
+            return self._unique_bytes(entry for entries in self._sessions.values() for entry in entries.values())
+
+    def _admit(self, session, name, key, frame):
+        """The _Entry session would hold frame as; raises MemoryBudgetError if it does not fit the session budget"""
+        entry = _Entry(key, frame, frame_buffers(frame))
+        others = [other for other_name, other in self._sessions.get(session, {}).items() if other_name != name]
+        needed = self._unique_bytes([*others, entry])
+        if needed > self.session_max_bytes:
+            raise MemoryBudgetError(
+                f"{name} needs {needed / 1024 ** 2:,.0f} MB, over the per-session budget of "
+                f"{self.session_max_bytes / 1024 ** 2:,.0f} MB")
+        return entry
+
+    def check(self, session, name, key, frame):
+        """Raise MemoryBudgetError if session could not hold frame as name; returns frame"""
+        with self._lock:
+            self._admit(session, name, key, frame)
+        return frame
+
+    def held_elsewhere(self, key, session):
+        """Whether a session other than `session` keeps dataset version key in memory"""
+        with self._lock:
+            return any(entry.key == key and entry.frame is not None
+                       for other, entries in self._sessions.items() if other != session
+                       for entry in entries.values())
+
+    def hold(self, session, name, key, frame):
+        """Register that session keeps frame (dataset version key) as name; returns frame"""
+        with self._lock:
+            self._last_seen[session] = self.clock()
+            entries = self._sessions.setdefault(session, {})
+            entry = entries.get(name)
+            if entry is None or entry.key != key or entry.frame is not frame:
+                entries[name] = self._admit(session, name, key, frame)
+            spilled = self._enforce(session)
+        for victim in spilled:
+            if self.spill is not None:
+                self.spill(*victim)
+        return frame
+
+    def get(self, session, name, key, load):
+        """The frame session holds as name for key, reloaded with load() if it was spilled"""
+        with self._lock:
+            entry = self._sessions.get(session, {}).get(name)
+            if entry is not None and entry.key == key and entry.frame is not None:
+                self._last_seen[session] = self.clock()
+                return entry.frame
+        return self.hold(session, name, key, load())
+
+    def release(self, session, name):
+        with self._lock:
+            self._sessions.get(session, {}).pop(name, None)
+
+    def _enforce(self, active):
+        """Drop the frames of idle sessions, then of the least recently seen ones until the total fits.
+
+        Returns the (session, name, key, frame) of every dropped frame.
+        """
+        now = self.clock()
+        spilled = []
+        for session, seen in sorted(self._last_seen.items(), key=lambda item: item[1]):
+            if session == active:
+                continue
+            entries = self._sessions.get(session, {})
+            if now - seen > self.forget_seconds:
+                self._sessions.pop(session, None)
+                del self._last_seen[session]
+            elif not (now - seen > self.idle_seconds or self.total_bytes() > self.max_bytes):
+                continue
+            for name, entry in entries.items():
+                if entry.frame is not None:
+                    spilled.append((session, name, entry.key, entry.frame))
+                    entry.frame = None
+                    entry.buffers = {}
+                    self.spills += 1
+        return spilled
+
+    def stats(self, session=None):
+        """Summary of memory held by sessions for display and logging"""
+        with self._lock:
+            held = sum(entry.frame is not None for entries in self._sessions.values() for entry in entries.values())
+            return {
+                "sessions": len(self._sessions),
+                "held": held,
+                "bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+                "session_bytes": self.session_bytes(session) if session is not None else None,
+                "session_max_bytes": self.session_max_bytes,
+                "spills": self.spills,
+            }
@@ -0,0 +1,270 @@
+"""
+Hot-path instrumentation of the dashboard's pipeline stages.
+
+    with METRICS.stage('clean_data', rows=n_rows, cols=n_cols):
+        ...
+
+measures one run of a stage: wall time, CPU time, how much the process's
+peak RSS grew during it, and the rows and columns it processed. Stages
+behind a cache go through METRICS.cached(), which times the factory on a
+miss and only counts a hit otherwise. Runs are aggregated per stage in a
+process-wide registry shown in the sidebar's Performance panel, appended as
+JSON lines to a rotating log and written to a Prometheus text-format file
+(e.g. for node_exporter's textfile collector).
+
+CPU time and peak RSS are process-wide, so stages running at the same time
+(other sessions, background jobs) are included in each other's figures.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Runs kept per stage for the Performance panel
+HISTORY = 50
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the process so far (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class StageRun:
+    """One measured run of a stage"""
+    stage: str
+    started: float = field(default_factory=time.time)
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_delta_bytes: int = None
+    rows: int = None
+    cols: int = None
+    cache: str = None  # 'miss' when the run filled a cache, None for uncached stages
+    error: str = None
+
+
+class StageStats:
+    """Aggregates of one stage's runs"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.runs = 0
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_wall_seconds = 0.0
+        self.max_peak_rss_delta_bytes = 0
+        self.rows = 0
+        self.history = []
+
+    def add(self, run):
+        self.runs += 1
+        self.errors += run.error is not None
+        self.misses += run.cache == 'miss'
+        self.wall_seconds += run.wall_seconds
+        self.cpu_seconds += run.cpu_seconds
+        self.max_wall_seconds = max(self.max_wall_seconds, run.wall_seconds)
+        self.max_peak_rss_delta_bytes = max(self.max_peak_rss_delta_bytes, run.peak_rss_delta_bytes or 0)
+        self.rows += run.rows or 0
+        self.history = (self.history + [run])[-HISTORY:]
+
+    @property
+    def last(self):
+        return self.history[-1] if self.history else None
+
+
+class Metrics:
+    """Process-wide registry of stage runs, with JSON-lines and Prometheus outputs"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._logger = None
+        self.prometheus_path = None
+        self.write_interval = 5.0
+        self._written = 0.0
+        self._pending = None  # Timer for a write deferred by write_interval
+
+    def configure(self, log_path=None, prometheus_path=None, write_interval=5.0, log_max_bytes=10 * 1024 ** 2):
+        """Where runs are logged (JSON lines, rotated) and the Prometheus file written; empty paths disable them"""
+        logger = logging.getLogger('eda.metrics')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=log_max_bytes, backupCount=3,
+                                                           encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        self._logger = logger if log_path else None
+        self.prometheus_path = prometheus_path or None
+        self.write_interval = write_interval
+        return self
+
+    def _stage_stats(self, stage):
+        stats = self._stats.get(stage)
+        if stats is None:
+            stats = self._stats[stage] = StageStats(stage)
+        return stats
+
+    def record(self, run):
+        with self._lock:
+            self._stage_stats(run.stage).add(run)
+        if self._logger is not None:
+            self._logger.info(json.dumps(asdict(run), default=str))
+        self.maybe_write()
+
+    def hit(self, stage):
+        """Count a cache hit for stage (no work done, nothing timed)"""
+        with self._lock:
+            self._stage_stats(stage).hits += 1
+
+    @contextmanager
+    def stage(self, name, rows=None, cols=None, cache=None):
+        """Measure the enclosed block as one run of stage `name`; the yielded StageRun can be annotated"""
+        run = StageRun(name, rows=rows, cols=cols, cache=cache)
+        peak = peak_rss_bytes()
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield run
+        except BaseException as e:
+            run.error = type(e).__name__
+            raise
+        finally:
+            run.wall_seconds = time.perf_counter() - start
+            run.cpu_seconds = time.process_time() - cpu
+            if peak is not None:
+                run.peak_rss_delta_bytes = peak_rss_bytes() - peak
+            self.record(run)
+
+    def cached(self, name, cache, key, factory, shape=None):
+        """cache.get_or_create(key, factory), timed as a run of stage `name` when factory runs, a hit otherwise.
+
+        shape, if given, maps the built value to the (rows, cols) it covers.
+        """
+        built = False
+
+        def timed():
+            nonlocal built
+            built = True
+            with self.stage(name, cache='miss') as run:
+                value = factory()
+                if shape is not None:
+                    run.rows, run.cols = shape(value)
+                return value
+
+        value = cache.get_or_create(key, timed)
+        if not built:
+            self.hit(name)
+        return value
+
+    def summary(self):
+        """One dict per stage (runs, cache hits and misses, timings, memory, rows), in first-run order"""
+        with self._lock:
+            stats = list(self._stats.values())
+        rows = []
+        for s in stats:
+            last = s.last
+            rows.append({
+                "stage": s.stage,
+                "runs": s.runs,
+                "errors": s.errors,
+                "hits": s.hits,
+                "misses": s.misses,
+                "last_wall_seconds": last.wall_seconds if last else None,
+                "last_cpu_seconds": last.cpu_seconds if last else None,
+                "mean_wall_seconds": s.wall_seconds / s.runs if s.runs else None,
+                "max_wall_seconds": s.max_wall_seconds if s.runs else None,
+                "max_peak_rss_delta_bytes": s.max_peak_rss_delta_bytes if s.runs else None,
+                "last_rows": last.rows if last else None,
+                "last_cols": last.cols if last else None,
+            })
+        return rows
+
+    def prometheus_text(self):
+        """All stage aggregates in the Prometheus text exposition format"""
+        with self._lock:
+            stats = list(self._stats.values())
+        metrics = [
+            ('eda_stage_runs_total', 'counter', 'Measured runs of the stage', lambda s: s.runs),
+            ('eda_stage_errors_total', 'counter', 'Runs of the stage that raised', lambda s: s.errors),
+            ('eda_stage_cache_hits_total', 'counter', 'Stage results served from a cache', lambda s: s.hits),
+            ('eda_stage_cache_misses_total', 'counter', 'Stage results computed to fill a cache', lambda s: s.misses),
+            ('eda_stage_wall_seconds_total', 'counter', 'Wall time spent in the stage', lambda s: s.wall_seconds),
+            ('eda_stage_cpu_seconds_total', 'counter', 'Process CPU time during the stage', lambda s: s.cpu_seconds),
+            ('eda_stage_wall_seconds_max', 'gauge', 'Longest run of the stage', lambda s: s.max_wall_seconds),
+            ('eda_stage_last_wall_seconds', 'gauge', 'Wall time of the latest run',
+             lambda s: s.last.wall_seconds if s.last else 0.0),
+            ('eda_stage_peak_rss_delta_bytes_max', 'gauge', 'Largest growth of peak RSS during one run',
+             lambda s: s.max_peak_rss_delta_bytes),
+            ('eda_stage_rows_total', 'counter', 'Rows processed by the stage', lambda s: s.rows),
+        ]
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{stage="{s.stage}"}} {value(s)}' for s in stats]
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines += ["# HELP eda_process_peak_rss_bytes Peak resident set size of the process",
+                      "# TYPE eda_process_peak_rss_bytes gauge", f"eda_process_peak_rss_bytes {peak}"]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=None):
+        """Write prometheus_text() to path atomically (a scraper never sees a partial file)"""
+        path = path or self.prometheus_path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+        self._written = time.monotonic()
+
+    def maybe_write(self):
+        """Write the Prometheus file now, or once write_interval has passed since the last write"""
+        if not self.prometheus_path:
+            return
+        with self._lock:
+            if self._pending is not None:
+                return
+            wait = self.write_interval - (time.monotonic() - self._written)
+            if wait > 0:
+                self._pending = threading.Timer(wait, self._write_pending)
+                self._pending.daemon = True
+                self._pending.start()
+                return
+        self.write_prometheus()
+
+    def _write_pending(self):
+        with self._lock:
+            self._pending = None
+        self.write_prometheus()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Shared by every module and session of the process; the dashboard configures its outputs
+METRICS = Metrics()
@@ -0,0 +1,173 @@
+"""
+Column-parallel execution for profiling and cleaning.
+
+Statistics and fill values are computed independently per column, so the
+columns are partitioned across a pool of workers. Threads suit the NumPy
+sorts and reductions, which release the GIL; processes also parallelise the
+work that holds it (value_counts/mode on object columns). Numeric columns are
+handed to worker processes as one float64 block in shared memory, so only
+the column range and the small results cross the process boundary.
+"""
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+PARALLEL_MODES = ('thread', 'process')
+# Below this many cells (rows x columns) the pool overhead outweighs the speed-up
+MIN_PARALLEL_CELLS = 1_000_000
+# Upper bound on one float64 block of numeric columns
+BLOCK_BYTES = 256 * 1024 ** 2
+
+
+def split(n_items, n_parts):
+    """(start, stop) ranges splitting n_items into at most n_parts contiguous, even parts"""
+    n_parts = max(1, min(n_parts, n_items))
+    bounds = [round(i * n_items / n_parts) for i in range(n_parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_parts) if bounds[i] < bounds[i + 1]]
+
+
+def float_block(df, columns, out=None):
+    """df[columns] as a 2-D float64 array (NaN for missing), filled column by column into out if given"""
+    if out is None:
+        out = np.empty((len(df), len(columns)), dtype=np.float64, order='F')
+    for i, col in enumerate(columns):
+        out[:, i] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return out
+
+
+class SharedArray:
+    """A Fortran-ordered array in shared memory that worker processes attach to by name"""
+
+    def __init__(self, shape, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, math.prod(shape) * dtype.itemsize))
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, order='F')
+
+    def close(self):
+        self.array = None  # the buffer cannot be released while a view exists
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _run_shared(fn, spec, start, stop, args):
+    """Worker side: fn over columns start:stop of a shared block"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order='F')
+        result = fn(block[:, start:stop], *args)
+        del block
+        return result
+    finally:
+        shm.close()
+
+
+def _run_frame(fn, df, columns, args):
+    return fn(float_block(df, columns), *args)
+
+
+class ColumnExecutor:
+    """A lazily started thread or process pool that maps work over groups of columns.
+
+    With one worker, or for frames smaller than min_cells, everything runs
+    inline on the calling thread.
+    """
+
+    def __init__(self, workers=None, mode='thread', min_cells=MIN_PARALLEL_CELLS):
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"Unknown parallel mode: {mode!r}")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.mode = mode
+        self.min_cells = min_cells
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def parallel(self, n_rows, n_cols):
+        """Whether work over an n_rows x n_cols frame is worth handing to the pool"""
+        return self.workers > 1 and n_cols > 1 and n_rows * n_cols >= self.min_cells
+
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                if self.mode == 'process':
+                    # forkserver: forking the multi-threaded server process itself is unsafe
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='eda-columns')
+            return self._pool
+
+    def map(self, fn, tasks):
+        """[fn(*task) for task in tasks], run on the pool; results in task order"""
+        tasks = list(tasks)
+        if len(tasks) <= 1:
+            return [fn(*task) for task in tasks]
+        futures = [self.pool().submit(fn, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+    def map_numeric(self, fn, df, columns, *args, block_bytes=BLOCK_BYTES):
+        """[(columns, fn(values, *args))] over float64 blocks of df's numeric columns.
+
+        values is a 2-D float64 array, one column per dataset column with NaN
+        for missing values; fn must be a module-level function for the process
+        pool. Columns are taken in blocks of at most block_bytes; each block is
+        split across the workers.
+        """
+        columns = list(columns)
+        n_rows = len(df)
+        per_block = max(1, block_bytes // max(n_rows * 8, 1))
+        if not self.parallel(n_rows, len(columns)):
+            return [(columns[start:start + per_block], fn(float_block(df, columns[start:start + per_block]), *args))
+                    for start in range(0, len(columns), per_block)]
+
+        if self.mode == 'thread':
+            # Each worker converts and reduces its own columns
+            size = min(per_block, math.ceil(len(columns) / self.workers))
+            parts = [columns[start:start + size] for start in range(0, len(columns), size)]
+            return list(zip(parts, self.map(_run_frame, [(fn, df, part, args) for part in parts])))
+
+        results = []
+        for start in range(0, len(columns), per_block):
+            cols = columns[start:start + per_block]
+            with SharedArray((n_rows, len(cols))) as shared:
+                float_block(df, cols, out=shared.array)
+                ranges = split(len(cols), self.workers)
+                outputs = self.map(_run_shared, [(fn, shared.spec, lo, hi, args) for lo, hi in ranges])
+            results.extend((cols[lo:hi], output) for (lo, hi), output in zip(ranges, outputs))
+        return results
+
+    def map_columns(self, fn, df, columns, *args):
+        """[fn(df[group], *args)] over groups of columns, one group per worker.
+
+        In process mode each group's columns are pickled to the worker, so this
+        suits per-column work that holds the GIL (hashing object values).
+        """
+        columns = list(columns)
+        if not columns:
+            return []
+        if not self.parallel(len(df), len(columns)):
+            return [fn(df[columns], *args)]
+        groups = [columns[lo:hi] for lo, hi in split(len(columns), self.workers)]
+        return self.map(fn, [(df[group], *args) for group in groups])
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Runs everything inline: the default when no executor is given
+SERIAL = ColumnExecutor(workers=1)
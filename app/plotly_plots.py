@@ -0,0 +1,124 @@
+"""
+Interactive Plotly rendering of the dashboard's plot types.
+
+Histograms, boxes, bars and counts are always aggregated on the server by the
+execution engine (see engines.py), so the browser receives a few hundred
+numbers instead of the rows, and zooming or hovering never triggers a
+re-render on the server. Line traces use WebGL (Scattergl). plotly itself is
+imported on first use.
+"""
+import importlib.util
+
+import numpy as np
+
+from aggregates import category_note
+from correlation import ANNOTATE_MAX_COLUMNS, heatmap_matrix
+from engines import as_engine
+from plotting import COLORS, heatmap_title
+
+# Downloadable interactive formats: extension -> mime type
+PLOTLY_FORMATS = {'html': 'text/html'}
+
+
+def plotly_available():
+    return importlib.util.find_spec('plotly') is not None
+
+
+def _layout(fig, title, xlabel=None, ylabel=None):
+    fig.update_layout(
+        template='plotly_dark',
+        title={'text': f"<b>{title}</b>", 'x': 0.5, 'font': {'size': 20}},
+        xaxis_title=xlabel,
+        yaxis_title=ylabel,
+        paper_bgcolor='#0E1117',
+        plot_bgcolor='#262730',
+        height=600,
+        bargap=0.1,
+        showlegend=False,
+    )
+    fig.update_xaxes(gridcolor='rgba(255,255,255,0.1)')
+    fig.update_yaxes(gridcolor='rgba(255,255,255,0.1)')
+    return fig
+
+
+def _count_bars(fig, engine, column, color):
+    import plotly.graph_objects as go
+    counts, total = engine.top_categories(column)
+    fig.add_trace(go.Bar(x=[str(label) for label in counts.index], y=counts.to_numpy(),
+                         marker_color=color, opacity=0.8))
+    return category_note(len(counts), total)
+
+
+def generate_plotly(df, plot_type, x_col=None, y_col=None, correlation=None):
+    """Plotly version of plotting.generate_plot, built from server-side aggregates (df may be an engine)"""
+    import plotly.graph_objects as go  # raises ImportError when plotly is missing
+
+    fig = go.Figure()
+    engine = as_engine(df)
+    has_x = bool(x_col) and x_col in engine.columns
+    has_xy = has_x and bool(y_col) and y_col in engine.columns
+
+    if plot_type == "Distribution Plot" and has_x:
+        if engine.is_numeric(x_col):
+            hist = engine.histogram(x_col)
+            if hist is not None:
+                edges = hist['edges']
+                fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=hist['counts'], width=np.diff(edges),
+                                     marker_color=COLORS[0], marker_line_color='white', marker_line_width=0.5,
+                                     opacity=0.7, name='count'))
+                fig.add_trace(go.Scattergl(x=hist['grid'], y=hist['kde'], mode='lines',
+                                           line={'color': COLORS[0], 'width': 2}, name='KDE'))
+            _layout(fig, f'Distribution of {x_col}', x_col, 'Frequency')
+        else:
+            note = _count_bars(fig, engine, x_col, COLORS[0])
+            _layout(fig, f'Count of {x_col}{note}', x_col, 'Count')
+
+    elif plot_type == "Boxplot" and has_xy:
+        stats, total = engine.box_aggregate(x_col, y_col)
+        for box in stats:
+            fig.add_trace(go.Box(
+                x=[box['label']], q1=[box['q1']], median=[box['med']], q3=[box['q3']],
+                lowerfence=[box['whislo']], upperfence=[box['whishi']], name=box['label'],
+                fillcolor=COLORS[1], line={'color': 'white'}, boxpoints=False))
+        _layout(fig, f'Boxplot: {y_col} by {x_col}{category_note(len(stats), total)}', x_col, y_col)
+
+    elif plot_type == "Countplot" and has_x:
+        note = _count_bars(fig, engine, x_col, COLORS[2])
+        _layout(fig, f'Count of {x_col}{note}', x_col, 'Count')
+
+    elif plot_type == "Barplot" and has_xy:
+        agg, total = engine.mean_ci_aggregate(x_col, y_col)
+        fig.add_trace(go.Bar(x=[str(label) for label in agg.index], y=agg['mean'].to_numpy(),
+                             error_y={'type': 'data', 'array': agg['ci'].to_numpy(), 'color': 'white'},
+                             marker_color=COLORS[3], opacity=0.8))
+        _layout(fig, f'Barplot: {y_col} by {x_col}{category_note(len(agg), total)}', x_col, y_col)
+
+    elif plot_type == "Correlation Heatmap":
+        matrix = engine.correlation() if correlation is None else correlation
+        shown = heatmap_matrix(matrix)
+        if len(matrix.columns) > 1:
+            values = shown.to_numpy()
+            # Same lower-triangle view as the static heatmap
+            values = np.where(np.triu(np.ones_like(values, dtype=bool)), np.nan, values)
+            labels = [str(col) for col in shown.columns]
+            annotate = len(labels) <= ANNOTATE_MAX_COLUMNS
+            fig.add_trace(go.Heatmap(z=values, x=labels, y=labels, colorscale='RdYlBu', reversescale=True,
+                                     zmid=0, texttemplate='%{z:.2f}' if annotate else None,
+                                     hoverongaps=False))
+            fig.update_yaxes(autorange='reversed')
+        _layout(fig, heatmap_title(len(shown), len(matrix)))
+
+    return fig
+
+
+def render_plotly(df, plot_type, x_col=None, y_col=None, fmt='json', correlation=None):
+    """Figure JSON (for display) or a standalone HTML page (for download)"""
+    fig = generate_plotly(df, plot_type, x_col, y_col, correlation)
+    if fmt == 'html':
+        return fig.to_html(include_plotlyjs='cdn', full_html=True).encode()
+    return fig.to_json()
+
+
+def figure_from_json(data):
+    import plotly.io as pio
+    return pio.from_json(data)
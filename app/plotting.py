@@ -0,0 +1,215 @@
+"""
+Plot generation for the Visualizations tab.
+
+Small frames are drawn with seaborn straight from the data. Past
+LARGE_DATA_ROWS rows the data is pre-aggregated with NumPy/pandas (binned
+histograms, per-group quartiles, grouped means with analytic confidence
+intervals, value counts) and only that small result is handed to matplotlib;
+the KDE curve is estimated from a random sample.
+
+Plots accept a DataFrame or an execution engine (see engines.py): large
+data is aggregated by the engine, so an out-of-core dataset is never loaded,
+and only the plotted columns of a small one are materialised for seaborn.
+
+render_plot turns a plot into encoded image bytes, which the dashboard caches
+per dataset version so repeat views and downloads never redraw.
+
+Figures are plain matplotlib.figure.Figure objects, never registered with
+pyplot, so nothing keeps them alive once rendered; the theme is applied to
+rcParams once per process instead of on every call. matplotlib and seaborn
+are imported on the first plot, not when the dashboard starts.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from aggregates import category_note
+from correlation import ANNOTATE_MAX_COLUMNS, heatmap_matrix
+from engines import as_engine
+from metrics import METRICS
+
+PLOT_TYPES = ["Distribution Plot", "Boxplot", "Countplot", "Barplot", "Correlation Heatmap"]
+
+# Row count above which plots switch to pre-aggregated drawing
+LARGE_DATA_ROWS = 200_000
+
+# Matplotlib style used for every plot; part of the rendered-image cache key
+PLOT_THEME = 'dark_background'
+DISPLAY_DPI = 150
+EXPORT_DPI = 300
+EXPORT_FACECOLOR = '#262730'
+# Downloadable image formats: extension -> mime type
+IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# Color palette for better visual appeal
+COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
+
+
+_theme_applied = False
+
+
+def apply_plot_theme():
+    """Apply PLOT_THEME to matplotlib's rcParams (once per process)"""
+    global _theme_applied
+    if not _theme_applied:
+        import matplotlib.style
+        matplotlib.style.use(PLOT_THEME)
+        _theme_applied = True
+
+
+def is_large(df, large_data=None):
+    """Whether to use pre-aggregated drawing (None = decide by row count)"""
+    return len(df) > LARGE_DATA_ROWS if large_data is None else large_data
+
+
+def _set_labels(ax, title, xlabel=None, ylabel=None):
+    ax.set_title(title, color='white', fontsize=18, fontweight='bold', pad=20)
+    if xlabel is not None:
+        ax.set_xlabel(xlabel, color='white', fontsize=14, fontweight='bold')
+    if ylabel is not None:
+        ax.set_ylabel(ylabel, color='white', fontsize=14, fontweight='bold')
+
+
+def _draw_large(engine, plot_type, x_col, y_col, ax):
+    if plot_type == "Distribution Plot" and engine.is_numeric(x_col):
+        hist = engine.histogram(x_col)
+        if hist is not None:
+            edges = hist['edges']
+            ax.hist(edges[:-1], bins=edges, weights=hist['counts'], color=COLORS[0], alpha=0.7,
+                    edgecolor='white', linewidth=0.5)
+            ax.plot(hist['grid'], hist['kde'], color=COLORS[0], linewidth=2)
+        _set_labels(ax, f'Distribution of {x_col}', x_col, 'Frequency')
+
+    elif plot_type in ("Distribution Plot", "Countplot"):
+        counts, total = engine.top_categories(x_col)
+        color = COLORS[0] if plot_type == "Distribution Plot" else COLORS[2]
+        ax.bar([str(label) for label in counts.index], counts.to_numpy(), color=color, alpha=0.8)
+        _set_labels(ax, f'Count of {x_col}{category_note(len(counts), total)}', x_col, 'Count')
+
+    elif plot_type == "Boxplot":
+        stats, total = engine.box_aggregate(x_col, y_col)
+        if stats:
+            ax.bxp(stats, showfliers=False, widths=0.7, patch_artist=True,
+                   boxprops={'facecolor': COLORS[1], 'edgecolor': 'white'},
+                   medianprops={'color': 'white'}, whiskerprops={'color': 'white'},
+                   capprops={'color': 'white'})
+        _set_labels(ax, f'Boxplot: {y_col} by {x_col}{category_note(len(stats), total)}', x_col, y_col)
+
+    elif plot_type == "Barplot":
+        agg, total = engine.mean_ci_aggregate(x_col, y_col)
+        ax.bar([str(label) for label in agg.index], agg['mean'].to_numpy(), yerr=agg['ci'].to_numpy(),
+               color=COLORS[3], alpha=0.8, ecolor='white', capsize=4)
+        _set_labels(ax, f'Barplot: {y_col} by {x_col}{category_note(len(agg), total)}', x_col, y_col)
+
+
+def heatmap_title(shown, total):
+    if shown < total:
+        return f'Correlation Heatmap (top {shown} of {total} columns, clustered)'
+    return 'Correlation Heatmap'
+
+
+def generate_plot(df, plot_type, x_col=None, y_col=None, large_data=None, correlation=None):
+    """Generate different types of plots with enhanced styling.
+
+    df is a DataFrame or an engine. large_data forces (True) or disables
+    (False) pre-aggregated drawing; by default it is used for data over
+    LARGE_DATA_ROWS rows. correlation is an optional precomputed correlation
+    matrix for the heatmap.
+    """
+    import seaborn as sns
+    from matplotlib.artist import setp
+    from matplotlib.figure import Figure
+
+    # Set up the plotting style
+    apply_plot_theme()
+
+    # Create a larger figure with better aspect ratio (not tracked by pyplot)
+    fig = Figure(figsize=(14, 8))
+    ax = fig.subplots()
+
+    # Set the background color
+    fig.patch.set_facecolor('#0E1117')
+    ax.set_facecolor('#262730')
+
+    colors = COLORS
+    needs_x = plot_type in ("Distribution Plot", "Countplot")
+    needs_xy = plot_type in ("Boxplot", "Barplot")
+    engine = as_engine(df)
+    has_x = bool(x_col) and x_col in engine.columns
+    has_xy = has_x and bool(y_col) and y_col in engine.columns
+    large = is_large(engine, large_data) and ((needs_x and has_x) or (needs_xy and has_xy))
+    if not large and has_x and plot_type != "Correlation Heatmap":
+        # seaborn needs the rows: only the plotted columns are materialised
+        df = engine.to_pandas(list(dict.fromkeys(col for col in (x_col, y_col) if col in engine.columns)))
+
+    if large:
+        _draw_large(engine, plot_type, x_col, y_col, ax)
+
+    elif plot_type == "Distribution Plot":
+        if has_x:
+            if pd.api.types.is_numeric_dtype(df[x_col]):
+                # Enhanced histogram with KDE
+                sns.histplot(data=df, x=x_col, kde=True, ax=ax,
+                           color=colors[0], alpha=0.7, edgecolor='white', linewidth=0.5)
+                _set_labels(ax, f'Distribution of {x_col}', x_col, 'Frequency')
+            else:
+                # Enhanced countplot
+                sns.countplot(data=df, x=x_col, ax=ax, color=colors[0], alpha=0.8)
+                _set_labels(ax, f'Count of {x_col}', x_col, 'Count')
+
+    elif plot_type == "Boxplot":
+        if has_xy:
+            # Enhanced boxplot
+            sns.boxplot(data=df, x=x_col, y=y_col, ax=ax, color=colors[1], width=0.7)
+            _set_labels(ax, f'Boxplot: {y_col} by {x_col}', x_col, y_col)
+
+    elif plot_type == "Countplot":
+        if has_x:
+            # Enhanced countplot
+            sns.countplot(data=df, x=x_col, ax=ax, color=colors[2], alpha=0.8)
+            _set_labels(ax, f'Count of {x_col}', x_col, 'Count')
+
+    elif plot_type == "Barplot":
+        if has_xy:
+            # Enhanced barplot
+            sns.barplot(data=df, x=x_col, y=y_col, ax=ax, color=colors[3], alpha=0.8)
+            _set_labels(ax, f'Barplot: {y_col} by {x_col}', x_col, y_col)
+
+    elif plot_type == "Correlation Heatmap":
+        matrix = engine.correlation() if correlation is None else correlation
+        if len(matrix.columns) > 1:
+            # Enhanced correlation heatmap; wide matrices are cut to the most correlated columns
+            shown = heatmap_matrix(matrix)
+            mask = np.triu(np.ones_like(shown, dtype=bool))
+            sns.heatmap(shown, mask=mask, annot=len(shown) <= ANNOTATE_MAX_COLUMNS, cmap='RdYlBu_r',
+                       center=0, ax=ax, square=True, linewidths=0.5, cbar_kws={"shrink": .8})
+            _set_labels(ax, heatmap_title(len(shown), len(matrix)))
+
+    # Enhanced styling for all plots
+    ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.5)
+    ax.tick_params(colors='white', labelsize=12)
+
+    # Rotate x-axis labels if they're too long
+    if plot_type in ["Countplot", "Barplot", "Boxplot"]:
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+    # Add some padding and tight layout
+    fig.tight_layout(pad=2.0)
+
+    return fig
+
+
+def render_plot(df, plot_type, x_col=None, y_col=None, fmt='png', dpi=DISPLAY_DPI, facecolor='auto', correlation=None):
+    """Draw a plot and return it encoded as fmt; the figure is released afterwards"""
+    rows = len(df)
+    with METRICS.stage('generate_plot', rows):
+        fig = generate_plot(df, plot_type, x_col, y_col, correlation=correlation)
+    try:
+        buf = io.BytesIO()
+        with METRICS.stage('savefig', rows):
+            fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches='tight', facecolor=facecolor)
+        return buf.getvalue()
+    finally:
+        # Drop the artists now rather than waiting for the cyclic GC
+        fig.clear()
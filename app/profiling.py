@@ -0,0 +1,332 @@
+"""
+Single-pass column profiling shared by the overview, insights, LLM prompt and PDF report.
+
+Numeric columns are profiled in blocks: each block is converted to one float64
+array and sorted once, which yields quantiles, min/max and cardinality
+together, while the mean and standard deviation come from the same array.
+Other columns are profiled from a single value_counts() each. Given a
+ColumnExecutor, blocks and columns are spread across its workers.
+
+With approximate=True the rows are streamed in chunks into mergeable
+ColumnSketches instead (sketches.py): no column is sorted or hashed whole,
+and the profile keeps the sketches so it can be merged with the profile of
+more rows later.
+"""
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ingest import CATEGORICAL_DTYPES
+from parallel import SERIAL
+from sketches import ColumnSketch, error_bounds
+
+DEFAULT_TOP_K = 5
+# Upper bound on the float64 working array for one block of numeric columns
+BLOCK_BYTES = 256 * 1024 ** 2
+# Rows per chunk fed to the sketches of an approximate profile; numeric chunks are kept small
+# enough for the sketches' passes over them to stay in CPU cache
+SKETCH_CHUNK_ROWS = 1_000_000
+SKETCH_NUMERIC_CHUNK_ROWS = 65_536
+
+PROFILE_FIELDS = ['dtype', 'count', 'null_count', 'null_pct', 'unique',
+                  'mean', 'std', 'min', 'q25', 'median', 'q75', 'max']
+
+
+@dataclass
+class DatasetProfile:
+    """Per-column statistics for one version of a dataset"""
+    n_rows: int
+    n_cols: int
+    memory_bytes: int
+    columns: pd.DataFrame  # one row per column, PROFILE_FIELDS as columns
+    top_values: dict = field(default_factory=dict)  # column -> pd.Series of top-k counts
+    numeric_columns: list = field(default_factory=list)
+    categorical_columns: list = field(default_factory=list)
+    approximate: bool = False
+    error_bounds: dict = field(default_factory=dict)  # statistic -> description, for approximate profiles
+    sketches: dict = field(default_factory=dict)  # column -> ColumnSketch, for approximate profiles
+
+    @property
+    def total_missing(self):
+        return int(self.columns['null_count'].sum())
+
+    @property
+    def approximation_note(self):
+        """Error bounds of an approximate profile as one line ('' for an exact profile)"""
+        return "; ".join(f"{stat} {bound}" for stat, bound in self.error_bounds.items())
+
+    @property
+    def missing(self):
+        """Null counts of the columns that have any"""
+        nulls = self.columns['null_count']
+        return nulls[nulls > 0]
+
+    def numeric_stats(self):
+        """describe()-style table (statistics as rows) for the numeric columns"""
+        stats = self.columns.loc[self.numeric_columns, ['count', 'mean', 'std', 'min', 'q25', 'median', 'q75', 'max']]
+        return stats.rename(columns={'q25': '25%', 'median': '50%', 'q75': '75%'}).T.astype(float)
+
+
+def _numeric_block_stats(block):
+    """Statistics for a 2-D float array, one column per dataset column"""
+    n_rows = block.shape[0]
+    counts = n_rows - np.isnan(block).sum(axis=0)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        means = np.nanmean(block, axis=0)
+        stds = np.nanstd(block, axis=0, ddof=1)
+
+    # One sort per block: NaNs go last, so the first `count` rows of each column are its values
+    ordered = np.sort(block, axis=0) if n_rows else np.full((1, block.shape[1]), np.nan)
+    has_values = counts > 0
+    last = np.maximum(counts - 1, 0)
+
+    def quantile(q):
+        pos = q * last
+        lower = np.floor(pos).astype(np.intp)
+        upper = np.minimum(lower + 1, last)
+        lo = np.take_along_axis(ordered, lower[None, :], axis=0)[0]
+        hi = np.take_along_axis(ordered, upper[None, :], axis=0)[0]
+        return np.where(has_values, lo + (hi - lo) * (pos - lower), np.nan)
+
+    if n_rows > 1:
+        changed = ordered[1:] != ordered[:-1]
+        in_range = np.arange(n_rows - 1)[:, None] < last[None, :]
+        unique = (changed & in_range).sum(axis=0) + has_values
+    else:
+        unique = has_values.astype(np.int64)
+
+    return {
+        'count': counts,
+        'null_count': n_rows - counts,
+        'unique': unique,
+        'mean': means,
+        'std': stds,
+        'min': quantile(0.0),
+        'q25': quantile(0.25),
+        'median': quantile(0.5),
+        'q75': quantile(0.75),
+        'max': quantile(1.0),
+    }
+
+
+def _value_counts_stats(frame, top_k):
+    """{column: (row, top-k counts)} from one value_counts() per column of frame"""
+    n_rows = len(frame)
+    stats = {}
+    for col in frame.columns:
+        counts = frame[col].value_counts()
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            counts = counts[counts > 0]  # drop unused categories
+        non_null = int(counts.sum())
+        stats[col] = ({'count': non_null, 'null_count': n_rows - non_null, 'unique': len(counts)}, counts.head(top_k))
+    return stats
+
+
+def _numeric_block_sketches(block, chunk_rows):
+    """One ColumnSketch per column of a 2-D float array, fed chunk_rows rows at a time"""
+    sketches = [ColumnSketch(numeric=True) for _ in range(block.shape[1])]
+    for start in range(0, block.shape[0], chunk_rows):
+        chunk = block[start:start + chunk_rows]
+        for i, sketch in enumerate(sketches):
+            sketch.update_numeric(chunk[:, i])
+    return sketches
+
+
+def _column_sketches(frame, chunk_rows):
+    """{column: ColumnSketch} for the (non-numeric) columns of frame"""
+    sketches = {}
+    for col in frame.columns:
+        sketch = sketches[col] = ColumnSketch(numeric=False)
+        for start in range(0, len(frame), chunk_rows):
+            sketch.update(frame[col].iloc[start:start + chunk_rows])
+    return sketches
+
+
+def sketch_dataframe(df, block_bytes=BLOCK_BYTES, executor=None, chunk_rows=SKETCH_CHUNK_ROWS,
+                     numeric_chunk_rows=SKETCH_NUMERIC_CHUNK_ROWS):
+    """{column: ColumnSketch} for every column of df"""
+    executor = executor or SERIAL
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    sketches = {}
+    for cols, block_sketches in executor.map_numeric(_numeric_block_sketches, df, numeric_cols, numeric_chunk_rows,
+                                                     block_bytes=block_bytes):
+        sketches.update(zip(cols, block_sketches))
+    numeric_set = set(numeric_cols)
+    for column_sketches in executor.map_columns(_column_sketches, df,
+                                                 [col for col in df.columns if col not in numeric_set], chunk_rows):
+        sketches.update(column_sketches)
+    return sketches
+
+
+def profile_from_sketches(sketches, dtypes, n_rows, memory_bytes, numeric_columns, categorical_columns,
+                          top_k=DEFAULT_TOP_K):
+    """Approximate DatasetProfile from a ColumnSketch per column (dtypes as for build_profile)"""
+    rows, top_values = {}, {}
+    for col, sketch in sketches.items():
+        rows[col] = sketch.stats()
+        if not sketch.numeric:
+            top_values[col] = sketch.top(top_k).rename('count').rename_axis(col)
+    profile = build_profile(rows, dtypes, n_rows, memory_bytes, top_values, numeric_columns, categorical_columns)
+    profile.approximate = True
+    profile.error_bounds = error_bounds()
+    profile.sketches = sketches
+    return profile
+
+
+def _frame_profile_from_sketches(df, sketches, top_k):
+    return profile_from_sketches(
+        sketches,
+        dtypes=pd.Series([str(dtype) for dtype in df.dtypes], index=df.columns),
+        n_rows=len(df),
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        numeric_columns=list(df.select_dtypes(include=[np.number]).columns),
+        categorical_columns=list(df.select_dtypes(include=CATEGORICAL_DTYPES).columns),
+        top_k=top_k,
+    )
+
+
+def _numeric_order_stats(block):
+    """Quantiles and distinct counts of a 2-D float array, by partitioning and hashing instead of sorting"""
+    stats = {name: np.full(block.shape[1], np.nan) for name in ('q25', 'median', 'q75')}
+    stats['unique'] = np.zeros(block.shape[1], dtype=np.int64)
+    for i in range(block.shape[1]):
+        values = block[:, i]
+        values = values[~np.isnan(values)]
+        if values.size:
+            stats['q25'][i], stats['median'][i], stats['q75'][i] = np.quantile(values, [0.25, 0.5, 0.75])
+            stats['unique'][i] = pd.unique(values).size
+    return stats
+
+
+def _merge_moments(base, new):
+    """count, null_count, mean, std, min and max of two profiles' numeric columns combined (Chan et al.)"""
+    n1, n2 = base['count'].astype(float), new['count'].astype(float)
+    n = n1 + n2
+    mean1, mean2 = base['mean'].fillna(0.0), new['mean'].fillna(0.0)
+    # Sums of squared deviations; std is NaN below two values, which contribute none
+    m2 = (base['std'] ** 2 * (n1 - 1)).fillna(0.0) + (new['std'] ** 2 * (n2 - 1)).fillna(0.0)
+    delta = mean2 - mean1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (mean1 * n1 + mean2 * n2) / n
+        m2 = m2 + delta * delta * n1 * n2 / n
+        std = np.sqrt(m2 / (n - 1))
+    return pd.DataFrame({
+        'count': base['count'] + new['count'],
+        'null_count': base['null_count'] + new['null_count'],
+        'mean': mean.where(n > 0),
+        'std': std.where(n > 1),
+        'min': np.fmin(base['min'], new['min']),
+        'max': np.fmax(base['max'], new['max']),
+    })
+
+
+def _extend_exact_profile(profile, rows, df, top_k, executor):
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    if numeric_cols != profile.numeric_columns or list(df.columns) != list(profile.columns.index):
+        return profile_dataframe(df, top_k, executor=executor)
+    executor = executor or SERIAL
+    new = profile_dataframe(rows, top_k, executor=executor)
+    merged = _merge_moments(profile.columns.loc[numeric_cols], new.columns.loc[numeric_cols])
+    stats = {col: merged.loc[col].to_dict() for col in numeric_cols}
+    for cols, block_stats in executor.map_numeric(_numeric_order_stats, df, numeric_cols):
+        for i, col in enumerate(cols):
+            stats[col].update((name, values[i]) for name, values in block_stats.items())
+
+    numeric_set = set(numeric_cols)
+    top_values = {}
+    for block_stats in executor.map_columns(_value_counts_stats, df, [c for c in df.columns if c not in numeric_set],
+                                            top_k):
+        for col, (row, top) in block_stats.items():
+            stats[col] = row
+            top_values[col] = top
+    return build_profile(
+        stats,
+        dtypes=pd.Series([str(dtype) for dtype in df.dtypes], index=df.columns),
+        n_rows=len(df),
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        top_values=top_values,
+        numeric_columns=numeric_cols,
+        categorical_columns=list(df.select_dtypes(include=CATEGORICAL_DTYPES).columns),
+    )
+
+
+def extend_profile(profile, rows, df, top_k=DEFAULT_TOP_K, executor=None):
+    """Profile of df, the data behind `profile` with rows appended; profile is left unchanged.
+
+    For an approximate profile only rows are sketched and their sketches are
+    merged with the ones kept on profile. For an exact one, the counts,
+    moments, min and max of numeric columns are merged with those of rows;
+    their quantiles and distinct counts, and the value counts of the other
+    columns, cannot be merged and are recomputed over df, without sorting.
+    """
+    if not profile.approximate:
+        return _extend_exact_profile(profile, rows, df, top_k, executor)
+    sketches = sketch_dataframe(rows, executor=executor)
+    for col, sketch in sketches.items():
+        sketch.merge(profile.sketches[col])
+    return _frame_profile_from_sketches(df, sketches, top_k)
+
+
+def profile_dataframe(df, top_k=DEFAULT_TOP_K, block_bytes=BLOCK_BYTES, executor=None, approximate=False):
+    """Compute a DatasetProfile for df, spreading the columns over executor's workers if given.
+
+    approximate=True builds it from sketches (see sketch_dataframe), in one
+    streaming pass.
+    """
+    if approximate:
+        return _frame_profile_from_sketches(df, sketch_dataframe(df, block_bytes, executor), top_k)
+    executor = executor or SERIAL
+    n_rows = len(df)
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    rows = {}
+
+    # Numeric columns, in blocks small enough to sort in memory
+    for cols, stats in executor.map_numeric(_numeric_block_stats, df, numeric_cols, block_bytes=block_bytes):
+        for i, col in enumerate(cols):
+            rows[col] = {name: values[i] for name, values in stats.items()}
+
+    # Everything else: one value_counts per column gives cardinality and top-k
+    numeric_set = set(numeric_cols)
+    other_cols = [col for col in df.columns if col not in numeric_set]
+    top_values = {}
+    for stats in executor.map_columns(_value_counts_stats, df, other_cols, top_k):
+        for col, (row, top) in stats.items():
+            rows[col] = row
+            top_values[col] = top
+
+    return build_profile(
+        rows,
+        dtypes=pd.Series([str(dtype) for dtype in df.dtypes], index=df.columns),
+        n_rows=n_rows,
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        top_values=top_values,
+        numeric_columns=numeric_cols,
+        categorical_columns=list(df.select_dtypes(include=CATEGORICAL_DTYPES).columns),
+    )
+
+
+def build_profile(rows, dtypes, n_rows, memory_bytes, top_values, numeric_columns, categorical_columns):
+    """Assemble a DatasetProfile from per-column statistics.
+
+    rows maps each column to its PROFILE_FIELDS values (count, null_count and
+    unique at least); dtypes is a Series of type names indexed by every
+    column, in order.
+    """
+    columns = pd.DataFrame.from_dict(rows, orient='index').reindex(index=dtypes.index, columns=PROFILE_FIELDS)
+    columns['dtype'] = dtypes.to_numpy()
+    columns['null_pct'] = columns['null_count'] / n_rows * 100 if n_rows else 0.0
+    for name in ('count', 'null_count', 'unique'):
+        columns[name] = columns[name].astype('int64')
+
+    return DatasetProfile(
+        n_rows=n_rows,
+        n_cols=len(dtypes),
+        memory_bytes=memory_bytes,
+        columns=columns,
+        top_values=top_values,
+        numeric_columns=numeric_columns,
+        categorical_columns=categorical_columns,
+    )
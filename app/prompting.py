@@ -0,0 +1,178 @@
+"""
+Compact, token-budgeted LLM prompts built from a cached dataset profile.
+
+Columns are ranked by how much they are likely to tell the model (missing
+values, spread and skew, strong correlations, usable categorical structure;
+constant columns and identifiers rank last) and written as one pipe-separated
+row each. Rows are added in rank order until the token budget is reached;
+the rest are summarised in a single line so the model still knows they exist.
+"""
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from correlation import top_pairs
+
+# Bump whenever the template or encoding changes: it is part of the response cache key
+PROMPT_VERSION = 2
+DEFAULT_TOKEN_BUDGET = 2000
+# Rough prompt-processing speed of a 7B model on CPU, for the prefill estimate
+DEFAULT_PREFILL_TOKENS_PER_SECOND = 150
+# Rough characters per token for English text and numbers
+CHARS_PER_TOKEN = 4
+MAX_CORRELATION_PAIRS = 10
+# Long category labels are cut to this many characters
+MAX_VALUE_CHARS = 30
+# Categorical columns with more distinct values than this share of rows look like identifiers
+IDENTIFIER_UNIQUE_RATIO = 0.9
+
+INSTRUCTIONS = """You are a data scientist performing Exploratory Data Analysis (EDA).
+Analyze this dataset and provide 3-5 key insights in a professional, business-ready format.
+
+Please provide insights covering:
+1. **Data Quality Assessment**: Comment on missing values, data types, and overall data quality
+2. **Key Patterns**: Identify any notable patterns or trends in the data
+3. **Analysis Opportunities**: Suggest potential areas for deeper analysis
+4. **Recommendations**: Provide actionable recommendations for data exploration
+
+Format your response in clear, professional language suitable for a business presentation.
+Use bullet points and clear sections for better readability."""
+
+NUMERIC_HEADER = "column|type|null%|unique|mean|std|min|median|max"
+CATEGORICAL_HEADER = "column|type|null%|unique|top values (count)"
+
+
+def estimate_tokens(text):
+    """Approximate token count (no tokenizer is available for a local model)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptBuild:
+    """A built prompt and the numbers behind it"""
+    text: str
+    dataset_section: str  # everything data-dependent; hashed for the response cache
+    tokens: int
+    token_budget: int
+    columns_included: int
+    columns_total: int
+    prefill_seconds: float  # estimated prompt processing time
+    omitted: list = field(default_factory=list)
+
+
+def _fmt(value):
+    if value is None or (isinstance(value, float) and not math.isfinite(value)) or pd.isna(value):
+        return ''
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    return f"{float(value):.4g}"
+
+
+def rank_columns(profile, correlation=None):
+    """Column names ordered from most to least informative"""
+    stats = profile.columns
+    count = stats['count'].astype(float).clip(lower=1)
+    unique = stats['unique'].astype(float)
+    score = pd.Series(1.0, index=stats.index)
+    # Missing values are always worth mentioning
+    score += 2 * stats['null_pct'].astype(float).fillna(0) / 100
+
+    numeric = profile.numeric_columns
+    if numeric:
+        num = stats.loc[numeric]
+        mean, std = num['mean'].astype(float), num['std'].astype(float)
+        spread = (std / mean.abs().replace(0, np.nan)).clip(upper=1).fillna(0)
+        skew = ((mean - num['median'].astype(float)).abs() / std.replace(0, np.nan)).clip(upper=1).fillna(0)
+        score[numeric] += 0.5 * spread + skew
+        if correlation is not None and len(correlation) > 1:
+            strength = correlation.abs().to_numpy(copy=True)
+            np.fill_diagonal(strength, np.nan)
+            with np.errstate(invalid='ignore'):
+                best = pd.Series(np.nanmax(np.where(np.isnan(strength), -1, strength), axis=1),
+                                 index=correlation.columns).clip(lower=0)
+            score[best.index.intersection(numeric)] += best
+
+    categorical = profile.categorical_columns
+    if categorical:
+        ratio = unique[categorical] / count[categorical]
+        # A handful of levels describes the data well; near-unique text does not
+        structure = np.where(ratio > IDENTIFIER_UNIQUE_RATIO, -0.5,
+                             1 - np.log1p(unique[categorical]) / np.log1p(count[categorical]))
+        score[categorical] += structure
+
+    score[unique <= 1] = 0.0
+    return list(score.sort_values(ascending=False, kind='stable').index)
+
+
+def _column_row(profile, col):
+    row = profile.columns.loc[col]
+    base = [str(col), str(row['dtype']), _fmt(row['null_pct']), _fmt(row['unique'])]
+    if col in profile.top_values:
+        top = profile.top_values[col].head(3)
+        return "|".join(base + [", ".join(f"{str(k)[:MAX_VALUE_CHARS]} ({v})" for k, v in top.items())])
+    return "|".join(base + [_fmt(row[name]) for name in ('mean', 'std', 'min', 'median', 'max')])
+
+
+def build_prompt(profile, correlation=None, token_budget=DEFAULT_TOKEN_BUDGET,
+                 prefill_tokens_per_second=DEFAULT_PREFILL_TOKENS_PER_SECOND):
+    """Insight prompt for a DatasetProfile that fits within token_budget (estimated)"""
+    overview = [
+        "Dataset Information:",
+        f"- Shape: {profile.n_rows:,} rows x {profile.n_cols:,} columns",
+        f"- Missing values: {profile.total_missing:,} cells in {len(profile.missing)} columns",
+        f"- Column types: {len(profile.numeric_columns)} numeric, {len(profile.categorical_columns)} categorical",
+    ]
+    constant = list(profile.columns.index[profile.columns['unique'] <= 1])
+    if constant:
+        overview.append(f"- Constant or empty columns: {', '.join(str(col) for col in constant[:20])}"
+                        f"{' ...' if len(constant) > 20 else ''}")
+
+    pairs = []
+    if correlation is not None:
+        pairs = [f"- {a} ~ {b}: {r:+.2f}" for a, b, r in top_pairs(correlation, k=MAX_CORRELATION_PAIRS)]
+
+    used = estimate_tokens(INSTRUCTIONS) + estimate_tokens("\n".join(overview)) + 40  # headers and spacing
+    if pairs and used + estimate_tokens("\n".join(pairs)) <= token_budget // 3:
+        used += estimate_tokens("\n".join(pairs))
+    else:
+        pairs = []
+
+    numeric_rows, categorical_rows, omitted = [], [], []
+    numeric, constant = set(profile.numeric_columns), set(constant)
+    for col in rank_columns(profile, correlation):
+        if col in constant:
+            continue
+        row = _column_row(profile, col)
+        cost = estimate_tokens(row) + 1
+        if omitted or used + cost > token_budget:
+            omitted.append(col)
+            continue
+        used += cost
+        (numeric_rows if col in numeric else categorical_rows).append(row)
+
+    sections = ["\n".join(overview)]
+    if numeric_rows:
+        sections.append("Numeric columns (most informative first):\n" + NUMERIC_HEADER + "\n" + "\n".join(numeric_rows))
+    if categorical_rows:
+        sections.append("Categorical columns (most informative first):\n" + CATEGORICAL_HEADER + "\n"
+                        + "\n".join(categorical_rows))
+    if pairs:
+        sections.append("Strongest correlations:\n" + "\n".join(pairs))
+    if omitted:
+        sections.append(f"({len(omitted):,} less informative columns omitted for brevity)")
+    dataset_section = "\n\n".join(sections)
+
+    text = f"{INSTRUCTIONS}\n\n{dataset_section}\n"
+    tokens = estimate_tokens(text)
+    return PromptBuild(
+        text=text,
+        dataset_section=dataset_section,
+        tokens=tokens,
+        token_budget=token_budget,
+        columns_included=len(numeric_rows) + len(categorical_rows),
+        columns_total=profile.n_cols,
+        prefill_seconds=tokens / prefill_tokens_per_second,
+        omitted=omitted,
+    )
@@ -0,0 +1,285 @@
+"""
+Streaming PDF report writer.
+
+The report is laid out from the cached DatasetProfiles and PNG charts that
+were already rendered (the figure cache), so no statistic or plot is
+recomputed. Pages are written to the output file as soon as they are full:
+each page's content stream is compressed and appended, and only the byte
+offsets of the PDF objects are kept until the cross-reference table is
+written at the end. Memory therefore stays flat however many columns the
+dataset has, and every column is included.
+
+Text uses the standard Helvetica fonts (not embedded) in WinAnsi encoding;
+characters outside it are replaced with '?'.
+"""
+import io
+import math
+import zlib
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4, in points
+MARGIN = 40
+# Charts larger than this many pixels per side are downscaled by a whole factor before embedding
+CHART_MAX_PIXELS = 2400
+# Image rows compressed and written at a time
+IMAGE_STRIP_ROWS = 64
+FONTS = {'F1': 'Helvetica', 'F2': 'Helvetica-Bold'}
+# Average Helvetica glyph width as a fraction of the font size, used to truncate table cells
+CHAR_WIDTH = 0.52
+_ESCAPES = str.maketrans({'\\': '\\\\', '(': '\\(', ')': '\\)', '\r': ' ', '\n': ' '})
+
+
+def _pdf_string(text):
+    """A PDF literal string in WinAnsi encoding"""
+    return b'(' + str(text).translate(_ESCAPES).encode('cp1252', errors='replace') + b')'
+
+
+def _fit(text, width, size):
+    """text truncated with an ellipsis to fit width points at the given font size"""
+    text = str(text)
+    chars = max(1, int(width / (size * CHAR_WIDTH)))
+    return text if len(text) <= chars else text[:chars - 1] + '…'
+
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return '-'
+    if abs(value) >= 1e9 or (value != 0 and abs(value) < 1e-3):
+        return f'{value:.3e}'
+    return f'{value:,.2f}'
+
+
+class PDFWriter:
+    """Writes PDF objects to a binary file as they are produced; close() adds the page tree and xref"""
+
+    def __init__(self, out):
+        self.out = out
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self._next_id = 1
+        self.catalog_id = self._reserve()
+        self.pages_id = self._reserve()
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self.font_ids = {
+            name: self._add(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>'
+                            % base.encode())
+            for name, base in FONTS.items()
+        }
+
+    def _reserve(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write(self, data):
+        self.out.write(data)
+        self.position += len(data)
+
+    def _add(self, body, stream=None, obj_id=None):
+        obj_id = obj_id or self._reserve()
+        self.offsets[obj_id] = self.position
+        self._write(b'%d 0 obj\n%s' % (obj_id, body))
+        if stream is not None:
+            self._write(b'\nstream\n' + stream + b'\nendstream')
+        self._write(b'\nendobj\n')
+        return obj_id
+
+    def _add_compressed(self, entries, chunks):
+        """Write a stream object compressed chunk by chunk; its length follows as a separate object"""
+        length_id, obj_id = self._reserve(), self._reserve()
+        self.offsets[obj_id] = self.position
+        self._write(b'%d 0 obj\n<< %s /Filter /FlateDecode /Length %d 0 R >>\nstream\n' % (obj_id, entries, length_id))
+        start = self.position
+        compressor = zlib.compressobj()
+        for chunk in chunks:
+            self._write(compressor.compress(chunk))
+        self._write(compressor.flush())
+        length = self.position - start
+        self._write(b'\nendstream\nendobj\n')
+        self._add(b'%d' % length, obj_id=length_id)
+        return obj_id
+
+    def add_image(self, png):
+        """Embed a PNG, flattened to RGB; returns (object id, width, height) in pixels"""
+        from PIL import Image  # installed with matplotlib; only needed when a report has charts
+        with Image.open(io.BytesIO(png)) as image:
+            factor = math.ceil(max(image.size) / CHART_MAX_PIXELS)
+            image = image.reduce(factor) if factor > 1 else image
+            width, height = image.size
+            strips = (image.crop((0, top, width, min(top + IMAGE_STRIP_ROWS, height))).convert('RGB').tobytes()
+                      for top in range(0, height, IMAGE_STRIP_ROWS))
+            obj_id = self._add_compressed(b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB '
+                                          b'/BitsPerComponent 8' % (width, height), strips)
+        return obj_id, width, height
+
+    def add_page(self, content, images=()):
+        """Write one page: its drawing operators and the ids of the images it shows"""
+        stream = zlib.compress(content)
+        content_id = self._add(b'<< /Length %d /Filter /FlateDecode >>' % len(stream), stream)
+        fonts = b' '.join(b'/%s %d 0 R' % (name.encode(), obj_id) for name, obj_id in self.font_ids.items())
+        xobjects = b' '.join(b'/Im%d %d 0 R' % (obj_id, obj_id) for obj_id in images)
+        self.page_ids.append(self._add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] /Resources << /Font << %s >> '
+            b'/XObject << %s >> >> /Contents %d 0 R >>'
+            % (self.pages_id, PAGE_WIDTH, PAGE_HEIGHT, fonts, xobjects, content_id)))
+
+    def close(self):
+        """Write the page tree, catalog, cross-reference table and trailer"""
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        self._add(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids)), obj_id=self.pages_id)
+        self._add(b'<< /Type /Catalog /Pages %d 0 R >>' % self.pages_id, obj_id=self.catalog_id)
+        xref = self.position
+        entries = [b'xref\n0 %d\n0000000000 65535 f \n' % self._next_id]
+        entries += [b'%010d 00000 n \n' % self.offsets[obj_id] for obj_id in range(1, self._next_id)]
+        self._write(b''.join(entries))
+        self._write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                    % (self._next_id, self.catalog_id, xref))
+
+
+class ReportCanvas:
+    """Lays out text, tables and images top to bottom, writing each page out once it is full"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._ops = []
+        self._images = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def new_page(self):
+        if self._ops:
+            self.writer.add_page(b'\n'.join(self._ops), self._images)
+        self._ops, self._images = [], []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _ensure(self, height):
+        if self.y - height < MARGIN:
+            self.new_page()
+
+    def _text_at(self, x, y, text, size, bold=False):
+        self._ops.append(b'BT /%s %.1f Tf %.2f %.2f Td %s Tj ET'
+                         % (b'F2' if bold else b'F1', size, x, y, _pdf_string(text)))
+
+    def space(self, height):
+        self.y -= height
+
+    def text(self, text, size=10, bold=False):
+        self._ensure(size * 1.5)
+        self.y -= size * 1.5
+        self._text_at(MARGIN, self.y, text, size, bold)
+
+    def heading(self, text):
+        self._ensure(40)  # keep a heading with at least the first lines below it
+        self.space(8)
+        self.text(text, size=13, bold=True)
+        self.space(2)
+
+    def _row(self, cells, widths, size, bold=False):
+        """One text object per row: each cell is placed relative to the previous one"""
+        self.y -= size * 1.6
+        parts = [b'BT /%s %.1f Tf %.2f %.2f Td' % (b'F2' if bold else b'F1', size, MARGIN, self.y)]
+        offset = 0
+        for cell, width in zip(cells, widths):
+            parts.append(b'%.2f 0 Td %s Tj' % (offset, _pdf_string(_fit(cell, width - 4, size))))
+            offset = width
+        parts.append(b'ET')
+        self._ops.append(b' '.join(parts))
+        if bold:
+            rule = self.y - size * 0.45
+            self._ops.append(b'0.5 w %.2f %.2f m %.2f %.2f l S' % (MARGIN, rule, MARGIN + sum(widths), rule))
+
+    def table(self, header, rows, widths, size=7):
+        """A table of any length; the header is repeated at the top of every page it spans"""
+        row_height = size * 1.6
+        self._ensure(row_height * 3)
+        self._row(header, widths, size, bold=True)
+        for cells in rows:
+            if self.y - row_height < MARGIN:
+                self.new_page()
+                self._row(header, widths, size, bold=True)
+            self._row(cells, widths, size)
+
+    def image(self, png, title):
+        """A chart scaled to the page width, with its title"""
+        obj_id, width_px, height_px = self.writer.add_image(png)
+        width = PAGE_WIDTH - 2 * MARGIN
+        height = min(width * height_px / width_px, PAGE_HEIGHT - 2 * MARGIN - 30)
+        width = height * width_px / height_px
+        self._ensure(height + 30)
+        self.text(title, size=11, bold=True)
+        self.y -= height + 6
+        self._ops.append(b'q %.2f 0 0 %.2f %.2f %.2f cm /Im%d Do Q' % (width, height, MARGIN, self.y, obj_id))
+        self._images.append(obj_id)
+
+    def close(self):
+        self.new_page()
+        self.writer.close()
+
+
+def _overview_rows(profile):
+    columns = profile.columns
+    fields = (columns[field].tolist() for field in ('dtype', 'count', 'null_count', 'null_pct', 'unique'))
+    for name, dtype, count, nulls, null_pct, unique in zip(columns.index, *fields):
+        yield name, dtype, f"{count:,}", f"{nulls:,}", f"{null_pct:.1f}%", f"{unique:,}"
+
+
+def _numeric_rows(profile):
+    stats = profile.columns.loc[profile.numeric_columns]
+    fields = (stats[field].tolist() for field in ('mean', 'std', 'min', 'q25', 'median', 'q75', 'max'))
+    for name, *values in zip(stats.index, *fields):
+        yield (name, *map(_number, values))
+
+
+def _categorical_rows(profile):
+    for name in profile.categorical_columns:
+        top = profile.top_values.get(name)
+        top_value = f"{top.index[0]} ({top.iloc[0]:,})" if top is not None and len(top) else '-'
+        yield name, f"{profile.columns.loc[name, 'unique']:,}", top_value
+
+
+def write_report(out, profile, cleaned_profile=None, charts=(), title='EDA Dashboard Report'):
+    """Write the PDF report for a dataset to the binary file out.
+
+    profile describes the original data and cleaned_profile (default: the
+    same) the cleaned data the statistics are reported on; charts is an
+    iterable of (title, PNG bytes), embedded one at a time. Returns the number
+    of pages written.
+    """
+    cleaned_profile = cleaned_profile or profile
+    writer = PDFWriter(out)
+    canvas = ReportCanvas(writer)
+    full_width = PAGE_WIDTH - 2 * MARGIN
+
+    canvas.text(title, size=18, bold=True)
+    canvas.space(6)
+    canvas.heading('Dataset Information')
+    canvas.text(f'Original Shape: ({profile.n_rows:,}, {profile.n_cols:,})')
+    canvas.text(f'Cleaned Shape: ({cleaned_profile.n_rows:,}, {cleaned_profile.n_cols:,})')
+    canvas.text(f'Missing Values: {profile.total_missing:,} (after cleaning: {cleaned_profile.total_missing:,})')
+    canvas.text(f'Numeric Columns: {len(cleaned_profile.numeric_columns):,}   '
+                f'Categorical Columns: {len(cleaned_profile.categorical_columns):,}')
+    if profile.approximate or cleaned_profile.approximate:
+        canvas.text('Approximate statistics (sketches):')
+        for stat, bound in (profile.error_bounds or cleaned_profile.error_bounds).items():
+            canvas.text(f'  {stat}: {bound}')
+
+    canvas.heading('Columns (original data)')
+    canvas.table(['Column', 'Type', 'Non-null', 'Missing', 'Missing %', 'Unique'], _overview_rows(profile),
+                 [full_width * share for share in (0.34, 0.16, 0.14, 0.12, 0.12, 0.12)])
+
+    if cleaned_profile.numeric_columns:
+        canvas.heading('Summary Statistics')
+        canvas.table(['Column', 'Mean', 'Std', 'Min', '25%', 'Median', '75%', 'Max'], _numeric_rows(cleaned_profile),
+                     [full_width * 0.23] + [full_width * 0.11] * 7)
+
+    if cleaned_profile.categorical_columns:
+        canvas.heading('Categorical Columns')
+        canvas.table(['Column', 'Unique', 'Most Frequent (count)'], _categorical_rows(cleaned_profile),
+                     [full_width * share for share in (0.35, 0.12, 0.53)])
+
+    for i, (chart_title, png) in enumerate(charts):
+        if i == 0:
+            canvas.heading('Charts')
+        canvas.image(png, chart_title)
+
+    canvas.close()
+    return len(writer.page_ids)
@@ -0,0 +1,357 @@
+"""
+Mergeable sketches for approximate column statistics.
+
+Each sketch is updated from one chunk of a column at a time and merged with
+sketches of other chunks, so statistics over any number of rows come from a
+single streaming pass in bounded memory, with stated error bounds:
+
+- QuantileSketch (DDSketch-style): every quantile is within
+  relative_accuracy (relative) of a value at that rank. Values are counted
+  into logarithmic buckets, so an update is a vectorised bincount, not a sort.
+- HyperLogLog: distinct count with a standard error of 1.04 / sqrt(2**precision).
+- FrequentItems (Misra-Gries): the most frequent values, with every count
+  under the true one by at most `error` (itself at most total / (capacity + 1)).
+
+ColumnSketch bundles them with the exact count, nulls, mean, variance,
+min and max of one column.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Mantissa bits kept by QuantileSketch buckets: relative error at most 2**-(bits + 1)
+QUANTILE_MANTISSA_BITS = 6
+# Quantile buckets kept per sign; beyond it the smallest magnitudes share a bucket
+MAX_QUANTILE_BUCKETS = 4096
+# Magnitudes below this are counted as zero by QuantileSketch
+MIN_MAGNITUDE = 1e-300
+HLL_PRECISION = 14
+FREQUENT_CAPACITY = 256
+
+_MAGNITUDE_MASK = np.int64(0x7FFF_FFFF_FFFF_FFFF)
+
+
+class _BucketStore:
+    """Dense bucket counts for a contiguous range of integer keys"""
+
+    def __init__(self, max_buckets):
+        self.max_buckets = max_buckets
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _extend(self, low, high):
+        if not self.counts.size:
+            self.offset, self.counts = low, np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_low, new_high = min(low, self.offset), max(high, self.offset + self.counts.size - 1)
+        if (new_low, new_high) != (self.offset, self.offset + self.counts.size - 1):
+            counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+            counts[self.offset - new_low:self.offset - new_low + self.counts.size] = self.counts
+            self.offset, self.counts = new_low, counts
+
+    def _collapse(self):
+        excess = self.counts.size - self.max_buckets
+        if excess > 0:
+            self.counts[excess] += self.counts[:excess].sum()
+            self.counts = self.counts[excess:].copy()
+            self.offset += excess
+
+    def add_counts(self, offset, counts):
+        """Add counts for the keys offset, offset + 1, ..."""
+        used = np.flatnonzero(counts)
+        if not used.size:
+            return
+        counts = counts[used[0]:used[-1] + 1]
+        offset += int(used[0])
+        self._extend(offset, offset + counts.size - 1)
+        start = offset - self.offset
+        self.counts[start:start + counts.size] += counts
+        self._collapse()
+
+    def merge(self, other):
+        self.add_counts(other.offset, other.counts)
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch over finite values.
+
+    Like DDSketch, values are counted in buckets whose width is a fixed
+    fraction of their magnitude, one store for positive and one for
+    negative values; the bucket of a value is read off its float64 bits
+    (the exponent and the top mantissa_bits of the mantissa).
+    """
+
+    def __init__(self, mantissa_bits=QUANTILE_MANTISSA_BITS, max_buckets=MAX_QUANTILE_BUCKETS):
+        self.mantissa_bits = mantissa_bits
+        self._shift = np.int64(52 - mantissa_bits)
+        self._zero_key = int(self._keys(np.array([MIN_MAGNITUDE]))[0])
+        self.positive = _BucketStore(max_buckets)
+        self.negative = _BucketStore(max_buckets)
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def relative_accuracy(self):
+        return 2.0 ** -(self.mantissa_bits + 1)
+
+    def _keys(self, values):
+        """Bucket keys of the magnitudes of values"""
+        return (values.view(np.int64) & _MAGNITUDE_MASK) >> self._shift
+
+    def _value(self, key):
+        """Midpoint of the bucket of magnitudes for key"""
+        bounds = (np.array([key, key + 1], dtype=np.int64) << self._shift).view(np.float64)
+        return float(bounds.mean())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        low, high = float(values.min()), float(values.max())
+        if not (math.isfinite(low) and math.isfinite(high)):
+            values = values[np.isfinite(values)]
+            if not values.size:
+                return
+            low, high = float(values.min()), float(values.max())
+        self.count += values.size
+        self.min, self.max = min(self.min, low), max(self.max, high)
+        # Magnitudes below MIN_MAGNITUDE all land in the key just under the smallest store key
+        keys = np.maximum(self._keys(values), self._zero_key - 1)
+        first, last = int(keys.min()), int(keys.max())
+        keys -= first
+        if low >= 0 or high < 0:
+            counts = np.bincount(keys, minlength=last - first + 1)
+            positive, negative = (counts, counts[:0]) if low >= 0 else (counts[:0], counts)
+        else:
+            # One pass for both signs: even slots count positive values, odd slots negative ones
+            keys <<= 1
+            keys |= values < 0
+            counts = np.bincount(keys, minlength=2 * (last - first + 1))
+            positive, negative = counts[0::2].copy(), counts[1::2].copy()
+        if first == self._zero_key - 1:
+            for store_counts in (positive, negative):
+                if store_counts.size:
+                    self.zero_count += int(store_counts[0])
+                    store_counts[0] = 0
+        self.positive.add_counts(first, positive)
+        self.negative.add_counts(first, negative)
+
+    def merge(self, other):
+        if other.mantissa_bits != self.mantissa_bits:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        negatives = int(self.negative.counts.sum())
+        if rank < negatives:
+            # Most negative first: the negative store from its largest magnitude down
+            counts = self.negative.counts[::-1]
+            position = int(np.searchsorted(np.cumsum(counts), rank, side='right'))
+            value = -self._value(self.negative.offset + counts.size - 1 - position)
+        elif rank < negatives + self.zero_count:
+            value = 0.0
+        else:
+            position = int(np.searchsorted(np.cumsum(self.positive.counts), rank - negatives - self.zero_count,
+                                           side='right'))
+            value = self._value(self.positive.offset + position)
+        return min(max(value, self.min), self.max)
+
+
+def _mix(bits):
+    """murmur3's 64-bit finalizer, in place: spreads every input bit over the whole hash"""
+    shifted = np.empty_like(bits)
+    for multiplier in (0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, None):
+        np.right_shift(bits, np.uint64(33), out=shifted)
+        bits ^= shifted
+        if multiplier is not None:
+            bits *= np.uint64(multiplier)
+    return bits
+
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit hashes of the values"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Standard error of estimate(), relative to the true count"""
+        return 1.04 / math.sqrt(self.registers.size)
+
+    def update(self, values):
+        """Add the (non-null) values of a float64 array, or of any array, Index or Series"""
+        if isinstance(values, np.ndarray) and values.dtype == np.float64:
+            self.update_hashes(_mix((values + 0.0).view(np.uint64)))  # a copy, mixed in place
+        else:
+            # Distinct values already (e.g. a value_counts() index): no need to factorize before hashing
+            self.update_hashes(pd.util.hash_array(np.asarray(values), categorize=False))
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not hashes.size:
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).view(np.int64)
+        # The exponent of the remaining `width` bits as a float64 (exact: they fit its mantissa) locates
+        # their first set bit; rank = leading zeros + 1, and width + 1 when all are zero
+        exponent = (hashes & np.uint64((1 << width) - 1)).astype(np.float64).view(np.int64)
+        exponent >>= np.int64(52)
+        rank = np.minimum(width + 1023 - exponent, width + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+class FrequentItems:
+    """Misra-Gries summary of the most frequent values"""
+
+    def __init__(self, capacity=FREQUENT_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0  # every kept count is at most this much below the true one
+
+    def _trim(self, counts):
+        """Keep the capacity largest counts, each lowered by the next largest one"""
+        if len(counts) > self.capacity:
+            largest = counts.nlargest(self.capacity + 1, keep='first')
+            cut = int(largest.iloc[-1])
+            self.error += cut
+            counts = largest.iloc[:-1] - cut
+            counts = counts[counts > 0]
+        return counts.astype(np.int64)
+
+    def _combine(self, counts):
+        self.counts = self._trim(counts if self.counts.empty else self.counts.add(counts, fill_value=0))
+
+    def update_counts(self, counts):
+        """Add a chunk's value -> count Series (e.g. its value_counts())"""
+        if len(counts) and counts.min() <= 0:
+            counts = counts[counts > 0]
+        self.total += int(counts.sum())
+        # Summarise the chunk on its own first, so only two small summaries are aligned
+        self._combine(self._trim(counts))
+
+    def merge(self, other):
+        self.total += other.total
+        self.error += other.error
+        if not other.counts.empty:
+            self._combine(other.counts)
+
+    def top(self, k):
+        """The k most frequent values and their (lower-bound) counts, most frequent first"""
+        return self.counts.sort_values(ascending=False, kind='stable').head(k)
+
+
+class ColumnSketch:
+    """Mergeable summary of one column.
+
+    Counts, nulls, mean, variance, min and max are exact; quantiles
+    (numeric columns), the distinct count and the top values (other columns)
+    come from the sketches above.
+    """
+
+    def __init__(self, numeric, mantissa_bits=QUANTILE_MANTISSA_BITS, precision=HLL_PRECISION,
+                 capacity=FREQUENT_CAPACITY):
+        self.numeric = numeric
+        self.count = 0
+        self.null_count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.quantiles = QuantileSketch(mantissa_bits) if numeric else None
+        self.distinct = HyperLogLog(precision)
+        self.frequent = None if numeric else FrequentItems(capacity)
+
+    def _add_moments(self, count, mean, m2):
+        # Chan et al.'s pairwise update, so chunks merge without loss of precision
+        total = self.count + count
+        if total:
+            delta = mean - self.mean
+            self._m2 += m2 + delta * delta * self.count * count / total
+            self.mean += delta * count / total
+        self.count = total
+
+    def update_numeric(self, values):
+        """Add a chunk of a numeric column as float64 values, NaN for missing"""
+        present = values[~np.isnan(values)]
+        self.null_count += values.size - present.size
+        if present.size:
+            mean = float(present.mean())
+            self._add_moments(present.size, mean, float(np.square(present - mean).sum()))
+        self.quantiles.update(present)
+        self.distinct.update(present)
+
+    def update(self, series):
+        """Add a chunk of the column"""
+        if self.numeric:
+            self.update_numeric(series.to_numpy(dtype=np.float64, na_value=np.nan))
+            return
+        counts = series.value_counts()
+        counts = counts.iloc[:int(np.count_nonzero(counts.to_numpy()))]  # sorted: unused categories last
+        self.count += int(counts.sum())
+        self.null_count += len(series) - int(counts.sum())
+        self.distinct.update(counts.index)
+        self.frequent.update_counts(counts)
+
+    def merge(self, other):
+        self.null_count += other.null_count
+        if self.numeric:
+            self._add_moments(other.count, other.mean, other._m2)
+            self.quantiles.merge(other.quantiles)
+        else:
+            self.count += other.count
+            self.frequent.merge(other.frequent)
+        self.distinct.merge(other.distinct)
+
+    def stats(self):
+        """PROFILE_FIELDS values of the column (without dtype and null_pct)"""
+        unique = min(self.distinct.estimate(), self.count)
+        row = {'count': self.count, 'null_count': self.null_count, 'unique': max(unique, int(self.count > 0))}
+        if self.numeric:
+            quantiles = self.quantiles
+            row.update(mean=self.mean if self.count else math.nan,
+                       std=math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else math.nan,
+                       min=quantiles.quantile(0) if self.count else math.nan,
+                       q25=quantiles.quantile(0.25), median=quantiles.quantile(0.5), q75=quantiles.quantile(0.75),
+                       max=quantiles.quantile(1) if self.count else math.nan)
+        return row
+
+    def top(self, k):
+        return self.frequent.top(k) if self.frequent is not None else None
+
+
+def error_bounds(mantissa_bits=QUANTILE_MANTISSA_BITS, precision=HLL_PRECISION, capacity=FREQUENT_CAPACITY):
+    """Human-readable error bounds of ColumnSketch statistics"""
+    return {
+        'quantiles': f"within {2.0 ** -(mantissa_bits + 1):.2%} of a value at that rank",
+        'unique': f"±{1.04 / math.sqrt(1 << precision):.1%} (one standard error)",
+        'top values': f"counts low by at most 1/{capacity + 1} of the rows",
+    }
@@ -0,0 +1,152 @@
+"""
+Columnar (Parquet / Arrow IPC) reading, export and on-disk persistence of datasets.
+
+pyarrow is optional: without it the dashboard stays CSV-only and nothing is
+persisted to disk.
+"""
+import io
+import os
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Upload extensions handled by read_columnar
+COLUMNAR_EXTENSIONS = ('parquet', 'arrow', 'feather')
+
+# Download formats: label -> (extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def columnar_available():
+    return pa is not None
+
+
+def file_format(filename):
+    """Lower-case extension of an uploaded file name ('csv' when unknown)"""
+    ext = os.path.splitext(filename or '')[1].lstrip('.').lower()
+    return ext or 'csv'
+
+
+def read_columnar(source, fmt):
+    """Read a Parquet or Arrow IPC (Feather v2) file-like object into a DataFrame"""
+    if pa is None:
+        raise ImportError("pyarrow is required to read Parquet/Arrow files")
+    source.seek(0)
+    if fmt == 'parquet':
+        table = pq.read_table(source)
+    else:
+        try:
+            table = ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            # Arrow IPC *stream* files have no footer
+            source.seek(0)
+            table = ipc.open_stream(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def export_bytes(df, label):
+    """Serialize a DataFrame in one of EXPORT_FORMATS"""
+    if label == "CSV":
+        return df.to_csv(index=False).encode('utf-8')
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet/Arrow export")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    buf = io.BytesIO()
+    if label == "Parquet":
+        pq.write_table(table, buf, compression='zstd')
+    else:
+        with ipc.new_file(buf, table.schema) as writer:
+            writer.write_table(table)
+    return buf.getvalue()
+
+
+class DatasetStore:
+    """Arrow IPC files on local disk, memory-mapped on load.
+
+    Used to keep parsed datasets across evictions from the in-memory cache
+    and across server restarts. Writes are best effort: a frame Arrow cannot
+    represent is simply not persisted. in_use, if given, returns the paths of
+    files still read elsewhere (e.g. Parquet files scanned by open engines),
+    which prune() never deletes.
+    """
+
+    def __init__(self, root, max_bytes=10 * 1024 ** 3, in_use=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.in_use = in_use
+        if pa is not None:
+            os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9_.-]', '_', key) + '.arrow')
+
+    def parquet_path(self, key):
+        """Parquet copy of key, scanned in place by the out-of-core engines"""
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9_.-]', '_', key) + '.parquet')
+
+    def __contains__(self, key):
+        return pa is not None and os.path.exists(self.path(key))
+
+    def save(self, key, df):
+        """Write df under key; returns False when it could not be persisted"""
+        if pa is None:
+            return False
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except (pa.ArrowException, OSError, ValueError, TypeError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.prune()
+        return True
+
+    def load(self, key):
+        """Memory-map a stored dataset; returns None when key is not stored"""
+        if key not in self:
+            return None
+        path = self.path(key)
+        try:
+            with pa.memory_map(path, 'r') as source:
+                table = ipc.open_file(source).read_all()
+            os.utime(path)  # mark as recently used for prune()
+        except (pa.ArrowException, OSError):
+            return None
+        return table.to_pandas(split_blocks=True)
+
+    def remove(self, key):
+        if key in self:
+            os.remove(self.path(key))
+
+    def prune(self):
+        """Delete least recently used files until the store fits max_bytes, keeping files in use"""
+        files = []
+        for name in os.listdir(self.root):
+            if name.endswith(('.arrow', '.parquet')):
+                stat = os.stat(os.path.join(self.root, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        keep = {os.path.abspath(path) for path in self.in_use()} if self.in_use is not None else set()
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.root, name)
+            if os.path.abspath(path) in keep:
+                continue
+            os.remove(path)
+            total -= size
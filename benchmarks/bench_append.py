@@ -0,0 +1,99 @@
+"""
+Re-uploading a file with rows appended: full reload vs append mode.
+
+    python benchmarks/bench_append.py
+    python benchmarks/bench_append.py --rows 2000000 --new 20000
+
+Writes a synthetic CSV of --rows rows and the same file with --new rows
+appended. The full reload parses the longer file, profiles it (exact, then
+with sketches) and computes its Pearson correlation from scratch; append
+mode (app/append.py) finds the earlier upload by its prefix hash, parses
+only the new bytes and extends the cached profile and correlation sums. The
+extended profile and matrix are checked against the full ones.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from append import AppendIndex, extend_dataset  # noqa: E402
+from correlation import correlation_accumulator  # noqa: E402
+from ingest import read_csv_chunked  # noqa: E402
+from profiling import extend_profile, profile_dataframe  # noqa: E402
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, rows).round(2),
+        'quantity': rng.integers(1, 50, rows),
+        'score': rng.normal(0, 1, rows),
+        'region': rng.choice(['north', 'south', 'east', 'west'], rows),
+        'customer': pd.Series(rng.integers(0, rows, rows)).map('c{:07d}'.format),
+    })
+    df.loc[::11, 'score'] = np.nan
+    return df
+
+
+def full_reload(data, approximate):
+    df = read_csv_chunked(io.BytesIO(data))
+    return df, profile_dataframe(df, approximate=approximate), correlation_accumulator(df)
+
+
+def append_mode(index, data, base, profile, sums):
+    record = index.find_base(data)
+    rows, df = extend_dataset(base, data, record.size)
+    return df, extend_profile(profile, rows, df), sums.extend(rows)
+
+
+def compare(old, new, approximate, rows):
+    (base, profile, sums), load_seconds = timed(lambda: full_reload(old, approximate))
+    index = AppendIndex()
+    _, record_seconds = timed(lambda: index.record('base', old))
+
+    (full_df, full_profile, full_sums), full_seconds = timed(lambda: full_reload(new, approximate))
+    (df, extended_profile, extended_sums), append_seconds = timed(
+        lambda: append_mode(index, new, base, profile, sums))
+
+    assert len(df) == len(full_df) == rows
+    assert (extended_profile.columns['count'] == full_profile.columns['count']).all()
+    mean_error = (extended_profile.columns['mean'] - full_profile.columns['mean']).abs().max()
+    corr_error = np.nanmax(np.abs(extended_sums.result().to_numpy() - full_sums.result().to_numpy()))
+
+    print(f"\n{'approximate' if approximate else 'exact'} profile")
+    print(f"{'step':<36} {'time':>9}")
+    print(f"{'first upload (parse, profile, corr)':<36} {load_seconds * 1000:>7.0f}ms")
+    print(f"{'record upload for append detection':<36} {record_seconds * 1000:>7.0f}ms")
+    print(f"{'re-upload, full reload':<36} {full_seconds * 1000:>7.0f}ms")
+    print(f"{'re-upload, append mode':<36} {append_seconds * 1000:>7.0f}ms")
+    print(f"max |mean| difference {mean_error:.2e}, max |r| difference {corr_error:.2e}")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--new', type=int, default=10_000)
+    args = parser.parse_args()
+
+    old = make_frame(args.rows, 0).to_csv(index=False).encode()
+    new = old + make_frame(args.new, 1).to_csv(index=False, header=False).encode()
+    print(f"{args.rows:,} rows ({len(old) / 1024 ** 2:,.0f} MB) + {args.new:,} appended")
+
+    for approximate in (False, True):
+        compare(old, new, approximate, args.rows + args.new)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the data browser: cost of the first sort/filter and of each page turn.
+
+    python benchmarks/bench_browser.py
+    python benchmarks/bench_browser.py --rows 10000000 --pages 200
+
+Compares against the naive approach of sorting and filtering the whole frame
+on every interaction (df[mask].sort_values(col).iloc[page]).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from browser import BrowserIndex, get_page  # noqa: E402
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'value': rng.normal(size=rows),
+        'count': rng.integers(0, 1000, rows),
+        'group': pd.Categorical(rng.choice(['a', 'b', 'c', 'd', 'e'], rows)),
+        'label': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+    })
+    df.loc[::11, 'value'] = np.nan
+    return df
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    index = BrowserIndex(max_bytes=4 * 1024 ** 3)
+    spec = ('range', 100, 500)
+    columns = ['value', 'count', 'label']
+    print(f"{args.rows:,} rows, page size {args.page_size}")
+
+    _, naive = timed(lambda: df[df['count'].between(100, 500)].sort_values('value').iloc[:args.page_size])
+    print(f"{'naive filter+sort per interaction':<36} {naive * 1000:>10.1f} ms")
+
+    for label, sort, filter_column, filter_spec in [("sort", 'value', None, None),
+                                                   ("filter", None, 'count', spec),
+                                                   ("sort + filter", 'value', 'count', spec)]:
+        positions, first = timed(lambda: index.view('bench', df, sort, True, filter_column, filter_spec))
+        start = time.perf_counter()
+        for page in range(1, args.pages + 1):
+            index.view('bench', df, sort, True, filter_column, filter_spec)
+            get_page(df, positions, page, args.page_size, columns)
+        per_page = (time.perf_counter() - start) / args.pages
+        print(f"{label + ' (first build)':<36} {first * 1000:>10.1f} ms")
+        print(f"{label + ' (each page turn)':<36} {per_page * 1000:>10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
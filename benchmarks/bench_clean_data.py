@@ -0,0 +1,103 @@
+"""
+Benchmark clean_data against the original column-by-column implementation.
+
+    python benchmarks/bench_clean_data.py
+    python benchmarks/bench_clean_data.py --tall-rows 1000000 --repeat 1
+
+Shapes: "wide" (many columns, few rows) and "tall" (few columns, many rows),
+both with ~10% missing values in every column.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from cleaning import clean_data, enable_copy_on_write  # noqa: E402
+
+
+def legacy_clean_data(df, numeric_strategy='mean', categorical_strategy='mode'):
+    """clean_data as it was before the batched engine (reference only)"""
+    df_cleaned = df.copy()
+    for col in df_cleaned.select_dtypes(include=[np.number]).columns:
+        if df_cleaned[col].isnull().sum() > 0:
+            if numeric_strategy == 'mean':
+                df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].mean())
+            elif numeric_strategy == 'median':
+                df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].median())
+            elif numeric_strategy == 'zero':
+                df_cleaned[col] = df_cleaned[col].fillna(0)
+    for col in df_cleaned.select_dtypes(include=['object', 'string']).columns:
+        if df_cleaned[col].isnull().sum() > 0:
+            if categorical_strategy == 'mode':
+                mode_value = df_cleaned[col].mode()[0] if len(df_cleaned[col].mode()) > 0 else 'Unknown'
+                df_cleaned[col] = df_cleaned[col].fillna(mode_value)
+            elif categorical_strategy == 'unknown':
+                df_cleaned[col] = df_cleaned[col].fillna('Unknown')
+    return df_cleaned
+
+
+def make_frame(rows, numeric_cols, categorical_cols, missing_rate=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(numeric_cols):
+        values = rng.normal(size=rows)
+        values[rng.random(rows) < missing_rate] = np.nan
+        data[f"num_{i}"] = values
+    labels = np.array(['alpha', 'beta', 'gamma', 'delta'], dtype=object)
+    for i in range(categorical_cols):
+        values = labels[rng.integers(0, len(labels), rows)]
+        values[rng.random(rows) < missing_rate] = None
+        data[f"cat_{i}"] = values
+    return pd.DataFrame(data)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wide-rows', type=int, default=10_000)
+    parser.add_argument('--wide-cols', type=int, default=1_000)
+    parser.add_argument('--tall-rows', type=int, default=10_000_000)
+    parser.add_argument('--tall-cols', type=int, default=6)
+    parser.add_argument('--strategy', default='median', help="numeric strategy (mean, median, zero)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    enable_copy_on_write()
+    shapes = {
+        'wide': (args.wide_rows, args.wide_cols * 4 // 5, args.wide_cols // 5),
+        'tall': (args.tall_rows, max(args.tall_cols - 2, 1), 2),
+    }
+    print(f"pandas {pd.__version__}, numeric strategy={args.strategy!r}, best of {args.repeat}")
+    print(f"{'shape':<6} {'rows':>11} {'cols':>6} {'legacy s':>10} {'copy s':>10} {'inplace s':>10} {'speedup':>8}")
+    for name, (rows, n_num, n_cat) in shapes.items():
+        df = make_frame(rows, n_num, n_cat)
+        legacy = best_of(lambda: legacy_clean_data(df, args.strategy), args.repeat)
+        batched = best_of(lambda: clean_data(df, args.strategy), args.repeat)
+        # In-place needs a fresh frame per run; the copy is made outside the timed region
+        inplace_times = []
+        for _ in range(args.repeat):
+            work = df.copy()
+            start = time.perf_counter()
+            clean_data(work, args.strategy, copy=False)
+            inplace_times.append(time.perf_counter() - start)
+        inplace = min(inplace_times)
+        print(f"{name:<6} {rows:>11,} {n_num + n_cat:>6} {legacy:>10.3f} {batched:>10.3f} {inplace:>10.3f} "
+              f"{legacy / batched:>7.1f}x")
+        del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark the correlation engine against DataFrame.corr() plus the old
+pair-by-pair scan for strong correlations.
+
+    python benchmarks/bench_correlation.py
+    python benchmarks/bench_correlation.py --columns 2000 --rows 20000 --skip-legacy
+
+Columns are built from a few latent factors so that strong pairs exist.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from correlation import correlation_matrix, heatmap_matrix, top_pairs  # noqa: E402
+
+
+def legacy_strong_pairs(df):
+    """The original insights code path (reference only)"""
+    matrix = df.corr()
+    pairs = []
+    for i in range(len(matrix.columns)):
+        for j in range(i + 1, len(matrix.columns)):
+            value = matrix.iloc[i, j]
+            if abs(value) > 0.5:
+                pairs.append((matrix.columns[i], matrix.columns[j], value))
+    return sorted(pairs, key=lambda x: abs(x[2]), reverse=True)
+
+
+def make_frame(rows, columns, missing_rate, factors=10, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, factors))
+    values = latent @ rng.normal(size=(factors, columns)) + rng.normal(scale=2.0, size=(rows, columns))
+    if missing_rate:
+        values[rng.random(values.shape) < missing_rate] = np.nan
+    return pd.DataFrame(values, columns=[f'c{i}' for i in range(columns)])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--columns', type=int, default=500)
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    parser.add_argument('--skip-legacy', action='store_true', help="skip the slow pandas reference")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.columns, args.missing_rate)
+    print(f"{args.rows:,} rows x {args.columns:,} columns, {args.missing_rate:.0%} missing")
+
+    if not args.skip_legacy:
+        legacy, seconds = timed(lambda: legacy_strong_pairs(df))
+        print(f"{'legacy corr + loop':<28} {seconds:>8.2f}s  {len(legacy):,} strong pairs")
+
+    for label, method, dtype in [("pearson float64", 'pearson', np.float64),
+                                 ("pearson float32", 'pearson', np.float32),
+                                 ("spearman float64", 'spearman', np.float64)]:
+        matrix, seconds = timed(lambda: correlation_matrix(df, method, dtype=dtype))
+        pairs, pair_seconds = timed(lambda: top_pairs(matrix, k=None))
+        _, heat_seconds = timed(lambda: heatmap_matrix(matrix))
+        print(f"{label:<28} {seconds:>8.2f}s  top pairs {pair_seconds * 1000:.1f}ms ({len(pairs):,}), "
+              f"heatmap selection {heat_seconds * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare the execution engines on the dashboard's data operations.
+
+    python benchmarks/bench_engines.py
+    python benchmarks/bench_engines.py --rows 20000000 --engines duckdb polars
+
+Writes a synthetic Parquet file, then runs each engine in a fresh process:
+profile, clean + re-profile, the plot aggregates, correlation and a sorted
+browser page. pandas loads the file into memory first (its load time is
+reported separately); DuckDB and Polars scan it. Peak RSS of each process
+shows how much of the dataset had to be held in memory.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from engines import ENGINES, PandasEngine, available_engines  # noqa: E402
+
+
+def make_parquet(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'value': rng.normal(size=rows),
+        'price': rng.lognormal(3, 1, rows),
+        'count': rng.integers(0, 1000, rows),
+        'score': rng.normal(50, 10, rows),
+        'group': rng.choice(['a', 'b', 'c', 'd', 'e'], rows),
+        'label': rng.choice([f'item{i}' for i in range(500)], rows),
+    })
+    df['score'] += df['value'] * 5
+    df.loc[::7, 'value'] = np.nan
+    df.loc[::13, 'group'] = None
+    df.to_parquet(path, index=False)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process (VmHWM resets on exec, unlike ru_maxrss after a fork)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_engine(name, path):
+    """Timings (seconds) of every operation for one engine, plus peak RSS"""
+    timings = {}
+    if name == 'pandas':
+        holder = {}
+        timings['load'] = timed(lambda: holder.update(engine=PandasEngine(pd.read_parquet(path))))
+        engine = holder['engine']
+    else:
+        engine = ENGINES[name](path)
+    profile = {}
+    timings['profile'] = timed(lambda: profile.update(result=engine.profile()))
+    timings['clean + profile'] = timed(lambda: engine.clean('median', 'mode', profile['result']).profile())
+    timings['histogram'] = timed(lambda: engine.histogram('price'))
+    timings['top categories'] = timed(lambda: engine.top_categories('label'))
+    timings['box aggregate'] = timed(lambda: engine.box_aggregate('group', 'score'))
+    timings['mean + CI'] = timed(lambda: engine.mean_ci_aggregate('group', 'score'))
+    timings['correlation'] = timed(lambda: engine.correlation())
+    timings['sorted page'] = timed(lambda: engine.page(100, 50, sort='price', ascending=False))
+    return {'engine': name, 'timings': timings, 'peak_rss_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--engines', nargs='+', default=available_engines())
+    parser.add_argument('--path', help="existing Parquet file to use instead of synthetic data")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_engine(args.child, args.path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmp, 'bench.parquet')
+            make_parquet(path, args.rows)
+        print(f"{args.rows:,} rows, {os.path.getsize(path) / 1024 ** 2:.0f} MB Parquet, {os.cpu_count()} CPUs")
+        results = []
+        for name in args.engines:
+            output = subprocess.run([sys.executable, __file__, '--child', name, '--path', path],
+                                    capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    operations = list(dict.fromkeys(op for result in results for op in result['timings']))
+    print(f"\n{'operation':<18}" + "".join(f"{result['engine']:>12}" for result in results))
+    for op in operations:
+        cells = [result['timings'].get(op) for result in results]
+        print(f"{op:<18}" + "".join(f"{'-':>12}" if t is None else f"{t * 1000:>10.0f}ms" for t in cells))
+    print(f"{'peak RSS':<18}" + "".join(f"{result['peak_rss_mb']:>10.0f}MB" for result in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Cold-start import time of the dashboard module, measured with `python -X importtime`.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --repeat 10 --top 25
+    python benchmarks/bench_import_time.py --module plotting --no-record
+
+Each run imports the module in a fresh interpreter; the fastest of --repeat
+runs is reported, with the slowest imports by cumulative time and a check that
+the lazily loaded dependencies (plotting stack, PDF) were not pulled in.
+Results are appended to benchmarks/results/import_time.jsonl and compared
+with the previous entry for the same module, so regressions show up over time.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, 'app')
+HISTORY_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'import_time.jsonl')
+
+# Only loaded on first use; none of these should appear at startup
+# (plotly is left out: streamlit imports it for st.plotly_chart)
+LAZY_MODULES = ['seaborn', 'matplotlib', 'PIL']
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure(module):
+    """{module: (self us, cumulative us, depth)} for one fresh import"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=APP_DIR, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': APP_DIR})
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_entry(module):
+    if not os.path.exists(HISTORY_PATH):
+        return None
+    last = None
+    with open(HISTORY_PATH) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get('module') == module:
+                last = entry
+    return last
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='eda_dashboard')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--no-record', action='store_true', help="do not append to the history file")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda timings: timings[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (best of {args.repeat})")
+    print(f"\n{'cumulative ms':>14} {'self ms':>8}  module")
+    top_level = [(name, t) for name, t in best.items() if t[2] == 1]
+    for name, (self_us, cumulative_us, _) in sorted(top_level, key=lambda item: -item[1][1])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in best]
+    print(f"\nLazy dependencies imported at startup: {', '.join(eager) if eager else 'none'}")
+
+    previous = previous_entry(args.module)
+    if previous:
+        change = total_ms - previous['total_ms']
+        print(f"Previous run ({previous.get('revision') or 'unknown revision'}): {previous['total_ms']:.0f} ms "
+              f"({change:+.0f} ms)")
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+        entry = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'module': args.module,
+            'total_ms': round(total_ms, 1),
+            'eager_lazy_modules': eager,
+        }
+        with open(HISTORY_PATH, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Scaling of column-parallel profiling and fill-value computation with the worker count.
+
+    python benchmarks/bench_parallel.py
+    python benchmarks/bench_parallel.py --rows 1000000 --numeric 128 --text 32 --workers 1 2 4 8 16 32
+
+Profiles a wide synthetic frame and computes its median/mode fill values with
+1..N workers, for the thread pool and the process pool (shared-memory numeric
+blocks). Each result is checked against the serial one; speed-ups are relative
+to 1 worker. Pools are started before timing, as they are in the dashboard.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from cleaning import compute_fill_values  # noqa: E402
+from parallel import PARALLEL_MODES, ColumnExecutor  # noqa: E402
+from profiling import profile_dataframe  # noqa: E402
+
+
+def make_frame(rows, n_numeric, n_text, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {f'num{i}': rng.normal(i, 1 + i % 7, rows) for i in range(n_numeric)}
+    words = np.array([f'word{i}' for i in range(2000)], dtype=object)
+    for i in range(n_text):
+        data[f'text{i}'] = pd.Series(words[rng.integers(0, 200 + 50 * i, rows)], dtype='object')
+    df = pd.DataFrame(data)
+    for i, col in enumerate(df.columns):
+        df.loc[i % 11::11 + i % 5, col] = None
+    return df
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def default_workers():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--numeric', type=int, default=64)
+    parser.add_argument('--text', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    parser.add_argument('--modes', nargs='+', choices=PARALLEL_MODES, default=list(PARALLEL_MODES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.numeric, args.text)
+    print(f"{args.rows:,} rows x {args.numeric} numeric + {args.text} object columns, {os.cpu_count()} CPUs")
+    expected_profile = profile_dataframe(df).columns
+    expected_fills = compute_fill_values(df, 'median', 'mode')
+
+    tasks = [("profile", lambda executor: profile_dataframe(df, executor=executor).columns, expected_profile),
+             ("fill values", lambda executor: compute_fill_values(df, 'median', 'mode', executor=executor),
+              expected_fills)]
+    print(f"\n{'mode':<8} {'workers':>7} " + "".join(f"{name:>16} {'speed-up':>9}" for name, _, _ in tasks))
+    for mode in args.modes:
+        baseline = {}
+        for workers in args.workers:
+            executor = ColumnExecutor(workers=workers, mode=mode, min_cells=0)
+            executor.map(abs, [(-1,)] * workers)  # start the pool
+            cells = []
+            for name, task, expected in tasks:
+                result, seconds = best_time(lambda: task(executor), args.repeat)
+                if isinstance(expected, pd.DataFrame):
+                    pd.testing.assert_frame_equal(result, expected)
+                else:
+                    assert result == expected, f"{name} differs from the serial result"
+                baseline.setdefault(name, seconds)
+                cells.append(f"{seconds * 1000:>14.0f}ms {baseline[name] / seconds:>8.2f}x")
+            executor.shutdown()
+            print(f"{mode:<8} {workers:>7} " + " ".join(cells))
+
+
+if __name__ == '__main__':
+    main()
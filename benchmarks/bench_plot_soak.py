@@ -0,0 +1,106 @@
+"""
+Soak test for the plotting path: render thousands of plots and watch memory.
+
+    python benchmarks/bench_plot_soak.py
+    python benchmarks/bench_plot_soak.py --iterations 5000 --report-every 500
+    python benchmarks/bench_plot_soak.py --legacy     # pyplot figures, never closed
+
+Prints resident memory and the number of figures pyplot is tracking at each
+report point. With render_plot both should stay flat after warm-up; --legacy
+reproduces the old plt.subplots() path that leaked a figure per request.
+"""
+import argparse
+import gc
+import io
+import os
+import resource
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from plotting import PLOT_TYPES, render_plot  # noqa: E402
+
+REQUESTS = {
+    "Distribution Plot": ('value', None),
+    "Boxplot": ('group', 'value'),
+    "Countplot": ('group', None),
+    "Barplot": ('group', 'value'),
+    "Correlation Heatmap": (None, None),
+}
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), falling back to peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_render(df, plot_type, x_col, y_col):
+    """The pre-Figure-API behaviour: a pyplot figure per request, never closed"""
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(14, 8))
+    if plot_type == "Correlation Heatmap":
+        sns.heatmap(df.select_dtypes(include=[np.number]).corr(), annot=True, ax=ax)
+    elif y_col is None:
+        sns.histplot(data=df, x=x_col, ax=ax)
+    else:
+        sns.boxplot(data=df, x=x_col, y=y_col, ax=ax)
+    plt.tight_layout(pad=2.0)
+    fig.savefig(io.BytesIO(), format='png', dpi=72)
+    return fig
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'value': rng.normal(size=rows),
+        'other': rng.exponential(size=rows),
+        'count': rng.integers(0, 20, rows),
+        'group': rng.choice(['a', 'b', 'c', 'd', 'e'], rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--report-every', type=int, default=250)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--dpi', type=int, default=72)
+    parser.add_argument('--legacy', action='store_true', help="use leaking pyplot figures instead of render_plot")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    print(f"{'requests':>9} {'rss MB':>9} {'pyplot figs':>12} {'ms/plot':>9}")
+    start_rss = None
+    window_start = time.perf_counter()
+    for i in range(1, args.iterations + 1):
+        plot_type = PLOT_TYPES[i % len(PLOT_TYPES)]
+        x_col, y_col = REQUESTS[plot_type]
+        if args.legacy:
+            legacy_render(df, plot_type, x_col, y_col)
+        else:
+            render_plot(df, plot_type, x_col, y_col, dpi=args.dpi)
+        if i % args.report_every == 0:
+            gc.collect()
+            elapsed = (time.perf_counter() - window_start) / args.report_every * 1000
+            rss = rss_mb()
+            start_rss = start_rss or rss
+            print(f"{i:>9} {rss:>9.1f} {len(plt.get_fignums()):>12} {elapsed:>9.1f}")
+            window_start = time.perf_counter()
+    if start_rss is not None:
+        print(f"RSS growth after first report: {rss_mb() - start_rss:+.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Time and peak memory of the PDF report on a wide dataset.
+
+    python benchmarks/bench_report.py
+    python benchmarks/bench_report.py --rows 20000 --numeric 800 --text 200 --charts 6
+
+Profiles a synthetic frame (1,000 columns by default), renders a few charts as
+the Visualizations tab would, then writes the report with the streaming writer
+(app/report.py), in memory and spooled to a temporary file. The output is
+checked: every cross-reference offset must point at its object. When fpdf is
+installed, the previous FPDF layout (one cell per line) is timed for
+comparison, extended from its first 5 numeric columns to all of them. Peak
+memory is the tracemalloc peak of the report step alone, profile and charts
+excluded.
+"""
+import argparse
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from plotting import DISPLAY_DPI, render_plot  # noqa: E402
+from profiling import profile_dataframe  # noqa: E402
+from report import write_report  # noqa: E402
+
+
+def make_frame(rows, n_numeric, n_text, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {f'measurement_{i}': rng.normal(i, 1 + i % 7, rows) for i in range(n_numeric)}
+    words = np.array([f'category_{i}' for i in range(500)], dtype=object)
+    for i in range(n_text):
+        data[f'label_{i}'] = pd.Series(words[rng.integers(0, 20 + i % 100, rows)], dtype='object')
+    df = pd.DataFrame(data)
+    for i, col in enumerate(df.columns[::3]):
+        df.loc[i % 17::23, col] = None
+    return df
+
+
+def render_charts(df, count):
+    numeric = df.select_dtypes('number').columns
+    text = df.select_dtypes('object').columns
+    requests = [("Distribution Plot", numeric[0], None), ("Boxplot", numeric[1], None),
+                ("Countplot", text[0], None), ("Barplot", text[1], numeric[2])]
+    requests += [("Distribution Plot", col, None) for col in numeric[3:]]
+    return [(f"{plot_type}: {x_col}", render_plot(df, plot_type, x_col, y_col, 'png', DISPLAY_DPI))
+            for plot_type, x_col, y_col in requests[:count]]
+
+
+def legacy_report(profile, cleaned_profile):
+    """The FPDF report this module replaced, with every numeric column instead of the first 5"""
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'EDA Dashboard Report', ln=True, align='C')
+    pdf.ln(10)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Dataset Information:', ln=True)
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(0, 10, f'Original Shape: {(profile.n_rows, profile.n_cols)}', ln=True)
+    pdf.cell(0, 10, f'Cleaned Shape: {(cleaned_profile.n_rows, cleaned_profile.n_cols)}', ln=True)
+    pdf.cell(0, 10, f'Missing Values: {profile.total_missing}', ln=True)
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Summary Statistics:', ln=True)
+    pdf.set_font('Arial', '', 8)
+    summary_stats = cleaned_profile.numeric_stats()
+    for col in cleaned_profile.numeric_columns:
+        pdf.cell(0, 8, f'{col}:', ln=True)
+        for stat in ('mean', 'std', 'min', 'max'):
+            pdf.cell(0, 6, f'  {stat.capitalize()}: {summary_stats[col][stat]:.2f}', ln=True)
+        pdf.ln(2)
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def streamed_report(profile, cleaned_profile, charts, spool_bytes=None):
+    if spool_bytes is None:
+        out = io.BytesIO()
+        write_report(out, profile, cleaned_profile, charts)
+        return out.getvalue()
+    with tempfile.SpooledTemporaryFile(max_size=spool_bytes) as out:
+        write_report(out, profile, cleaned_profile, charts)
+        out.seek(0)
+        return out.read()
+
+
+def check_pdf(data):
+    """Assert the cross-reference table points at every object; returns the page count"""
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[xref:xref + 5] == b'xref\n', "startxref does not point at the xref table"
+    size = int(re.match(rb'xref\n0 (\d+)\n', data[xref:]).group(1))
+    table = data[xref:].split(b'\n', 2)[2]
+    for obj_id in range(1, size):
+        offset = int(table[20 * obj_id:20 * obj_id + 10])
+        assert data.startswith(b'%d 0 obj\n' % obj_id, offset), f"object {obj_id} is not at offset {offset}"
+    return int(re.search(rb'/Type /Pages /Kids \[[^\]]*\] /Count (\d+)', data).group(1))
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--numeric', type=int, default=800)
+    parser.add_argument('--text', type=int, default=200)
+    parser.add_argument('--charts', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.numeric, args.text)
+    profile = profile_dataframe(df)
+    charts = render_charts(df, args.charts)
+    print(f"{args.rows:,} rows x {df.shape[1]:,} columns, {len(charts)} charts "
+          f"({sum(len(png) for _, png in charts) / 1024:,.0f} KB of PNG)")
+
+    variants = [("streaming, no charts", lambda: streamed_report(profile, profile, [])),
+                ("streaming, in memory", lambda: streamed_report(profile, profile, charts)),
+                ("streaming, spooled 1 MB", lambda: streamed_report(profile, profile, charts, 1024 ** 2))]
+    try:
+        import fpdf  # noqa: F401
+        variants.append(("fpdf (no charts)", lambda: legacy_report(profile, profile)))
+    except ImportError:
+        print("fpdf not installed: skipping the previous report")
+
+    print(f"\n{'report':<26} {'time':>9} {'peak memory':>12} {'size':>10} {'pages':>6}")
+    for name, fn in variants:
+        data, seconds, peak = measure(fn, args.repeat)
+        pages = check_pdf(data) if name.startswith('streaming') else data.count(b'/Type /Page\n')
+        print(f"{name:<26} {seconds * 1000:>7.0f}ms {peak / 1024 ** 2:>10.1f}MB {len(data) / 1024:>8.0f}KB {pages:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Exact vs approximate (sketch-based) profiling: time, peak memory and accuracy.
+
+    python benchmarks/bench_sketches.py
+    python benchmarks/bench_sketches.py --rows 10000000 --repeat 1
+
+Profiles a synthetic frame with a normal, a heavy-tailed, an integer, a
+Zipf-distributed text and a high-cardinality id column both ways, then
+reports the largest relative error of the approximate quantiles and distinct
+counts against the exact profile, and the largest top-value count error as a
+share of the rows. Peak memory is the tracemalloc peak of the profile step.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from profiling import profile_dataframe  # noqa: E402
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f'word_{i}' for i in range(10_000)], dtype=object)
+    df = pd.DataFrame({
+        'normal': rng.normal(100, 15, rows),
+        'lognormal': rng.lognormal(3, 1.5, rows),
+        'integer': rng.integers(-1_000, 1_000, rows).astype('float64'),
+        'zipf': words[np.minimum(rng.zipf(1.3, rows), len(words)) - 1],
+        'id': pd.Series(np.arange(rows)).map('id_{:08d}'.format),
+    })
+    df.loc[::13, 'normal'] = np.nan
+    df.loc[::17, 'zipf'] = None
+    return df
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, min(times), peak
+
+
+def relative_error(approx, exact):
+    exact = exact.astype('float64')
+    return float((np.abs(approx.astype('float64') - exact) / np.maximum(np.abs(exact), 1e-12)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    print(f"{args.rows:,} rows x {df.shape[1]} columns")
+    exact, exact_seconds, exact_peak = measure(lambda: profile_dataframe(df), args.repeat)
+    approx, approx_seconds, approx_peak = measure(lambda: profile_dataframe(df, approximate=True), args.repeat)
+
+    print(f"\n{'profile':<12} {'time':>9} {'peak memory':>12}")
+    print(f"{'exact':<12} {exact_seconds * 1000:>7.0f}ms {exact_peak / 1024 ** 2:>10.1f}MB")
+    print(f"{'approximate':<12} {approx_seconds * 1000:>7.0f}ms {approx_peak / 1024 ** 2:>10.1f}MB")
+
+    print(f"\n{'column':<12} {'quantiles':>10} {'unique':>10} {'top counts':>11}")
+    for col in df.columns:
+        numeric = col in exact.numeric_columns
+        quantiles = (relative_error(approx.columns.loc[col, ['q25', 'median', 'q75']],
+                                    exact.columns.loc[col, ['q25', 'median', 'q75']]) if numeric else None)
+        unique = relative_error(approx.columns.loc[[col], 'unique'], exact.columns.loc[[col], 'unique'])
+        top = None
+        if not numeric:
+            exact_top = exact.top_values[col]
+            top = float((exact_top - approx.top_values[col].reindex(exact_top.index).fillna(0)).abs().max()) / len(df)
+        print(f"{col:<12} {'-' if quantiles is None else f'{quantiles:.2%}':>10} {unique:>10.2%} "
+              f"{'-' if top is None else f'{top:.2%}':>11}")
+    print(f"\nstated bounds: {approx.approximation_note}")
+
+
+if __name__ == '__main__':
+    main()
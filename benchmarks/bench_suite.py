@@ -0,0 +1,303 @@
+"""
+Benchmark suite: every dashboard stage on synthetic datasets, with baselines.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --scale 1 --repeat 1
+    python benchmarks/bench_suite.py --datasets tall,missing --ops clean,plot
+    python benchmarks/bench_suite.py --update-baseline
+    python benchmarks/bench_suite.py --baseline benchmarks/results/baseline.json --tolerance 0.3
+
+Datasets at --scale 1 (rows, and wide's columns, are multiplied by --scale; 0.1 by default):
+
+    tall              1,000,000 rows x 10 columns: numeric, low-cardinality text, dates as text
+    wide                  5,000 rows x 500 columns: mostly numeric
+    high_cardinality    500,000 rows x 8 columns: ids and free text, nearly all values distinct
+    missing             200,000 rows x 20 columns: 40% of every column missing
+
+Each dataset goes through the dashboard's stages headlessly, in the order
+the app runs them: the CSV load path (read_csv_chunked on the serialized
+file), profile_dataframe, clean_data, generate_plot for every plot type
+(drawn and encoded to PNG, as the Visualizations tab does),
+generate_basic_insights and generate_pdf_report. Every stage runs --repeat
+times and the fastest run is reported alongside the median. Categorical
+plots of a high-cardinality column are skipped at scales where the
+dashboard would draw every category instead of the top ones (minutes per
+plot); skipped cases are listed with each dataset, summed up at the end and
+stored in the results. --all-plots times them anyway.
+
+Results are written as JSON to benchmarks/results/suite-<timestamp>.json
+(or --output). When a baseline exists (benchmarks/results/baseline.json
+or --baseline) each stage is compared with it, and stages slower by more
+than --tolerance (and by more than --min-delta seconds, to ignore timer
+noise) are listed as regressions; the exit status is then 1, so the suite
+can gate CI. --update-baseline stores this run as the new baseline.
+
+The committed benchmarks/results/baseline.json is a reference run at the
+default scale (its "platform" and "cpus" fields say where). Timings only
+compare on the same hardware, so record your own before making changes:
+
+    python benchmarks/bench_suite.py --update-baseline
+    ... change the code ...
+    python benchmarks/bench_suite.py
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+BASELINE_PATH = os.path.join(RESULTS_DIR, 'baseline.json')
+
+from cleaning import clean_data  # noqa: E402
+from eda_dashboard import generate_basic_insights, generate_pdf_report  # noqa: E402
+from ingest import read_csv_chunked  # noqa: E402
+from aggregates import MAX_CATEGORIES  # noqa: E402
+from plotting import DISPLAY_DPI, PLOT_TYPES, is_large, render_plot  # noqa: E402
+from profiling import profile_dataframe  # noqa: E402
+
+# name -> (rows, numeric columns, text columns, description) at scale 1
+DATASETS = {
+    'tall': (1_000_000, 6, 4, "many rows, few columns"),
+    'wide': (5_000, 450, 50, "few rows, many columns"),
+    'high_cardinality': (500_000, 3, 5, "nearly every text value distinct"),
+    'missing': (200_000, 12, 8, "40% of every column missing"),
+}
+
+
+def make_dataset(name, scale=1.0, seed=0):
+    """Synthetic DataFrame of the given shape, deterministic for a seed"""
+    rows, n_numeric, n_text, _ = DATASETS[name]
+    rows = max(100, int(rows * scale))
+    if name == 'wide':
+        n_numeric, n_text = max(2, int(n_numeric * scale)), max(2, int(n_text * scale))
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_numeric):
+        kind = i % 3
+        if kind == 0:
+            data[f'num_{i}'] = rng.normal(i, 1 + i % 5, rows)
+        elif kind == 1:
+            data[f'num_{i}'] = rng.lognormal(1, 0.8, rows).round(2)
+        else:
+            data[f'num_{i}'] = rng.integers(0, 100 * (i + 1), rows)
+    for i in range(n_text):
+        if name == 'high_cardinality':
+            values = pd.Series(rng.integers(0, rows * 10, rows)).map(f'id{i}_{{:09d}}'.format)
+        elif i % 4 == 3:
+            values = pd.Series(pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), unit='D'))
+            values = values.dt.strftime('%Y-%m-%d')
+        else:
+            labels = np.array([f'level_{j}' for j in range(5 + 20 * i)], dtype=object)
+            values = pd.Series(labels[np.minimum(rng.zipf(1.5, rows), len(labels)) - 1])
+        data[f'text_{i}'] = values.to_numpy(dtype=object)
+    df = pd.DataFrame(data)
+    missing_share = 0.4 if name == 'missing' else 0.05
+    for col in df.columns:
+        mask = rng.random(rows) < missing_share
+        if df[col].dtype.kind in 'iu':
+            df[col] = df[col].astype('float64')
+        df.loc[mask, col] = None
+    return df
+
+
+def plot_requests(df, all_plots=False):
+    """(plot type, x column, y column) for every plot type, on suitable columns, and {plot type: reason} skipped.
+
+    Below LARGE_DATA_ROWS seaborn draws (and lays out a tick label for) every
+    category, which takes minutes for tens of thousands of distinct ids, so
+    categorical plots of such columns only run at sizes where the dashboard
+    pre-aggregates them to the top MAX_CATEGORIES.
+    """
+    numeric = list(df.select_dtypes(include=[np.number]).columns)
+    text = [col for col in df.columns if col not in set(numeric)]
+    too_many = not all_plots and not is_large(df) and df[text[0]].nunique() > MAX_CATEGORIES
+    requests, skipped = [], {}
+    for plot_type in PLOT_TYPES:
+        if plot_type in ("Countplot", "Barplot") and too_many:
+            skipped[plot_type] = f"{text[0]} has over {MAX_CATEGORIES} categories below the pre-aggregation size"
+        elif plot_type in ("Distribution Plot", "Boxplot"):
+            requests.append((plot_type, numeric[0], None))
+        elif plot_type == "Countplot":
+            requests.append((plot_type, text[0], None))
+        elif plot_type == "Barplot":
+            requests.append((plot_type, text[0], numeric[0]))
+        else:
+            requests.append((plot_type, None, None))
+    return requests, skipped
+
+
+def stages(df, requests):
+    """(stage name, function) pairs for one dataset, in the order the dashboard runs them"""
+    csv = df.to_csv(index=False).encode()
+    state = {}
+
+    def load():
+        state['df'] = read_csv_chunked(io.BytesIO(csv))
+
+    def clean():
+        state['cleaned'] = clean_data(state.get('df', df))
+
+    result = [('csv_load', load), ('profile_dataframe', lambda: profile_dataframe(state.get('df', df))),
+              ('clean_data', clean)]
+    for plot_type, x_col, y_col in requests:
+        result.append((f'generate_plot[{plot_type}]',
+                       lambda plot_type=plot_type, x_col=x_col, y_col=y_col: render_plot(
+                           state.get('cleaned', df), plot_type, x_col, y_col, 'png', DISPLAY_DPI)))
+    result += [('generate_basic_insights', lambda: generate_basic_insights(state.get('cleaned', df))),
+               ('generate_pdf_report', lambda: generate_pdf_report(state.get('df', df), state.get('cleaned', df)))]
+    return result
+
+
+def warm_up():
+    """Import seaborn and build the font cache, so the first timed plot does not pay for it"""
+    df = make_dataset('missing', scale=0.001)
+    render_plot(df, "Distribution Plot", 'num_0', None, 'png', DISPLAY_DPI)
+
+
+def run_stage(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'min_s': round(min(times), 6), 'median_s': round(statistics.median(times), 6), 'runs': repeat}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Rows of (dataset, stage, baseline s, current s, ratio, regressed) for stages in both runs"""
+    rows = []
+    for name, dataset in results['datasets'].items():
+        previous = baseline.get('datasets', {}).get(name)
+        if previous is None or previous.get('shape') != dataset['shape']:
+            continue
+        for stage, timing in dataset['stages'].items():
+            if stage not in previous['stages']:
+                continue
+            before, after = previous['stages'][stage]['min_s'], timing['min_s']
+            ratio = after / before if before else float('inf')
+            rows.append((name, stage, before, after, ratio,
+                         ratio > 1 + tolerance and after - before > min_delta))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--datasets', default=','.join(DATASETS),
+                        help="comma-separated subset of: " + ', '.join(DATASETS))
+    parser.add_argument('--ops', default='', help="comma-separated substrings; only matching stages run")
+    parser.add_argument('--scale', type=float, default=0.1, help="multiplies every dataset's rows (and wide's columns)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="results file (default: benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="results file to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before a regression")
+    parser.add_argument('--min-delta', type=float, default=0.005, help="ignore slowdowns below this many seconds")
+    parser.add_argument('--all-plots', action='store_true',
+                        help="also time categorical plots that draw every category of a high-cardinality column")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.datasets.split(',') if name.strip()]
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(unknown)}")
+    ops = [op.strip().lower() for op in args.ops.split(',') if op.strip()]
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__},
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'datasets': {},
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        warm_up()
+    for name in names:
+        df = make_dataset(name, args.scale)
+        print(f"\n{name}: {len(df):,} rows x {df.shape[1]} columns ({DATASETS[name][3]})")
+        requests, skipped = plot_requests(df, args.all_plots)
+        skipped = {f'generate_plot[{plot_type}]': reason for plot_type, reason in skipped.items()}
+        timings = {}
+        for stage, fn in stages(df, requests):
+            if ops and not any(op in stage.lower() for op in ops):
+                continue
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                timings[stage] = run_stage(fn, args.repeat)
+            print(f"  {stage:<42} {timings[stage]['min_s'] * 1000:>9.1f}ms "
+                  f"(median {timings[stage]['median_s'] * 1000:.1f}ms)")
+        skipped = {stage: reason for stage, reason in skipped.items()
+                   if not ops or any(op in stage.lower() for op in ops)}
+        for stage, reason in skipped.items():
+            print(f"  {stage:<42} SKIPPED: {reason}")
+        results['datasets'][name] = {'shape': list(df.shape), 'stages': timings, 'skipped': skipped}
+
+    skipped = [(name, stage) for name, dataset in results['datasets'].items() for stage in dataset['skipped']]
+    if skipped:
+        print(f"\n{len(skipped)} case(s) skipped, not timed: "
+              f"{', '.join(f'{name} {stage}' for name, stage in skipped)}. Run with --all-plots to time them.")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    regressions = []
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; record one with --update-baseline")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance, args.min_delta)
+        if rows:
+            print(f"\nCompared with {args.baseline} ({baseline.get('revision') or 'unknown revision'}):")
+            print(f"  {'dataset':<17} {'stage':<42} {'baseline':>10} {'current':>10} {'change':>8}")
+            for name, stage, before, after, ratio, regressed in rows:
+                print(f"  {name:<17} {stage:<42} {before * 1000:>8.1f}ms {after * 1000:>8.1f}ms "
+                      f"{(ratio - 1) * 100:>+7.0f}%{'  REGRESSION' if regressed else ''}")
+            regressions = [row for row in rows if row[5]]
+            missing = [(name, stage) for name, dataset in baseline.get('datasets', {}).items()
+                       if name in results['datasets'] and dataset.get('shape') == results['datasets'][name]['shape']
+                       for stage in dataset['stages'] if stage not in results['datasets'][name]['stages']
+                       and (not ops or any(op in stage.lower() for op in ops))]
+            for name, stage in missing:
+                print(f"  {name:<17} {stage:<42} {'in the baseline, not timed in this run':>30}")
+        else:
+            print(f"\nNo stages in common with {args.baseline} (scale {baseline.get('scale')}, this run "
+                  f"{args.scale}; different datasets or scale)")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Stand-in for the Ollama server, for trying the AI Insights tab without a model.
+
+    python benchmarks/fake_ollama.py --port 11500 --tokens-per-second 20
+    OLLAMA_ENDPOINT=http://localhost:11500 streamlit run app/eda_dashboard.py
+
+Implements GET /api/tags and POST /api/chat (streaming NDJSON or a single
+JSON body) with a canned answer. --first-token-delay simulates prompt
+processing, --hang never answers (to exercise timeouts), --fail returns an
+error chunk.
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = """**Data Quality Assessment**
+- The dataset is mostly complete; a few columns have missing values worth imputing.
+
+**Key Patterns**
+- Several numeric columns are strongly correlated and may carry redundant information.
+
+**Analysis Opportunities**
+- Segment the data by its main categorical columns and compare distributions.
+
+**Recommendations**
+- Clean missing values, then profile the strongest correlations in more depth."""
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    options = None
+
+    def log_message(self, format, *args):
+        if self.options.verbose:
+            super().log_message(format, *args)
+
+    def _json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._json({'models': [{'name': f'{self.options.model}:latest'}]})
+        else:
+            self._json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if self.path != '/api/chat':
+            self._json({'error': 'not found'}, 404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        model = request.get('model', self.options.model)
+        if self.options.hang:
+            time.sleep(3600)
+        started = time.monotonic()
+        time.sleep(self.options.first_token_delay)
+        if self.options.fail:
+            self._json({'error': f'model "{model}" not found, try pulling it first'}, 404)
+            return
+        tokens = [word + ' ' for word in ANSWER.replace('\n', '\n ').split(' ')]
+        prompt_tokens = len(request['messages'][-1]['content']) // 4
+        if not request.get('stream', True):
+            self._json({'model': model, 'message': {'role': 'assistant', 'content': ''.join(tokens)}, 'done': True})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        delay = 1.0 / self.options.tokens_per_second if self.options.tokens_per_second else 0
+        try:
+            for token in tokens:
+                self._chunk({'model': model, 'message': {'role': 'assistant', 'content': token}, 'done': False})
+                time.sleep(delay)
+            self._chunk({'model': model, 'message': {'role': 'assistant', 'content': ''}, 'done': True,
+                         'prompt_eval_count': prompt_tokens, 'prompt_eval_duration': int(self.options.first_token_delay * 1e9),
+                         'eval_count': len(tokens), 'total_duration': int((time.monotonic() - started) * 1e9)})
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled
+
+    def _chunk(self, body):
+        data = json.dumps(body).encode() + b'\n'
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=11500, help="0 picks a free port (printed on startup)")
+    parser.add_argument('--model', default='mistral')
+    parser.add_argument('--tokens-per-second', type=float, default=20)
+    parser.add_argument('--first-token-delay', type=float, default=0.5)
+    parser.add_argument('--hang', action='store_true')
+    parser.add_argument('--fail', action='store_true')
+    parser.add_argument('--verbose', action='store_true')
+    Handler.options = parser.parse_args()
+    server = ThreadingHTTPServer(('127.0.0.1', Handler.options.port), Handler)
+    print(f"Fake Ollama listening on http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+
+# Keep the dashboard's on-disk stores out of the checkout while tests import it
+_CACHE_DIR = tempfile.mkdtemp(prefix='eda-tests-')
+for name, sub in [('EDA_DATA_STORE', 'datasets'), ('EDA_LLM_CACHE', 'llm'), ('EDA_DUCKDB_TEMP_DIR', 'duckdb_tmp')]:
+    os.environ.setdefault(name, os.path.join(_CACHE_DIR, sub))
+os.environ.setdefault('EDA_METRICS_LOG', '')
+os.environ.setdefault('EDA_METRICS_FILE', '')
@@ -0,0 +1,29 @@
+import matplotlib
+import numpy as np
+import pandas as pd
+
+matplotlib.use('Agg')
+
+from aggregates import box_aggregate
+from engines import PandasEngine
+from plotting import LARGE_DATA_ROWS, generate_plot
+
+
+def all_missing_frame(rows=300_000):
+    return pd.DataFrame({
+        'group': np.resize(np.array(['a', 'b', 'c'], dtype=object), rows),
+        'value': np.full(rows, np.nan),
+    })
+
+
+def test_box_aggregate_with_every_value_missing_is_empty():
+    df = all_missing_frame()
+    assert box_aggregate(df, 'group', 'value') == ([], 0)
+    assert PandasEngine(df).box_aggregate('group', 'value') == ([], 0)
+
+
+def test_large_boxplot_with_every_value_missing_draws_nothing():
+    df = all_missing_frame()
+    assert len(df) > LARGE_DATA_ROWS
+    fig = generate_plot(df, 'Boxplot', 'group', 'value')
+    assert fig.axes[0].get_title().startswith('Boxplot: value by group')
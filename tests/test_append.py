@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from append import AppendIndex, extend_dataset
+from ingest import read_csv_chunked
+from profiling import extend_profile, profile_dataframe
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, rows).round(2),
+        'quantity': rng.integers(1, 50, rows),
+        'score': rng.normal(0, 1, rows),
+        'region': rng.choice(['north', 'south', 'east', 'west'], rows),
+    })
+    df.loc[::11, 'score'] = np.nan
+    return df
+
+
+@pytest.fixture
+def upload():
+    old = make_frame(5000, 0).to_csv(index=False).encode()
+    return old, old + make_frame(700, 1).to_csv(index=False, header=False).encode()
+
+
+def test_digests_serve_find_base_and_record(upload):
+    old, new = upload
+    index = AppendIndex()
+    digests = index.digests(old)
+    index.record('old', old, digests)
+    new_digests = index.digests(new)
+    assert set(new_digests) == {len(old), len(new)}
+    assert new_digests[len(old)] == digests[len(old)]
+    assert index.find_base(new, new_digests).key == 'old'
+    changed = bytearray(new)
+    changed[len(old) // 2] ^= 1
+    assert index.find_base(bytes(changed)) is None
+
+
+@pytest.mark.parametrize('approximate', [False, True])
+def test_extended_profile_matches_full_profile(upload, approximate):
+    old, new = upload
+    base = read_csv_chunked(io.BytesIO(old))
+    rows, df = extend_dataset(base, new, len(old))
+    full = profile_dataframe(read_csv_chunked(io.BytesIO(new)), approximate=approximate)
+    extended = extend_profile(profile_dataframe(base, approximate=approximate), rows, df)
+    assert extended.n_rows == full.n_rows == len(df)
+    for name in ('count', 'null_count', 'unique'):
+        assert extended.columns[name].tolist() == full.columns[name].tolist()
+    numeric = full.numeric_columns
+    for name in ('mean', 'std', 'min', 'max') + (() if approximate else ('q25', 'median', 'q75')):
+        np.testing.assert_allclose(extended.columns.loc[numeric, name].astype(float),
+                                   full.columns.loc[numeric, name].astype(float), rtol=1e-9)
+    assert extended.top_values['region'].to_dict() == full.top_values['region'].to_dict()
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from cache import LRUCache
+
+
+def test_get_or_create_builds_each_key_once_under_contention():
+    cache = LRUCache(max_entries=4)
+    builds = []
+    release = threading.Event()
+
+    def factory():
+        builds.append(1)
+        release.wait(5)
+        return len(builds)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create('key', factory)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)  # later callers arrive while the first builds and the second waits
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert builds == [1]
+    assert results == [1, 1, 1]
+    assert not cache._key_locks
+
+
+def test_get_or_create_never_builds_a_key_concurrently():
+    # Values over the budget are not cached, so every caller builds; they must take turns
+    cache = LRUCache(max_bytes=10, sizeof=lambda value: 100)
+    running, overlaps = [], []
+
+    def factory():
+        running.append(1)
+        overlaps.append(len(running))
+        time.sleep(0.1)
+        running.pop()
+        return 'value'
+
+    threads = [threading.Thread(target=cache.get_or_create, args=('key', factory)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.07)  # the third caller arrives after the first build, while the second runs
+    for thread in threads:
+        thread.join(5)
+    assert overlaps == [1, 1, 1]
+    assert not cache._key_locks
+
+
+def test_get_or_create_releases_lock_when_factory_raises():
+    cache = LRUCache()
+
+    def fail():
+        raise ValueError("bad file")
+
+    try:
+        cache.get_or_create('key', fail)
+    except ValueError:
+        pass
+    assert cache.get_or_create('key', lambda: 42) == 42
+    assert not cache._key_locks
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=10, sizeof=len)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.get('a')
+    cache.put('c', b'1234')
+    assert cache.keys() == ['a', 'c']
+    cache.put('d', b'12345678')
+    assert cache.keys() == ['d']
+    assert cache.total_bytes == 8
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+import eda_dashboard
+from engines import ENGINES
+
+
+@pytest.mark.parametrize('name', ['duckdb', 'polars'])
+def test_clean_through_out_of_core_engine(name):
+    pytest.importorskip(name)
+    key, engine = eda_dashboard.load_default_engine(name)
+    clean = eda_dashboard.cleaning_task(key, engine, 'mean', 'mode')
+    cleaned = eda_dashboard.as_cleaned_engine(clean(), eda_dashboard.cleaned_data_key(key, 'mean', 'mode'))
+    assert isinstance(engine, ENGINES[name])
+    assert int(cleaned.profile().columns['null_count'].sum()) == 0
+    # The second call is served from the dataset cache
+    assert clean() is clean()
+
+
+def test_clean_pandas_engine():
+    key, engine = eda_dashboard.load_default_engine('pandas')
+    cleaned = eda_dashboard.cleaning_task(key, engine, 'median', 'mode')()
+    assert isinstance(cleaned, pd.DataFrame)
+    assert not cleaned.isna().any().any()
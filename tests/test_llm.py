@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from llm import CANCELLED, DONE, FINISHED, TIMEOUT, InsightService, ResponseCache
+
+FAKE_OLLAMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fake_ollama.py')
+
+
+@pytest.fixture
+def fake_ollama():
+    """Start benchmarks/fake_ollama.py on a free port with the given options; yields a starter returning its URL"""
+    servers = []
+
+    def start(*options):
+        server = subprocess.Popen([sys.executable, FAKE_OLLAMA, '--port', '0', *options],
+                                  stdout=subprocess.PIPE, text=True)
+        servers.append(server)
+        line = server.stdout.readline()
+        assert 'listening on' in line, line
+        return line.split()[-1]
+
+    yield start
+    for server in servers:
+        server.kill()
+        server.wait()
+
+
+def wait(job, timeout=15):
+    deadline = time.monotonic() + timeout
+    while job.status not in FINISHED and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return job.status
+
+
+def test_streams_the_answer(fake_ollama):
+    service = InsightService(fake_ollama('--tokens-per-second', '0', '--first-token-delay', '0'))
+    assert 'mistral:latest' in service.models()
+    job = service.submit("Describe the data")
+    assert wait(job) == DONE
+    assert job.text.startswith('**Data Quality Assessment**')
+    assert job.first_token is not None and job.stats.get('eval_count')
+
+
+def test_hanging_server_times_out(fake_ollama):
+    service = InsightService(fake_ollama('--hang'), read_timeout=0.5)
+    job = service.submit("Describe the data", timeout=1.0)
+    assert wait(job) == TIMEOUT
+    assert job.error
+
+
+def test_cancel_stops_the_stream(fake_ollama):
+    service = InsightService(fake_ollama('--tokens-per-second', '20', '--first-token-delay', '0'))
+    job = service.submit("Describe the data")
+    deadline = time.monotonic() + 10
+    while not job.text and time.monotonic() < deadline:
+        time.sleep(0.02)
+    job.cancel()
+    assert wait(job) == CANCELLED
+    assert len(job.text) < 100
+
+
+def test_finished_answers_are_served_from_the_cache(fake_ollama, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    service = InsightService(fake_ollama('--tokens-per-second', '0', '--first-token-delay', '0'), cache=cache)
+    first = service.submit("Describe the data", cache_key='key')
+    assert wait(first) == DONE and not first.cached
+    second = service.submit("Describe the data", cache_key='key')
+    assert second.cached and second.status == DONE
+    assert second.text == first.text
+    # refresh asks the model again
+    assert not service.submit("Describe the data", cache_key='key', refresh=True).cached
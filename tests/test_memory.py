@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import LRUCache
+from memory import MemoryBudgetError, SessionMemory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(rows):
+    return pd.DataFrame({'x': np.arange(rows, dtype='float64')})
+
+
+def test_check_refuses_frames_over_the_session_budget():
+    memory = SessionMemory(session_max_bytes=10_000)
+    small, large = frame(100), frame(10_000)
+    assert memory.check('a', 'data', 'small', small) is small
+    with pytest.raises(MemoryBudgetError):
+        memory.check('a', 'data', 'large', large)
+    # check() registers nothing
+    assert memory.session_bytes('a') == 0
+
+
+def test_spilled_frames_are_released_from_shared_caches():
+    clock, shared = Clock(), LRUCache()
+    spilled = []
+
+    def spill(session, name, key, df):
+        spilled.append((session, key))
+        if not memory.held_elsewhere(key, session):
+            shared.discard(df)
+
+    memory = SessionMemory(idle_seconds=60, spill=spill, clock=clock)
+    idle_frame, shared_frame = frame(1000), frame(1000)
+    shared.put('idle', idle_frame)
+    shared.put('shared', shared_frame)
+    memory.hold('a', 'data', 'idle', idle_frame)
+    memory.hold('b', 'data', 'shared', shared_frame)
+    memory.hold('c', 'data', 'shared', shared_frame)
+    clock.now = 120
+    memory.hold('c', 'data', 'shared', shared_frame)
+    assert sorted(spilled) == [('a', 'idle'), ('b', 'shared')]
+    # Session c still holds the shared frame, so only the idle one left the cache
+    assert shared.keys() == ['shared']
+    assert memory.get('a', 'data', 'idle', lambda: frame(1000)) is not idle_frame
@@ -0,0 +1,20 @@
+from cache import LRUCache
+from metrics import Metrics
+
+
+def test_cached_counts_a_miss_then_a_hit():
+    metrics, cache = Metrics(), LRUCache()
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return 'value'
+
+    assert metrics.cached('profile', cache, 'key', factory) == 'value'
+    assert metrics.cached('profile', cache, 'key', factory) == 'value'
+    assert builds == [1]
+    [row] = metrics.summary()
+    assert (row['stage'], row['runs'], row['misses'], row['hits']) == ('profile', 1, 1, 1)
+    text = metrics.prometheus_text()
+    assert 'eda_stage_cache_hits_total{stage="profile"} 1\n' in text
+    assert 'eda_stage_cache_misses_total{stage="profile"} 1\n' in text
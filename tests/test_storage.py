@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from storage import DatasetStore  # noqa: E402
+
+
+def _write(store, key, rows):
+    assert store.save(key, pd.DataFrame({'x': range(rows)}))
+    return store.path(key)
+
+
+def test_prune_deletes_least_recently_used(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=10 ** 9)
+    old, new = _write(store, 'old', 1000), _write(store, 'new', 1000)
+    os.utime(old, (0, 0))
+    store.max_bytes = os.path.getsize(new) + 1
+    store.prune()
+    assert not os.path.exists(old) and os.path.exists(new)
+
+
+def test_prune_keeps_files_in_use(tmp_path):
+    in_use = []
+    store = DatasetStore(str(tmp_path), max_bytes=10 ** 9, in_use=lambda: in_use)
+    scanned = str(tmp_path / 'scanned.parquet')
+    pd.DataFrame({'x': range(1000)}).to_parquet(scanned)
+    os.utime(scanned, (0, 0))
+    in_use.append(scanned)
+    stored = _write(store, 'stored', 1000)
+    store.max_bytes = 1
+    store.prune()
+    assert os.path.exists(scanned)
+    assert not os.path.exists(stored)